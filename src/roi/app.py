@@ -9,7 +9,6 @@ import socket
 import sys
 import threading
 import time
-import queue
 from typing import Any, Dict, Optional
 
 from . import config
@@ -26,7 +25,7 @@ from .can.comm import (
 
 # Dashboard-only: PAT switching matrix (PAT_J0..PAT_J5)
 from .core.pat_matrix import PatSwitchMatrixState
-from .core.device_comm import device_command_loop
+from .core.device_comm import SpscRing, device_command_loop
 
 from .devices.bk5491b import MmeterFunc, func_name, func_unit
 
@@ -1022,7 +1021,7 @@ def main() -> int:
         # --- CAN RX is isolated from *all* device I/O ---
         # CAN RX thread only enqueues control frames. A dedicated device
         # command worker applies them to instruments/IO.
-        cmd_queue = queue.Queue(maxsize=int(getattr(config, "CAN_CMD_QUEUE_MAX", 256)))
+        cmd_queue = SpscRing(maxsize=int(getattr(config, "CAN_CMD_QUEUE_MAX", 256)))
 
         device_thread = threading.Thread(
             target=device_command_loop,
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import os
 import struct
 from dataclasses import dataclass
 import subprocess
 import threading
 import time
+import heapq
 import math
 import queue
 from typing import Optional, Callable
@@ -125,6 +127,44 @@ def _i16_clamp(x: int) -> int:
     return x
 
 
+# mlockall(2) flags (linux/mman.h).
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+
+def _enable_realtime(priority: int, *, log_fn=print) -> bool:
+    """Best-effort SCHED_FIFO scheduling + locked memory for the calling thread.
+
+    Used by the TX thread when ``CAN_TX_REALTIME`` is enabled to reduce
+    scheduler and page-fault jitter. Requires root (or CAP_SYS_NICE /
+    CAP_IPC_LOCK); failures are logged and otherwise ignored.
+    """
+    ok = True
+    try:
+        lo = os.sched_get_priority_min(os.SCHED_FIFO)
+        hi = os.sched_get_priority_max(os.SCHED_FIFO)
+        prio = max(lo, min(hi, int(priority)))
+        # pid 0 == calling thread on Linux.
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(prio))
+    except Exception as e:
+        log_fn(f"TX realtime: SCHED_FIFO not applied: {e}")
+        ok = False
+
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+    except Exception as e:
+        log_fn(f"TX realtime: mlockall not applied: {e}")
+        ok = False
+
+    return ok
+
+
 class OutgoingTxState:
     """Thread-safe container for outgoing CAN readback values.
 
@@ -146,42 +186,53 @@ class OutgoingTxState:
         self._afg_duty_pct: Optional[int] = None
         self._mrs_status: Optional[tuple[int, int, float]] = None  # (on, mode, out_val)
         self._mrs_input: Optional[float] = None
+        # Last snapshot tuple; reset to None by every writer so unchanged
+        # state hands the TX loop the same tuple object each tick.
+        self._snap_cache: Optional[tuple] = None
 
     def update_meter_current(self, meter_current_mA: int) -> None:
         with self._lock:
+            self._snap_cache = None
             self._meter_current_mA = int(meter_current_mA)
 
     def clear_meter_current(self) -> None:
         """Stop transmitting legacy MMETER_READ_ID (prevents stale values)."""
         with self._lock:
+            self._snap_cache = None
             self._meter_current_mA = None
 
     def update_mmeter_values(self, primary: float | None, secondary: float | None = None) -> None:
         with self._lock:
+            self._snap_cache = None
             self._mmeter_primary = None if primary is None else float(primary)
             self._mmeter_secondary = None if secondary is None else float(secondary)
 
     def update_mmeter_status(self, *, func: int, flags: int) -> None:
         with self._lock:
+            self._snap_cache = None
             self._mmeter_func = int(func) & 0xFF
             self._mmeter_flags = int(flags) & 0xFF
 
     def update_eload(self, load_volts_mV: int, load_current_mA: int) -> None:
         with self._lock:
+            self._snap_cache = None
             self._load_volts_mV = int(load_volts_mV)
             self._load_current_mA = int(load_current_mA)
 
     def update_afg_ext(self, offset_mV: int, duty_pct: int) -> None:
         with self._lock:
+            self._snap_cache = None
             self._afg_offset_mV = int(offset_mV)
             self._afg_duty_pct = int(duty_pct)
 
     def update_mrsignal_status(self, *, output_on: bool, output_select: int, output_value: float) -> None:
         with self._lock:
+            self._snap_cache = None
             self._mrs_status = (1 if output_on else 0, int(output_select) & 0xFF, float(output_value))
 
     def update_mrsignal_input(self, input_value: float) -> None:
         with self._lock:
+            self._snap_cache = None
             self._mrs_input = float(input_value)
 
     def snapshot(
@@ -200,7 +251,10 @@ class OutgoingTxState:
         Optional[float],
     ]:
         with self._lock:
-            return (
+            snap = self._snap_cache
+            if snap is not None:
+                return snap
+            snap = (
                 self._meter_current_mA,
                 self._mmeter_primary,
                 self._mmeter_secondary,
@@ -213,6 +267,8 @@ class OutgoingTxState:
                 self._mrs_status,
                 self._mrs_input,
             )
+            self._snap_cache = snap
+            return snap
 
 
 def can_tx_loop(
@@ -222,6 +278,8 @@ def can_tx_loop(
     period_s: float,
     busload: BusLoadMeter | None = None,
     log_fn=print,
+    clock: Callable[[], float] | None = None,
+    realtime: bool | None = None,
 ) -> None:
     """Publish outgoing readback frames at a fixed period.
 
@@ -231,8 +289,14 @@ def can_tx_loop(
       ``CAN_TX_PERIOD_*_MS`` settings in roi.config.
     - This loop never touches instruments; it only publishes the latest values
       from ``OutgoingTxState``.
+    - ``clock`` defaults to ``time.monotonic``; tests can inject a fake clock.
+    - ``realtime`` (default: ``CAN_TX_REALTIME``) requests SCHED_FIFO priority
+      and mlockall() for this thread before the loop starts.
     """
 
+    if clock is None:
+        clock = time.monotonic
+
     def _ms_to_s(ms: float, *, default_s: float) -> float:
         try:
             v = float(ms)
@@ -260,6 +324,13 @@ def can_tx_loop(
         log_fn("TX thread disabled (period <= 0).")
         return
 
+    if realtime is None:
+        realtime = bool(getattr(config, "CAN_TX_REALTIME", False))
+    if realtime:
+        prio = int(getattr(config, "CAN_TX_REALTIME_PRIORITY", 50))
+        if _enable_realtime(prio, log_fn=log_fn):
+            log_fn(f"TX thread realtime scheduling enabled (SCHED_FIFO prio={prio}, memory locked).")
+
     # Optional "send on change" (still rate limited).
     send_on_change = bool(getattr(config, "CAN_TX_SEND_ON_CHANGE", False))
     min_change_s = _ms_to_s(float(getattr(config, "CAN_TX_SEND_ON_CHANGE_MIN_MS", 0)), default_s=0.0)
@@ -269,8 +340,7 @@ def can_tx_loop(
         name: str
         arbitration_id: int
         period_s: float
-        present_fn: Callable[[tuple], bool]
-        build_payload_fn: Callable[[tuple], Optional[bytes]]
+        build_fn: Callable[[tuple], Optional[bytes]]
         is_extended_id: bool = True
 
         # State
@@ -296,8 +366,7 @@ def can_tx_loop(
         name: str,
         arb_id: int,
         period_attr: str,
-        present_fn: Callable[[tuple], bool],
-        build_payload_fn: Callable[[tuple], Optional[bytes]],
+        build_fn: Callable[[tuple], Optional[bytes]],
     ) -> None:
         p_s = _cfg_period_s(period_attr, default_s=default_period_s)
         if p_s <= 0:
@@ -308,8 +377,7 @@ def can_tx_loop(
                 name=name,
                 arbitration_id=int(arb_id),
                 period_s=float(p_s),
-                present_fn=present_fn,
-                build_payload_fn=build_payload_fn,
+                build_fn=build_fn,
                 is_extended_id=True,
                 present_last=False,
                 last_payload=None,
@@ -318,6 +386,7 @@ def can_tx_loop(
             )
         )
 
+    # Each builder returns the frame payload, or None when the signal is absent.
     # Snapshot tuple indices (to keep builder functions readable).
     # snapshot() returns:
     #   0 meter_current_mA
@@ -332,9 +401,6 @@ def can_tx_loop(
     #   9 mrs_status
     #  10 mrs_input
 
-    def _present_meter(snap: tuple) -> bool:
-        return snap[0] is not None
-
     def _build_meter(snap: tuple) -> Optional[bytes]:
         mA = snap[0]
         if mA is None:
@@ -342,9 +408,6 @@ def can_tx_loop(
         u16 = _u16_clamp(int(mA))
         return int(u16).to_bytes(2, "little") + (b"\x00" * 6)
 
-    def _present_mmeter_ext(snap: tuple) -> bool:
-        return snap[1] is not None
-
     def _build_mmeter_ext(snap: tuple) -> Optional[bytes]:
         primary = snap[1]
         if primary is None:
@@ -354,9 +417,6 @@ def can_tx_loop(
         s = float("nan") if (secondary is None) else float(secondary)
         return struct.pack("<ff", p, s)
 
-    def _present_mmeter_status(snap: tuple) -> bool:
-        return (snap[3] is not None) and (snap[4] is not None)
-
     def _build_mmeter_status(snap: tuple) -> Optional[bytes]:
         func = snap[3]
         flags = snap[4]
@@ -367,9 +427,6 @@ def can_tx_loop(
         payload[1] = int(flags) & 0xFF
         return bytes(payload)
 
-    def _present_eload(snap: tuple) -> bool:
-        return (snap[5] is not None) and (snap[6] is not None)
-
     def _build_eload(snap: tuple) -> Optional[bytes]:
         v = snap[5]
         i = snap[6]
@@ -383,9 +440,6 @@ def can_tx_loop(
             + (b"\x00" * 4)
         )
 
-    def _present_afg_ext(snap: tuple) -> bool:
-        return (snap[7] is not None) and (snap[8] is not None)
-
     def _build_afg_ext(snap: tuple) -> Optional[bytes]:
         off = snap[7]
         duty = snap[8]
@@ -398,9 +452,6 @@ def can_tx_loop(
         payload.extend([0] * 5)
         return bytes(payload)
 
-    def _present_mrs_status(snap: tuple) -> bool:
-        return snap[9] is not None
-
     def _build_mrs_status(snap: tuple) -> Optional[bytes]:
         st = snap[9]
         if st is None:
@@ -412,9 +463,6 @@ def can_tx_loop(
         payload[2:6] = struct.pack("<f", float(out_val))
         return bytes(payload)
 
-    def _present_mrs_input(snap: tuple) -> bool:
-        return snap[10] is not None
-
     def _build_mrs_input(snap: tuple) -> Optional[bytes]:
         v = snap[10]
         if v is None:
@@ -428,50 +476,43 @@ def can_tx_loop(
         name="MMETER",
         arb_id=int(getattr(config, "MMETER_READ_ID", 0x0CFF0004)),
         period_attr="CAN_TX_PERIOD_MMETER_LEGACY_MS",
-        present_fn=_present_meter,
-        build_payload_fn=_build_meter,
+        build_fn=_build_meter,
     )
     add_task(
         name="MMETER_EXT",
         arb_id=int(getattr(config, "MMETER_READ_EXT_ID", 0x0CFF0009)),
         period_attr="CAN_TX_PERIOD_MMETER_EXT_MS",
-        present_fn=_present_mmeter_ext,
-        build_payload_fn=_build_mmeter_ext,
+        build_fn=_build_mmeter_ext,
     )
     add_task(
         name="MMETER_STATUS",
         arb_id=int(getattr(config, "MMETER_STATUS_ID", 0x0CFF000A)),
         period_attr="CAN_TX_PERIOD_MMETER_STATUS_MS",
-        present_fn=_present_mmeter_status,
-        build_payload_fn=_build_mmeter_status,
+        build_fn=_build_mmeter_status,
     )
     add_task(
         name="ELOAD",
         arb_id=int(getattr(config, "ELOAD_READ_ID", 0x0CFF0003)),
         period_attr="CAN_TX_PERIOD_ELOAD_MS",
-        present_fn=_present_eload,
-        build_payload_fn=_build_eload,
+        build_fn=_build_eload,
     )
     add_task(
         name="AFG_EXT",
         arb_id=int(getattr(config, "AFG_READ_EXT_ID", 0x0CFF0006)),
         period_attr="CAN_TX_PERIOD_AFG_EXT_MS",
-        present_fn=_present_afg_ext,
-        build_payload_fn=_build_afg_ext,
+        build_fn=_build_afg_ext,
     )
     add_task(
         name="MRSIGNAL_STATUS",
         arb_id=int(getattr(config, "MRSIGNAL_READ_STATUS_ID", 0x0CFF0007)),
         period_attr="CAN_TX_PERIOD_MRS_STATUS_MS",
-        present_fn=_present_mrs_status,
-        build_payload_fn=_build_mrs_status,
+        build_fn=_build_mrs_status,
     )
     add_task(
         name="MRSIGNAL_INPUT",
         arb_id=int(getattr(config, "MRSIGNAL_READ_INPUT_ID", 0x0CFF0008)),
         period_attr="CAN_TX_PERIOD_MRS_INPUT_MS",
-        present_fn=_present_mrs_input,
-        build_payload_fn=_build_mrs_input,
+        build_fn=_build_mrs_input,
     )
 
     # Friendly startup log (includes per-frame periods so tuning is obvious in logs).
@@ -485,99 +526,140 @@ def can_tx_loop(
     else:
         log_fn(f"TX thread started (tick={tick_s*1000:.0f} ms, {soc}).")
 
-    next_t = time.monotonic()
     err_count = 0
 
+    def _step(task: _TxTask, now: float, snap: tuple) -> None:
+        nonlocal err_count
+        try:
+            payload = task.build_fn(snap)
+        except Exception:
+            payload = None
+
+        if payload is None:
+            # Treat as absent; clears last_payload so the next good payload sends immediately.
+            task.mark_absent(now)
+            return
+
+        # If it was absent and is now present, force an immediate send.
+        if not task.present_last:
+            task.present_last = True
+            task.next_due = float(now)
+
+        due = now >= float(task.next_due)
+
+        changed = (task.last_payload is None) or (payload != task.last_payload)
+
+        # Decide whether to send.
+        do_send = False
+        if due:
+            do_send = True
+        elif send_on_change and changed:
+            if min_change_s <= 0:
+                do_send = True
+            else:
+                if (now - float(task.last_sent)) >= float(min_change_s):
+                    do_send = True
+
+        if not do_send:
+            return
+
+        try:
+            # A fresh Message per send: backends, notifiers or listeners may
+            # keep a reference to a sent frame.
+            cbus.send(
+                can.Message(
+                    arbitration_id=task.arbitration_id,
+                    data=payload,
+                    is_extended_id=task.is_extended_id,
+                    timestamp=time.time(),
+                )
+            )
+            if busload:
+                try:
+                    busload.record_tx(len(payload))
+                except Exception:
+                    pass
+
+            task.last_payload = payload
+            task.last_sent = float(now)
+            # Next periodic keepalive
+            task.next_due = float(now) + float(task.period_s)
+
+        except Exception as e:
+            err_count += 1
+            if err_count in (1, 10, 100) or (err_count % 500 == 0):
+                log_fn(f"TX {task.name} send error (count={err_count}): {e}")
+
+    # Periodic-only scheduling: absent tasks are polled every tick (so a
+    # returning signal is sent immediately), present tasks sit in a min-heap
+    # keyed on next_due and are only stepped once due.
+    heap: list[tuple[float, int]] = []
+    waiting: list[int] = list(range(len(tasks)))
+
+    next_t = clock()
+
     while not stop_event.is_set():
-        # NEW OPTIMIZED APPROACH:
-        # 1. Find the minimum next_due time among all present tasks
-        now = time.monotonic()
-        earliest_due = now + 10.0 # Upper bound
-        
-        active_tasks = [t for t in tasks if t.present_last or send_on_change]
-        if active_tasks:
-            earliest_due = min(t.next_due for t in active_tasks)
-        
+        # 1. Find the earliest next_due among tasks that will be visited.
+        now = clock()
+        earliest_due = now + 10.0  # Upper bound
+
+        if send_on_change:
+            if tasks:
+                earliest_due = min(t.next_due for t in tasks)
+        elif heap:
+            earliest_due = heap[0][0]
+
         # 2. Ensure we don't sleep longer than our max reaction time (e.g. 100ms)
         #    to catch new "present" signals or stop events.
         sleep_s = max(0.005, earliest_due - now)
-        sleep_s = min(sleep_s, 0.1) 
+        sleep_s = min(sleep_s, 0.1)
 
         stop_event.wait(timeout=sleep_s)
-        
+
         if next_t < now - (10.0 * tick_s):
             next_t = now + tick_s
 
         snap = tx_state.snapshot()
 
-        for task in tasks:
+        if send_on_change:
+            # Payload changes can trigger sends at any tick: visit every task.
+            for task in tasks:
+                _step(task, now, snap)
+            continue
+
+        ready = waiting
+        waiting = []
+        while heap and heap[0][0] <= now:
+            ready.append(heapq.heappop(heap)[1])
+
+        # Present tasks that are not due yet are still checked for presence
+        # every tick: a signal that drops out between due times must be sent
+        # as soon as it returns (the absent->present edge).
+        dropped = False
+        for _due, i in heap:
+            task = tasks[i]
             try:
-                present = bool(task.present_fn(snap))
+                present = task.build_fn(snap) is not None
             except Exception:
                 present = False
-
             if not present:
                 task.mark_absent(now)
-                continue
-
-            # If it was absent and is now present, force an immediate send.
-            if not task.present_last:
-                task.present_last = True
-                task.next_due = float(now)
-
-            due = now >= float(task.next_due)
-
-            # Only build payload when needed. (Saves CPU on long periods.)
-            payload: bytes | None = None
-            if due or send_on_change:
-                try:
-                    payload = task.build_payload_fn(snap)
-                except Exception:
-                    payload = None
-
-            if payload is None:
-                # Treat as absent; clears last_payload so the next good payload sends immediately.
-                task.mark_absent(now)
-                continue
-
-            changed = (task.last_payload is None) or (payload != task.last_payload)
-
-            # Decide whether to send.
-            do_send = False
-            if due:
-                do_send = True
-            elif send_on_change and changed:
-                if min_change_s <= 0:
-                    do_send = True
-                else:
-                    if (now - float(task.last_sent)) >= float(min_change_s):
-                        do_send = True
+                waiting.append(i)
+                dropped = True
+        if dropped:
+            heap = [e for e in heap if tasks[e[1]].present_last]
+            heapq.heapify(heap)
 
-            if not do_send:
-                continue
+        ready.sort()  # keep frame order stable (registration order)
 
-            try:
-                msg = can.Message(
-                    arbitration_id=int(task.arbitration_id),
-                    data=payload,
-                    is_extended_id=bool(task.is_extended_id),
-                )
-                cbus.send(msg)
-                if busload:
-                    try:
-                        busload.record_tx(len(payload))
-                    except Exception:
-                        pass
-
-                task.last_payload = payload
-                task.last_sent = float(now)
-                # Next periodic keepalive
-                task.next_due = float(now) + float(task.period_s)
+        for i in ready:
+            task = tasks[i]
+            _step(task, now, snap)
+            if task.present_last:
+                heapq.heappush(heap, (float(task.next_due), i))
+            else:
+                waiting.append(i)
 
-            except Exception as e:
-                err_count += 1
-                if err_count in (1, 10, 100) or (err_count % 500 == 0):
-                    log_fn(f"TX {task.name} send error (count={err_count}): {e}")
 
 def can_rx_loop(
     cbus: can.BusABC,
@@ -599,6 +681,9 @@ def can_rx_loop(
     # the newest command (preferred under backpressure).
     drop_oldest = 0
     drop_newest = 0
+    # Rings that evict internally (SpscRing) keep RX a pure producer; plain
+    # queues fall back to get_nowait() + put_nowait() below.
+    push_drop_oldest = getattr(cmd_queue, "push_drop_oldest", None)
 
     # Only control frames should be forwarded to the device thread.
     # This prevents unrelated bus chatter from filling the bounded queue and
@@ -680,6 +765,13 @@ def can_rx_loop(
             continue
 
         # Non-blocking enqueue; never stall CAN recv due to slow devices.
+        if push_drop_oldest is not None:
+            try:
+                if push_drop_oldest((arb, data)):
+                    drop_oldest += 1
+            except Exception:
+                drop_newest += 1
+            continue
         try:
             cmd_queue.put_nowait((arb, data))
         except queue.Full:
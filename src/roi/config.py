@@ -488,6 +488,11 @@ CAN_TX_PERIOD_MRS_INPUT_MS = _env_int("CAN_TX_PERIOD_MRS_INPUT_MS", CAN_TX_PERIO
 CAN_TX_SEND_ON_CHANGE = _env_bool("CAN_TX_SEND_ON_CHANGE", False)
 CAN_TX_SEND_ON_CHANGE_MIN_MS = _env_int("CAN_TX_SEND_ON_CHANGE_MIN_MS", 0)
 
+# Optional: run the TX thread with SCHED_FIFO priority and mlockall() to reduce
+# timing jitter (Linux only; needs root or CAP_SYS_NICE/CAP_IPC_LOCK).
+CAN_TX_REALTIME = _env_bool("CAN_TX_REALTIME", False)
+CAN_TX_REALTIME_PRIORITY = _env_int("CAN_TX_REALTIME_PRIORITY", 50)
+
 # -----------------------------------------------------------------------------
 # CAN receive filtering (optional performance/CPU optimization)
 # -----------------------------------------------------------------------------
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import queue
 import struct
+import threading
 import time
 import math
 import re
+from collections import deque
 from typing import Callable, Optional, TYPE_CHECKING
 
 from .. import config
@@ -25,6 +27,13 @@ if TYPE_CHECKING:  # pragma: no cover
     from .hardware import HardwareManager
 
 
+# Precompiled little-endian field decoders for CAN control payloads.
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_S16 = struct.Struct("<h")
+_F32 = struct.Struct("<f")
+
+
 def _quantize_nplc(v: float) -> float:
     """Quantize NPLC to the supported set for 2831E/5491B.
 
@@ -95,18 +104,123 @@ def _func_style_cmd_variants(cmd: str) -> list[str]:
     return uniq
 
 
+
+class SpscRing:
+    """Bounded single-producer/single-consumer frame queue.
+
+    Drop-in for the ``queue.Queue`` subset used between CAN RX and the device
+    command worker (``put_nowait``/``get_nowait``/``get``). Items live in a
+    bounded ``collections.deque`` whose ``append``/``popleft`` are atomic under
+    the GIL, so pushes and pops take no lock. The consumer only blocks on an
+    Event when the ring is empty; the producer sets it when it is not already
+    set, so a busy bus costs no lock traffic per frame.
+
+    When full, the producer uses ``push_drop_oldest`` instead of popping
+    itself: the deque's ``maxlen`` evicts the oldest item inside the same
+    atomic append, so only the consumer ever pops.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(1, int(maxsize))
+        self._items: deque = deque(maxlen=self.maxsize)
+        self._ready = threading.Event()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def try_push(self, item) -> bool:
+        if len(self._items) >= self.maxsize:
+            return False
+        self._items.append(item)
+        if not self._ready.is_set():
+            self._ready.set()
+        return True
+
+    def push_drop_oldest(self, item) -> bool:
+        """Push ``item``, evicting the oldest one if full; True if one was."""
+        items = self._items
+        # Best-effort count: the consumer may pop between check and append.
+        evicted = len(items) >= self.maxsize
+        items.append(item)
+        if not self._ready.is_set():
+            self._ready.set()
+        return evicted
+
+    def try_pop(self):
+        """Return the oldest item, or None when the ring is empty."""
+        try:
+            return self._items.popleft()
+        except IndexError:
+            return None
+
+    def drain_into(self, out: list, limit: int = 1024) -> int:
+        """Move up to ``limit`` queued items into ``out``; return how many."""
+        # Pop until empty rather than trusting a length snapshot: the ring can
+        # shrink underneath us while draining.
+        pop = self._items.popleft
+        limit = int(limit)
+        n = 0
+        while n < limit:
+            try:
+                out.append(pop())
+            except IndexError:
+                break
+            n += 1
+        return n
+
+    def put_nowait(self, item) -> None:
+        if not self.try_push(item):
+            raise queue.Full
+
+    def get_nowait(self):
+        item = self.try_pop()
+        if item is None:
+            raise queue.Empty
+        return item
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        item = self.try_pop()
+        if item is not None or not block:
+            if item is None:
+                raise queue.Empty
+            return item
+        # Clear, then re-check: a push that raced the clear is seen by the
+        # second pop, and any later push sets the Event again.
+        self._ready.clear()
+        item = self.try_pop()
+        if item is None:
+            self._ready.wait(timeout)
+            item = self.try_pop()
+            if item is None:
+                raise queue.Empty
+        return item
+
 class DeviceCommandProcessor:
     """Apply decoded *control* commands to physical devices.
 
     This module intentionally contains **no CAN I/O**. It receives (arb_id, data)
     tuples from a queue and performs the associated device writes.
+
+    Every log line also carries a short dotted event code (e.g.
+    ``"mmeter.ext.unsupported"``). ``log_fn`` still receives only the text;
+    pass ``event_fn`` to receive the codes as well.
     """
 
     SHAPE_MAP = {0: "SIN", 1: "SQU", 2: "RAMP"}
 
-    def __init__(self, hardware: "HardwareManager", *, log_fn: Callable[[str], None] = print):
+    def __init__(
+        self,
+        hardware: "HardwareManager",
+        *,
+        log_fn: Callable[[str], None] = print,
+        event_fn: Optional[Callable[[str], None]] = None,
+    ):
         self.hardware = hardware
         self.log = log_fn
+        self._event_fn = event_fn
 
         # De-bounce SCPI writes for legacy CAN frames that may be repeated.
         self._mmeter_last_autorange_cmd: tuple[int, bool] | None = None
@@ -114,6 +228,26 @@ class DeviceCommandProcessor:
         # Cached MrSignal arbitration id with a fallback.
         self._mrsignal_ctrl_id = int(getattr(config, "MRSIGNAL_CTRL_ID", 0x0CFF0800))
 
+        # arb_id -> handler, resolved once. setdefault keeps the first handler
+        # if two IDs are ever configured to the same value.
+        self._dispatch: dict[int, Callable[[bytes], None]] = {}
+        for arb_id, fn in (
+            (int(config.RLY_CTRL_ID), self._handle_relay),
+            (int(config.AFG_CTRL_ID), self._handle_afg),
+            (int(config.AFG_CTRL_EXT_ID), self._handle_afg_ext),
+            (int(config.MMETER_CTRL_ID), self._handle_mmeter),
+            (int(getattr(config, "MMETER_CTRL_EXT_ID", 0x0CFF0601)), self._handle_mmeter_ext),
+            (int(config.LOAD_CTRL_ID), self._handle_eload),
+            (self._mrsignal_ctrl_id, self._handle_mrsignal),
+        ):
+            self._dispatch.setdefault(arb_id, fn)
+
+    def _emit(self, code: str, msg: str) -> None:
+        """Log ``msg`` and report its event ``code``."""
+        self.log(msg)
+        if self._event_fn is not None:
+            self._event_fn(code)
+
     def _mmeter_write(self, cmd: str, *, delay_s: float = 0.0, clear_input: bool = False) -> None:
         """Write a SCPI command to the multimeter.
 
@@ -124,7 +258,7 @@ class DeviceCommandProcessor:
             return
 
         if bool(getattr(config, "MMETER_DEBUG", False)):
-            self.log(f"[mmeter] >> {cmd}")
+            self._emit("mmeter.tx", f"[mmeter] >> {cmd}")
 
         try:
             if getattr(self.hardware, "mmeter", None) is not None:
@@ -163,7 +297,7 @@ class DeviceCommandProcessor:
                 pass
 
         except Exception as e:
-            self.log(f"MMETER write error: {e}")
+            self._emit("mmeter.write_error", f"MMETER write error: {e}")
 
     def _mmeter_set_func(self, func: int) -> None:
         """Set the primary measurement function (VDC/IDC/etc).
@@ -183,7 +317,7 @@ class DeviceCommandProcessor:
         conf_cmd = FUNC_TO_SCPI_CONF.get(func_i)
 
         if not func_cmd and not conf_cmd:
-            self.log(f"MMETER: unsupported function enum {func_i}")
+            self._emit("mmeter.func.unsupported", f"MMETER: unsupported function enum {func_i}")
             return
 
         helper = getattr(self.hardware, "mmeter", None)
@@ -209,7 +343,7 @@ class DeviceCommandProcessor:
             errs = _drain_errors(max_n=4)
             bad = [e for e in errs if not _is_no_error(e)]
             if bad:
-                self.log(f"[mmeter] rejected '{cmd}': {bad[0]}")
+                self._emit("mmeter.func.rejected", f"[mmeter] rejected '{cmd}': {bad[0]}")
                 return False
             return True
 
@@ -278,7 +412,7 @@ class DeviceCommandProcessor:
                 break
 
         if not ok:
-            self.log(f"MMETER: failed to set function {func_name(func_i)} (style={style})")
+            self._emit("mmeter.func.failed", f"MMETER: failed to set function {func_name(func_i)} (style={style})")
             return
 
         # Commit function and (if auto/fallback) the discovered working dialect.
@@ -287,375 +421,386 @@ class DeviceCommandProcessor:
             setattr(self.hardware, "mmeter_scpi_style", used_style)
 
         if bool(getattr(config, "MMETER_DEBUG", False)):
-            self.log(f"[mmeter] set func -> {func_name(func_i)} via {used_style}: {used_cmd}")
+            self._emit("mmeter.func.set", f"[mmeter] set func -> {func_name(func_i)} via {used_style}: {used_cmd}")
 
     def handle(self, arb: int, data: bytes) -> None:
         """Handle one control frame."""
 
-        # Relay control (K1 direct drive)
-        if arb == int(config.RLY_CTRL_ID):
-            if len(data) < 1:
-                return
+        handler = self._dispatch.get(arb)
+        if handler is not None:
+            handler(data)
 
-            # CAN bit0 (K1)
-            k1_is_1 = (data[0] & 0x01) == 0x01
+    def _handle_relay(self, data: bytes) -> None:
+        """Relay control (K1 direct drive)."""
 
-            # Direct drive only (no DUT inference). Optional invert via K1_CAN_INVERT.
-            drive = (not k1_is_1) if bool(getattr(config, "K1_CAN_INVERT", False)) else k1_is_1
-            self.hardware.set_k1_drive(bool(drive))
+        if len(data) < 1:
             return
 
-        # AFG Control (Primary)
-        if arb == int(config.AFG_CTRL_ID):
-            if not self.hardware.afg or len(data) < 8:
-                return
+        # CAN bit0 (K1)
+        k1_is_1 = (data[0] & 0x01) == 0x01
 
-            enable = data[0] != 0
-            shape_idx = data[1]
-            freq = struct.unpack("<I", data[2:6])[0]
-            ampl_mV = struct.unpack("<H", data[6:8])[0]
-            ampl_V = ampl_mV / 1000.0
+        # Direct drive only (no DUT inference). Optional invert via K1_CAN_INVERT.
+        drive = (not k1_is_1) if bool(getattr(config, "K1_CAN_INVERT", False)) else k1_is_1
+        self.hardware.set_k1_drive(bool(drive))
 
-            try:
-                with self.hardware.afg_lock:
-                    if self.hardware.afg_output != enable:
-                        try:
-                            # GW Instek AFG-2000/2100 uses OUTP1 (not SOUR1:OUTP).
-                            self.hardware.afg.write(f"OUTP1 {'ON' if enable else 'OFF'}")
-                        except Exception:
-                            # Fallback for other SCPI dialects.
-                            self.hardware.afg.write(f"SOUR1:OUTP {'ON' if enable else 'OFF'}")
-                        self.hardware.afg_output = enable
-                    if self.hardware.afg_shape != shape_idx:
-                        shape_str = self.SHAPE_MAP.get(shape_idx, "SIN")
-                        self.hardware.afg.write(f"SOUR1:FUNC {shape_str}")
-                        self.hardware.afg_shape = shape_idx
-                    if self.hardware.afg_freq != freq:
-                        self.hardware.afg.write(f"SOUR1:FREQ {freq}")
-                        self.hardware.afg_freq = freq
-                    if self.hardware.afg_ampl != ampl_mV:
-                        self.hardware.afg.write(f"SOUR1:AMPL {ampl_V}")
-                        self.hardware.afg_ampl = ampl_mV
-            except Exception as e:
-                self.log(f"AFG Control Error: {e}")
+    def _handle_afg(self, data: bytes) -> None:
+        """AFG Control (Primary)."""
+
+        if not self.hardware.afg or len(data) < 8:
             return
 
-        # AFG Control (Extended)
-        if arb == int(config.AFG_CTRL_EXT_ID):
-            if not self.hardware.afg or len(data) < 3:
-                return
+        enable = data[0] != 0
+        shape_idx = data[1]
+        freq = _U32.unpack_from(data, 2)[0]
+        ampl_mV = _U16.unpack_from(data, 6)[0]
+        ampl_V = ampl_mV / 1000.0
+
+        try:
+            with self.hardware.afg_lock:
+                if self.hardware.afg_output != enable:
+                    try:
+                        # GW Instek AFG-2000/2100 uses OUTP1 (not SOUR1:OUTP).
+                        self.hardware.afg.write(f"OUTP1 {'ON' if enable else 'OFF'}")
+                    except Exception:
+                        # Fallback for other SCPI dialects.
+                        self.hardware.afg.write(f"SOUR1:OUTP {'ON' if enable else 'OFF'}")
+                    self.hardware.afg_output = enable
+                if self.hardware.afg_shape != shape_idx:
+                    shape_str = self.SHAPE_MAP.get(shape_idx, "SIN")
+                    self.hardware.afg.write(f"SOUR1:FUNC {shape_str}")
+                    self.hardware.afg_shape = shape_idx
+                if self.hardware.afg_freq != freq:
+                    self.hardware.afg.write(f"SOUR1:FREQ {freq}")
+                    self.hardware.afg_freq = freq
+                if self.hardware.afg_ampl != ampl_mV:
+                    self.hardware.afg.write(f"SOUR1:AMPL {ampl_V}")
+                    self.hardware.afg_ampl = ampl_mV
+        except Exception as e:
+            self._emit("afg.error", f"AFG Control Error: {e}")
 
-            offset_mV = struct.unpack("<h", data[0:2])[0]
-            offset_V = offset_mV / 1000.0
-            duty_cycle = int(data[2])
-            duty_cycle = max(1, min(99, duty_cycle))
+    def _handle_afg_ext(self, data: bytes) -> None:
+        """AFG Control (Extended)."""
 
-            try:
-                with self.hardware.afg_lock:
-                    if self.hardware.afg_offset != offset_mV:
-                        try:
-                            # GW Instek AFG-2000/2100 uses SOUR1:DCO for DC offset.
-                            self.hardware.afg.write(f"SOUR1:DCO {offset_V}")
-                        except Exception:
-                            # Fallback for other SCPI dialects.
-                            self.hardware.afg.write(f"SOUR1:VOLT:OFFS {offset_V}")
-                        self.hardware.afg_offset = offset_mV
-                    if self.hardware.afg_duty != duty_cycle:
-                        self.hardware.afg.write(f"SOUR1:SQU:DCYC {duty_cycle}")
-                        self.hardware.afg_duty = duty_cycle
-            except Exception as e:
-                self.log(f"AFG Ext Error: {e}")
+        if not self.hardware.afg or len(data) < 3:
             return
 
-        # Multimeter control
-        if arb == int(config.MMETER_CTRL_ID):
-            if len(data) < 2:
-                return
-
-            meter_mode = int(data[0])
-            meter_range = int(data[1])
+        offset_mV = _S16.unpack_from(data, 0)[0]
+        offset_V = offset_mV / 1000.0
+        duty_cycle = data[2]
+        duty_cycle = max(1, min(99, duty_cycle))
 
-            # Keep legacy semantics but actually drive the instrument.
-            if self.hardware.multi_meter and (self.hardware.multi_meter_mode != meter_mode):
-                try:
-                    with self.hardware.mmeter_lock:
-                        if meter_mode == 0:
-                            if bool(getattr(config, "MMETER_LEGACY_MODE0_ENABLE", True)):
-                                self._mmeter_set_func(int(MmeterFunc.VDC))
-                        elif meter_mode == 1:
-                            if bool(getattr(config, "MMETER_LEGACY_MODE1_ENABLE", True)):
-                                self._mmeter_set_func(int(MmeterFunc.IDC))
-                        self.hardware.multi_meter_mode = meter_mode
-                except Exception:
-                    pass
+        try:
+            with self.hardware.afg_lock:
+                if self.hardware.afg_offset != offset_mV:
+                    try:
+                        # GW Instek AFG-2000/2100 uses SOUR1:DCO for DC offset.
+                        self.hardware.afg.write(f"SOUR1:DCO {offset_V}")
+                    except Exception:
+                        # Fallback for other SCPI dialects.
+                        self.hardware.afg.write(f"SOUR1:VOLT:OFFS {offset_V}")
+                    self.hardware.afg_offset = offset_mV
+                if self.hardware.afg_duty != duty_cycle:
+                    self.hardware.afg.write(f"SOUR1:SQU:DCYC {duty_cycle}")
+                    self.hardware.afg_duty = duty_cycle
+        except Exception as e:
+            self._emit("afg.ext.error", f"AFG Ext Error: {e}")
 
-            # Legacy range byte:
-            # By default we **do not** apply it (matches historical ROI
-            # behavior and avoids "BUS: BAD COMMAND" on meters that don't
-            # support the per-subsystem :RANGe:AUTO commands).
-            if bool(getattr(config, "MMETER_LEGACY_RANGE_ENABLE", False)):
-                try:
-                    with self.hardware.mmeter_lock:
-                        if int(meter_range) == 0:
-                            func_i = int(getattr(self.hardware, "mmeter_func", int(MmeterFunc.VDC))) & 0xFF
-                            prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(func_i)
-                            key = (func_i, True)
-                            if prefix and self._mmeter_last_autorange_cmd != key:
-                                self._mmeter_write(f"{prefix}:RANGe:AUTO ON")
-                                self._mmeter_last_autorange_cmd = key
-                            self.hardware.mmeter_autorange = True
-                        else:
-                            # Disable autorange (freeze at the currently selected range)
-                            func_i = int(getattr(self.hardware, "mmeter_func", int(MmeterFunc.VDC))) & 0xFF
-                            prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(func_i)
-                            key = (func_i, False)
-                            if prefix and self._mmeter_last_autorange_cmd != key:
-                                self._mmeter_write(f"{prefix}:RANGe:AUTO OFF")
-                                self._mmeter_last_autorange_cmd = key
-                            self.hardware.mmeter_autorange = False
-                except Exception:
-                    pass
+    def _handle_mmeter(self, data: bytes) -> None:
+        """Multimeter control."""
 
-            self.hardware.multi_meter_range = int(meter_range)
+        if len(data) < 2:
             return
 
-        # Multimeter control (Extended)
-        if arb == int(getattr(config, "MMETER_CTRL_EXT_ID", 0x0CFF0601)):
-            if not bool(getattr(config, "MMETER_EXT_CTRL_ENABLE", True)):
-                return
-
-            if not self.hardware.multi_meter or len(data) < 1:
-                return
-
-            # Payload:
-            #   byte0 = opcode
-            #   byte1 = arg0
-            #   byte2 = arg1
-            #   byte3 = arg2
-            #   bytes4..7 = float32 value (little endian)
-            op = int(data[0]) & 0xFF
-            arg0 = int(data[1]) & 0xFF if len(data) > 1 else 0
-            arg1 = int(data[2]) & 0xFF if len(data) > 2 else 0
-            arg2 = int(data[3]) & 0xFF if len(data) > 3 else 0
-            fval = 0.0
-            if len(data) >= 8:
-                try:
-                    fval = float(struct.unpack("<f", data[4:8])[0])
-                except Exception:
-                    fval = 0.0
+        meter_mode = data[0]
+        meter_range = data[1]
 
-            # Convention: arg0 == 0xFF means "apply to current function".
-            tgt_func = int(self.hardware.mmeter_func) if arg0 == 0xFF else int(arg0)
+        # Keep legacy semantics but actually drive the instrument.
+        if self.hardware.multi_meter and (self.hardware.multi_meter_mode != meter_mode):
+            try:
+                with self.hardware.mmeter_lock:
+                    if meter_mode == 0:
+                        if bool(getattr(config, "MMETER_LEGACY_MODE0_ENABLE", True)):
+                            self._mmeter_set_func(int(MmeterFunc.VDC))
+                    elif meter_mode == 1:
+                        if bool(getattr(config, "MMETER_LEGACY_MODE1_ENABLE", True)):
+                            self._mmeter_set_func(int(MmeterFunc.IDC))
+                    self.hardware.multi_meter_mode = meter_mode
+            except Exception:
+                pass
 
+        # Legacy range byte:
+        # By default we **do not** apply it (matches historical ROI
+        # behavior and avoids "BUS: BAD COMMAND" on meters that don't
+        # support the per-subsystem :RANGe:AUTO commands).
+        if bool(getattr(config, "MMETER_LEGACY_RANGE_ENABLE", False)):
             try:
                 with self.hardware.mmeter_lock:
-                    # Use the documented 2831E/5491B SCPI tree (FUNC-style).
-                    # B&K's "Added Commands" doc extends this with :FUNCtion2 for
-                    # the secondary display.
-
-                    if op == 0x01:  # SET_FUNCTION (primary)
-                        self._mmeter_set_func(tgt_func)
-                        self.log(f"MMETER func -> {func_name(int(self.hardware.mmeter_func))}")
-
-                    elif op == 0x02:  # SET_AUTORANGE (arg1=0/1)
-                        on = bool(arg1)
-                        if bool(getattr(self.hardware, "mmeter_autorange", True)) != on:
-                            prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(tgt_func)
-                            if prefix:
-                                self._mmeter_write(f"{prefix}:RANGe:AUTO {'ON' if on else 'OFF'}")
-                        self.hardware.mmeter_autorange = on
-
-                    elif op == 0x03:  # SET_RANGE (float = expected reading)
-                        if not bool(getattr(config, "MMETER_EXT_SET_RANGE_ENABLE", True)):
-                            return
-                        if not math.isfinite(float(fval)):
-                            return
+                    if int(meter_range) == 0:
+                        func_i = int(getattr(self.hardware, "mmeter_func", int(MmeterFunc.VDC))) & 0xFF
+                        prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(func_i)
+                        key = (func_i, True)
+                        if prefix and self._mmeter_last_autorange_cmd != key:
+                            self._mmeter_write(f"{prefix}:RANGe:AUTO ON")
+                            self._mmeter_last_autorange_cmd = key
+                        self.hardware.mmeter_autorange = True
+                    else:
+                        # Disable autorange (freeze at the currently selected range)
+                        func_i = int(getattr(self.hardware, "mmeter_func", int(MmeterFunc.VDC))) & 0xFF
+                        prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(func_i)
+                        key = (func_i, False)
+                        if prefix and self._mmeter_last_autorange_cmd != key:
+                            self._mmeter_write(f"{prefix}:RANGe:AUTO OFF")
+                            self._mmeter_last_autorange_cmd = key
+                        self.hardware.mmeter_autorange = False
+            except Exception:
+                pass
+
+        self.hardware.multi_meter_range = int(meter_range)
+
+    def _handle_mmeter_ext(self, data: bytes) -> None:
+        """Multimeter control (Extended)."""
+
+        if not bool(getattr(config, "MMETER_EXT_CTRL_ENABLE", True)):
+            return
+
+        if not self.hardware.multi_meter or len(data) < 1:
+            return
+
+        # Payload:
+        #   byte0 = opcode
+        #   byte1 = arg0
+        #   byte2 = arg1
+        #   byte3 = arg2
+        #   bytes4..7 = float32 value (little endian)
+        n = len(data)
+        op = data[0]
+        arg0 = data[1] if n > 1 else 0
+        arg1 = data[2] if n > 2 else 0
+        arg2 = data[3] if n > 3 else 0
+        fval = 0.0
+        if n >= 8:
+            try:
+                fval = float(_F32.unpack_from(data, 4)[0])
+            except Exception:
+                fval = 0.0
+
+        # Convention: arg0 == 0xFF means "apply to current function".
+        tgt_func = int(self.hardware.mmeter_func) if arg0 == 0xFF else int(arg0)
+
+        try:
+            with self.hardware.mmeter_lock:
+                # Use the documented 2831E/5491B SCPI tree (FUNC-style).
+                # B&K's "Added Commands" doc extends this with :FUNCtion2 for
+                # the secondary display.
+
+                if op == 0x01:  # SET_FUNCTION (primary)
+                    self._mmeter_set_func(tgt_func)
+                    self._emit("mmeter.ext.func", f"MMETER func -> {func_name(int(self.hardware.mmeter_func))}")
+
+                elif op == 0x02:  # SET_AUTORANGE (arg1=0/1)
+                    on = bool(arg1)
+                    if bool(getattr(self.hardware, "mmeter_autorange", True)) != on:
                         prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(tgt_func)
                         if prefix:
-                            fv = float(fval)
-                            # Avoid redundant writes.
-                            if (not bool(getattr(self.hardware, "mmeter_autorange", True))) and abs(float(getattr(self.hardware, "mmeter_range_value", 0.0)) - fv) < 1e-12:
-                                pass
-                            else:
-                                self._mmeter_write(f"{prefix}:RANGe {fv:g}")
-                            self.hardware.mmeter_autorange = False
-                            self.hardware.mmeter_range_value = fv
-
-                    elif op == 0x04:  # SET_NPLC (float -> quantized)
-                        prefix = FUNC_TO_NPLC_PREFIX_FUNC.get(tgt_func)
-                        if prefix:
-                            nplc = _quantize_nplc(float(fval))
-                            if abs(float(getattr(self.hardware, "mmeter_nplc", 1.0)) - nplc) > 1e-12:
-                                self._mmeter_write(f"{prefix}:NPLCycles {nplc:g}")
-                            self.hardware.mmeter_nplc = float(nplc)
-
-                    elif op == 0x05:  # SECONDARY_ENABLE (arg0=0/1)
-                        if not bool(getattr(config, "MMETER_EXT_SECONDARY_ENABLE", True)):
-                            return
-                        on = bool(arg0)
-                        if bool(getattr(self.hardware, "mmeter_func2_enabled", False)) != on:
-                            self._mmeter_write(f":FUNCtion2:STATe {1 if on else 0}")
-                        self.hardware.mmeter_func2_enabled = on
-
-                        # If enabling, (re)apply the currently selected secondary function.
-                        if on:
-                            func2 = int(getattr(self.hardware, "mmeter_func2", int(MmeterFunc.VDC))) & 0xFF
-                            cmd2 = FUNC_TO_SCPI_FUNC2.get(func2)
-                            if cmd2:
-                                self._mmeter_write(cmd2)
-                            else:
-                                self.log(f"MMETER secondary: unsupported func {func2}")
-
-                    elif op == 0x06:  # SECONDARY_FUNCTION
-                        if not bool(getattr(config, "MMETER_EXT_SECONDARY_ENABLE", True)):
-                            return
-                        func_i = int(tgt_func) & 0xFF
-                        cmd2 = FUNC_TO_SCPI_FUNC2.get(func_i)
-                        if not cmd2:
-                            self.log(f"MMETER secondary: unsupported func {func_i}")
-                            return
-
-                        # Per B&K doc, secondary display must be enabled before FUNC2 is set.
-                        if not bool(getattr(self.hardware, "mmeter_func2_enabled", False)):
-                            self._mmeter_write(":FUNCtion2:STATe 1")
-                            self.hardware.mmeter_func2_enabled = True
-
-                        if int(getattr(self.hardware, "mmeter_func2", -1)) != func_i:
+                            self._mmeter_write(f"{prefix}:RANGe:AUTO {'ON' if on else 'OFF'}")
+                    self.hardware.mmeter_autorange = on
+
+                elif op == 0x03:  # SET_RANGE (float = expected reading)
+                    if not bool(getattr(config, "MMETER_EXT_SET_RANGE_ENABLE", True)):
+                        return
+                    if not math.isfinite(float(fval)):
+                        return
+                    prefix = FUNC_TO_RANGE_PREFIX_FUNC.get(tgt_func)
+                    if prefix:
+                        fv = float(fval)
+                        # Avoid redundant writes.
+                        if (not bool(getattr(self.hardware, "mmeter_autorange", True))) and abs(float(getattr(self.hardware, "mmeter_range_value", 0.0)) - fv) < 1e-12:
+                            pass
+                        else:
+                            self._mmeter_write(f"{prefix}:RANGe {fv:g}")
+                        self.hardware.mmeter_autorange = False
+                        self.hardware.mmeter_range_value = fv
+
+                elif op == 0x04:  # SET_NPLC (float -> quantized)
+                    prefix = FUNC_TO_NPLC_PREFIX_FUNC.get(tgt_func)
+                    if prefix:
+                        nplc = _quantize_nplc(float(fval))
+                        if abs(float(getattr(self.hardware, "mmeter_nplc", 1.0)) - nplc) > 1e-12:
+                            self._mmeter_write(f"{prefix}:NPLCycles {nplc:g}")
+                        self.hardware.mmeter_nplc = float(nplc)
+
+                elif op == 0x05:  # SECONDARY_ENABLE (arg0=0/1)
+                    if not bool(getattr(config, "MMETER_EXT_SECONDARY_ENABLE", True)):
+                        return
+                    on = bool(arg0)
+                    if bool(getattr(self.hardware, "mmeter_func2_enabled", False)) != on:
+                        self._mmeter_write(f":FUNCtion2:STATe {1 if on else 0}")
+                    self.hardware.mmeter_func2_enabled = on
+
+                    # If enabling, (re)apply the currently selected secondary function.
+                    if on:
+                        func2 = int(getattr(self.hardware, "mmeter_func2", int(MmeterFunc.VDC))) & 0xFF
+                        cmd2 = FUNC_TO_SCPI_FUNC2.get(func2)
+                        if cmd2:
                             self._mmeter_write(cmd2)
-                        self.hardware.mmeter_func2 = func_i
-
-                    elif op == 0x07:  # TRIG_SOURCE (arg0=0 IMM,1 BUS,2 MAN)
-                        if int(getattr(self.hardware, "mmeter_trig_source", -1)) != (int(arg0) & 0xFF):
-                            src_map = {0: "IMM", 1: "BUS", 2: "MAN"}
-                            src = src_map.get(int(arg0), "IMM")
-                            self._mmeter_write(f":TRIGger:SOURce {src}")
-                        self.hardware.mmeter_trig_source = int(arg0) & 0xFF
-
-                    elif op == 0x08:  # BUS_TRIGGER
-                        self._mmeter_write("*TRG")
-
-                    elif op == 0x09:  # RELATIVE_ENABLE (arg0=0/1)
-                        on = bool(arg0)
-                        if bool(getattr(self.hardware, "mmeter_rel_enabled", False)) != on:
-                            prefix = FUNC_TO_REF_PREFIX_FUNC.get(tgt_func)
-                            if prefix:
-                                self._mmeter_write(f"{prefix}:REFerence:STATe {'ON' if on else 'OFF'}")
-                        self.hardware.mmeter_rel_enabled = on
-
-                    elif op == 0x0A:  # RELATIVE_ACQUIRE
+                        else:
+                            self._emit("mmeter.ext.unsupported", f"MMETER secondary: unsupported func {func2}")
+
+                elif op == 0x06:  # SECONDARY_FUNCTION
+                    if not bool(getattr(config, "MMETER_EXT_SECONDARY_ENABLE", True)):
+                        return
+                    func_i = int(tgt_func) & 0xFF
+                    cmd2 = FUNC_TO_SCPI_FUNC2.get(func_i)
+                    if not cmd2:
+                        self._emit("mmeter.ext.unsupported", f"MMETER secondary: unsupported func {func_i}")
+                        return
+
+                    # Per B&K doc, secondary display must be enabled before FUNC2 is set.
+                    if not bool(getattr(self.hardware, "mmeter_func2_enabled", False)):
+                        self._mmeter_write(":FUNCtion2:STATe 1")
+                        self.hardware.mmeter_func2_enabled = True
+
+                    if int(getattr(self.hardware, "mmeter_func2", -1)) != func_i:
+                        self._mmeter_write(cmd2)
+                    self.hardware.mmeter_func2 = func_i
+
+                elif op == 0x07:  # TRIG_SOURCE (arg0=0 IMM,1 BUS,2 MAN)
+                    if int(getattr(self.hardware, "mmeter_trig_source", -1)) != (int(arg0) & 0xFF):
+                        src_map = {0: "IMM", 1: "BUS", 2: "MAN"}
+                        src = src_map.get(int(arg0), "IMM")
+                        self._mmeter_write(f":TRIGger:SOURce {src}")
+                    self.hardware.mmeter_trig_source = int(arg0) & 0xFF
+
+                elif op == 0x08:  # BUS_TRIGGER
+                    self._mmeter_write("*TRG")
+
+                elif op == 0x09:  # RELATIVE_ENABLE (arg0=0/1)
+                    on = bool(arg0)
+                    if bool(getattr(self.hardware, "mmeter_rel_enabled", False)) != on:
                         prefix = FUNC_TO_REF_PREFIX_FUNC.get(tgt_func)
                         if prefix:
-                            self._mmeter_write(f"{prefix}:REFerence:ACQuire")
+                            self._mmeter_write(f"{prefix}:REFerence:STATe {'ON' if on else 'OFF'}")
+                    self.hardware.mmeter_rel_enabled = on
 
-                    else:
-                        if op != 0:
-                            self.log(f"MMETER ext: unknown op=0x{op:02X} arg0={arg0} arg1={arg1} arg2={arg2}")
+                elif op == 0x0A:  # RELATIVE_ACQUIRE
+                    prefix = FUNC_TO_REF_PREFIX_FUNC.get(tgt_func)
+                    if prefix:
+                        self._mmeter_write(f"{prefix}:REFerence:ACQuire")
 
-            except Exception as e:
-                self.log(f"MMETER ext control error: {e}")
+                else:
+                    if op != 0:
+                        self._emit("mmeter.ext.unknown_op", f"MMETER ext: unknown op=0x{op:02X} arg0={arg0} arg1={arg1} arg2={arg2}")
 
+        except Exception as e:
+            self._emit("mmeter.ext.error", f"MMETER ext control error: {e}")
+
+
+    def _handle_eload(self, data: bytes) -> None:
+        """E-load control."""
+
+        if not self.hardware.e_load or len(data) < 6:
             return
 
-        # E-load control
-        if arb == int(config.LOAD_CTRL_ID):
-            if not self.hardware.e_load or len(data) < 6:
-                return
+        first_byte = data[0]
+        new_enable = 1 if (first_byte & 0x0C) == 0x04 else 0
+        new_mode = 1 if (first_byte & 0x30) == 0x10 else 0
+        new_short = 1 if (first_byte & 0xC0) == 0x40 else 0
 
-            first_byte = data[0]
-            new_enable = 1 if (first_byte & 0x0C) == 0x04 else 0
-            new_mode = 1 if (first_byte & 0x30) == 0x10 else 0
-            new_short = 1 if (first_byte & 0xC0) == 0x40 else 0
+        try:
+            val_c = (data[3] << 8) | data[2]
+            val_r = (data[5] << 8) | data[4]
+
+            enable_changed = (self.hardware.e_load_enabled != new_enable)
+            mode_changed = (self.hardware.e_load_mode != new_mode)
+            short_changed = (self.hardware.e_load_short != new_short)
+            c_changed = (self.hardware.e_load_csetting != val_c)
+            r_changed = (self.hardware.e_load_rsetting != val_r)
+
+            # Update cached commanded state immediately (used by the dashboard
+            # and by redundant-write suppression).
+            self.hardware.e_load_enabled = new_enable
+            self.hardware.e_load_mode = new_mode
+            self.hardware.e_load_short = new_short
+            if c_changed:
+                self.hardware.e_load_csetting = val_c
+            if r_changed:
+                self.hardware.e_load_rsetting = val_r
+
+            # Build a minimal write list and hold the lock only once.
+            # Order is chosen to avoid unexpected load transients:
+            #   - If disabling: INP OFF first
+            #   - Apply mode/short + relevant setpoint
+            #   - If enabling: INP ON last
+            writes: list[str] = []
+
+            if enable_changed and (not new_enable):
+                writes.append("INP OFF")
+
+            if mode_changed:
+                writes.append("FUNC RES" if new_mode else "FUNC CURR")
+
+            if short_changed:
+                writes.append("INP:SHOR ON" if new_short else "INP:SHOR OFF")
+
+            # Only write the setpoint relevant to the active mode. Also
+            # force a write on mode change to ensure the new subsystem has a
+            # valid setpoint.
+            if new_mode == 0:
+                if c_changed or mode_changed:
+                    writes.append(f"CURR {val_c/1000}")
+            else:
+                if r_changed or mode_changed:
+                    writes.append(f"RES {val_r/1000}")
 
-            try:
-                val_c = (data[3] << 8) | data[2]
-                val_r = (data[5] << 8) | data[4]
-
-                enable_changed = (self.hardware.e_load_enabled != new_enable)
-                mode_changed = (self.hardware.e_load_mode != new_mode)
-                short_changed = (self.hardware.e_load_short != new_short)
-                c_changed = (self.hardware.e_load_csetting != val_c)
-                r_changed = (self.hardware.e_load_rsetting != val_r)
-
-                # Update cached commanded state immediately (used by the dashboard
-                # and by redundant-write suppression).
-                self.hardware.e_load_enabled = new_enable
-                self.hardware.e_load_mode = new_mode
-                self.hardware.e_load_short = new_short
-                if c_changed:
-                    self.hardware.e_load_csetting = val_c
-                if r_changed:
-                    self.hardware.e_load_rsetting = val_r
-
-                # Build a minimal write list and hold the lock only once.
-                # Order is chosen to avoid unexpected load transients:
-                #   - If disabling: INP OFF first
-                #   - Apply mode/short + relevant setpoint
-                #   - If enabling: INP ON last
-                writes: list[str] = []
-
-                if enable_changed and (not new_enable):
-                    writes.append("INP OFF")
-
-                if mode_changed:
-                    writes.append("FUNC RES" if new_mode else "FUNC CURR")
-
-                if short_changed:
-                    writes.append("INP:SHOR ON" if new_short else "INP:SHOR OFF")
-
-                # Only write the setpoint relevant to the active mode. Also
-                # force a write on mode change to ensure the new subsystem has a
-                # valid setpoint.
-                if new_mode == 0:
-                    if c_changed or mode_changed:
-                        writes.append(f"CURR {val_c/1000}")
-                else:
-                    if r_changed or mode_changed:
-                        writes.append(f"RES {val_r/1000}")
+            if enable_changed and new_enable:
+                writes.append("INP ON")
 
-                if enable_changed and new_enable:
-                    writes.append("INP ON")
+            if writes:
+                with self.hardware.eload_lock:
+                    for cmd in writes:
+                        self.hardware.e_load.write(cmd)
+        except Exception:
+            pass
 
-                if writes:
-                    with self.hardware.eload_lock:
-                        for cmd in writes:
-                            self.hardware.e_load.write(cmd)
-            except Exception:
-                pass
+    def _handle_mrsignal(self, data: bytes) -> None:
+        """MrSignal control (MR2.0)."""
+
+        if len(data) < 6:
+            return
+        if not getattr(self.hardware, "mrsignal", None):
             return
 
-        # MrSignal control (MR2.0)
-        if arb == self._mrsignal_ctrl_id:
-            if len(data) < 6:
-                return
-            if not getattr(self.hardware, "mrsignal", None):
-                return
+        enable = (data[0] & 0x01) == 0x01
+        output_select = data[1]  # direct register value (0=mA, 1=V, 4=mV, 6=24V)
+        try:
+            value = _F32.unpack_from(data, 2)[0]
+        except Exception:
+            return
 
-            enable = (data[0] & 0x01) == 0x01
-            output_select = int(data[1])  # direct register value (0=mA, 1=V, 4=mV, 6=24V)
-            try:
-                value = struct.unpack("<f", data[2:6])[0]
-            except Exception:
-                return
+        # Safety: ignore unknown modes (extend later if desired)
+        if output_select not in (0, 1, 4, 6):
+            return
 
-            # Safety: ignore unknown modes (extend later if desired)
-            if output_select not in (0, 1, 4, 6):
-                return
+        try:
+            self.hardware.set_mrsignal(
+                enable=bool(enable),
+                output_select=int(output_select),
+                value=float(value),
+                max_v=float(getattr(config, "MRSIGNAL_MAX_V", 24.0)),
+                max_ma=float(getattr(config, "MRSIGNAL_MAX_MA", 24.0)),
+            )
+        except Exception as e:
+            self._emit("mrsignal.error", f"MrSignal Control Error: {e}")
 
-            try:
-                self.hardware.set_mrsignal(
-                    enable=bool(enable),
-                    output_select=int(output_select),
-                    value=float(value),
-                    max_v=float(getattr(config, "MRSIGNAL_MAX_V", 24.0)),
-                    max_ma=float(getattr(config, "MRSIGNAL_MAX_MA", 24.0)),
-                )
-            except Exception as e:
-                self.log(f"MrSignal Control Error: {e}")
-            return
+
+# device_command_loop polling: after a frame, poll this many times (sleeping
+# _POLL_BACKOFF_S between empty polls) before parking in a blocking get().
+_POLL_IDLE_BUDGET = 64
+_POLL_BACKOFF_S = 0.0002
 
 
 def device_command_loop(
-    cmd_queue: "queue.Queue[tuple[int, bytes]]",
+    cmd_queue: "SpscRing | queue.Queue[tuple[int, bytes]]",
     hardware: "HardwareManager",
     stop_event,
     *,
@@ -668,7 +813,8 @@ def device_command_loop(
     The loop is resilient: any per-frame exception is contained.
 
     Parameters
-    - cmd_queue: receives (arb_id, data) tuples from the CAN RX thread.
+    - cmd_queue: receives (arb_id, data) tuples from the CAN RX thread
+      (normally a SpscRing; any queue.Queue-compatible object works).
     - hardware: "HardwareManager" instance.
     - stop_event: threading.Event used to signal shutdown.
     """
@@ -681,59 +827,81 @@ def device_command_loop(
     #
     # This is especially important when the controller transmits at a higher rate
     # than the physical instruments can accept (SCPI/Modbus/serial writes are
-    # comparatively slow).
-    coalesce_ids = {
-        int(config.RLY_CTRL_ID),
-        int(config.AFG_CTRL_ID),
-        int(config.AFG_CTRL_EXT_ID),
-        int(config.MMETER_CTRL_ID),
-        int(getattr(config, "MMETER_CTRL_EXT_ID", 0x0CFF0601)),
-        int(config.LOAD_CTRL_ID),
-        int(getattr(config, "MRSIGNAL_CTRL_ID", 0x0CFF0800)),
-    }
+    # comparatively slow). Every ID is coalesced last-wins per drained burst.
 
     # Apply in a stable order so dependent frames behave predictably.
-    apply_order = [
-        int(config.RLY_CTRL_ID),
-        int(config.LOAD_CTRL_ID),
-        int(config.AFG_CTRL_ID),
-        int(config.AFG_CTRL_EXT_ID),
-        int(config.MMETER_CTRL_ID),
-        int(getattr(config, "MMETER_CTRL_EXT_ID", 0x0CFF0601)),
-        int(getattr(config, "MRSIGNAL_CTRL_ID", 0x0CFF0800)),
-    ]
+    rly_id = int(config.RLY_CTRL_ID)
+    load_id = int(config.LOAD_CTRL_ID)
+    afg_id = int(config.AFG_CTRL_ID)
+    afg_ext_id = int(config.AFG_CTRL_EXT_ID)
+    mmeter_id = int(config.MMETER_CTRL_ID)
+    mmeter_ext_id = int(getattr(config, "MMETER_CTRL_EXT_ID", 0x0CFF0601))
+    mrsignal_id = int(getattr(config, "MRSIGNAL_CTRL_ID", 0x0CFF0800))
+    apply_order = [rly_id, load_id, afg_id, afg_ext_id, mmeter_id, mmeter_ext_id, mrsignal_id]
+
+    # Watchdog channel per control ID, resolved once (first match wins).
+    watchdog_names: dict[int, str] = {}
+    for arb_id, name in (
+        (rly_id, "k1"),
+        (afg_id, "afg"),
+        (afg_ext_id, "afg"),
+        (mmeter_id, "mmeter"),
+        (mmeter_ext_id, "mmeter"),
+        (load_id, "eload"),
+        (mrsignal_id, "mrsignal"),
+    ):
+        watchdog_names.setdefault(arb_id, name)
+
+    # Hybrid poll/park: rings that expose try_pop() are polled with a short
+    # back-off for a bounded number of idle cycles after traffic, then the loop
+    # parks in a blocking get(). Plain queue.Queue-style objects always park.
+    try_pop = getattr(cmd_queue, "try_pop", None)
+    drain_into = getattr(cmd_queue, "drain_into", None)
+    burst: list = []
+    idle_polls = _POLL_IDLE_BUDGET
 
     while not stop_event.is_set():
-        # Block for at least one command, then drain a small burst and coalesce.
-        try:
-            first_arb, first_data = cmd_queue.get(timeout=0.5)
-        except queue.Empty:
-            continue
-        except Exception:
-            continue
+        # Wait for at least one command, then drain a small burst and coalesce.
+        item = None
+        if try_pop is not None and idle_polls < _POLL_IDLE_BUDGET:
+            item = try_pop()
+            if item is None:
+                idle_polls += 1
+                stop_event.wait(_POLL_BACKOFF_S)
+                continue
+        else:
+            try:
+                item = cmd_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except Exception:
+                continue
+        idle_polls = 0
+
+        # Drain anything currently queued without blocking, in one call when
+        # the queue supports it. This keeps latency low while still allowing
+        # bursts to be collapsed.
+        burst.clear()
+        burst.append(item)
+        if drain_into is not None:
+            drain_into(burst, 1023)
+        else:
+            for _ in range(1023):
+                try:
+                    burst.append(cmd_queue.get_nowait())
+                except queue.Empty:
+                    break
+                except Exception:
+                    break
 
+        # Last frame per ID wins (dict keeps first-seen order for other IDs).
         latest: dict[int, bytes] = {}
-
-        def _record(a: int, d: bytes) -> None:
-            a_i = int(a)
-            if a_i in coalesce_ids:
-                latest[a_i] = bytes(d)
-            else:
-                # Non-coalesced frames are processed immediately.
-                latest[a_i] = bytes(d)
-
-        _record(int(first_arb), bytes(first_data))
-
-        # Drain anything currently queued without blocking.
-        # This keeps latency low while still allowing bursts to be collapsed.
-        for _ in range(1024):
+        for frame in burst:
             try:
-                a, d = cmd_queue.get_nowait()
-                _record(int(a), bytes(d))
-            except queue.Empty:
-                break
+                a, d = frame
+                latest[int(a)] = bytes(d)
             except Exception:
-                break
+                continue
 
         # Apply in deterministic order; then apply any other IDs (unlikely).
         applied = set()
@@ -741,17 +909,8 @@ def device_command_loop(
             if a in latest:
                 try:
                     if watchdog_mark_fn:
-                        if a == int(config.RLY_CTRL_ID):
-                            watchdog_mark_fn("k1")
-                        elif a in (int(config.AFG_CTRL_ID), int(config.AFG_CTRL_EXT_ID)):
-                            watchdog_mark_fn("afg")
-                        elif a in (int(config.MMETER_CTRL_ID), int(getattr(config, "MMETER_CTRL_EXT_ID", 0x0CFF0601))):
-                            watchdog_mark_fn("mmeter")
-                        elif a == int(config.LOAD_CTRL_ID):
-                            watchdog_mark_fn("eload")
-                        elif a == int(getattr(config, "MRSIGNAL_CTRL_ID", 0x0CFF0800)):
-                            watchdog_mark_fn("mrsignal")
-                    proc.handle(int(a), bytes(latest[a]))
+                        watchdog_mark_fn(watchdog_names[a])
+                    proc.handle(a, latest[a])
                 except Exception as e:
                     log_fn(f"Device command error: {e}")
                 applied.add(a)
@@ -761,7 +920,7 @@ def device_command_loop(
             if a in applied:
                 continue
             try:
-                proc.handle(int(a), bytes(d))
+                proc.handle(a, d)
             except Exception as e:
                 log_fn(f"Device command error: {e}")
 
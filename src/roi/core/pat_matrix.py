@@ -12,13 +12,15 @@ frames so the Rich dashboard can display a compact "matrix" bar.
 
 from __future__ import annotations
 
-import builtins
 import re
 import threading
 import time
+from array import array
+from functools import lru_cache
 from importlib.resources import files as resource_files
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
 
 
 # NOTE on IDs:
@@ -40,6 +42,27 @@ PAT_J_BASE_ID = 0x0CFFE727  # PAT_J0 (29-bit ID)
 PAT_J_STRIDE = 0x100
 PAT_J_COUNT = 6
 
+# Raw 29-bit arbitration ID mask (drops SocketCAN EFF/RTR/ERR flag bits).
+_EFF_MASK = 0x1FFFFFFF
+
+# Resolved once: the PAT_J0..PAT_J5 IDs and their slot indexes.
+_PAT_J_IDS = tuple(PAT_J_BASE_ID + (i * PAT_J_STRIDE) for i in range(PAT_J_COUNT))
+_PAT_J_ID_SET = frozenset(_PAT_J_IDS)
+_PAT_J_INDEX = {aid: i for i, aid in enumerate(_PAT_J_IDS)}
+_J_KEYS = tuple(f"J{i}" for i in range(PAT_J_COUNT))
+
+# Each payload byte carries four 2-bit fields (LSB first); decode them with a
+# 256-entry table so a frame costs three lookups instead of 12 shift/masks.
+_BYTE_FIELDS = tuple(tuple((b >> sh) & 0x3 for sh in (0, 2, 4, 6)) for b in range(256))
+_PAD3 = b"\x00\x00\x00"
+
+
+# DBC scanning patterns, compiled once. A message section starts at a line
+# beginning with "BO_"; J0 pin labels are signals named "J0_<nn>_<label>".
+_BO_LINE_RE = re.compile(r"^[ \t]*BO_[^\n]*", re.MULTILINE)
+_BO_J0_RE = re.compile(r"^[ \t]*BO_[^\n]*PAT_J0[^\n]*", re.MULTILINE)
+_SG_J0_RE = re.compile(r"\bSG_[ \t]+J0_(\d{2})_([A-Za-z0-9_]+)[ \t]*:")
+
 
 def _parse_j0_pin_names_from_dbc_text(txt: str) -> Dict[int, str]:
     """Best-effort parse of J0 pin labels from a DBC file (text).
@@ -51,26 +74,18 @@ def _parse_j0_pin_names_from_dbc_text(txt: str) -> Dict[int, str]:
     returning a mapping of {1: "3A_LOAD", 2: "5A_LOAD", ...}.
     """
 
-    in_j0 = False
-    out: Dict[int, str] = {}
-    sig_re = re.compile(r"\bSG_\s+J0_(\d{2})_([A-Za-z0-9_]+)\s*:")
-    for raw in (txt or "").splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        if line.startswith("BO_"):
-            # Enter/exit PAT_J0 section.
-            if "PAT_J0" in line:
-                in_j0 = True
-                continue
-            if in_j0:
-                break
-        if not in_j0:
-            continue
+    txt = txt or ""
+    # Locate the PAT_J0 section with two regex searches rather than walking
+    # every preceding BO_ line in Python.
+    bo = _BO_J0_RE.search(txt)
+    if bo is None:
+        return {}
+    start = bo.end()
+    nxt = _BO_LINE_RE.search(txt, start)
+    end = nxt.start() if nxt is not None else len(txt)
 
-        m = sig_re.search(line)
-        if not m:
-            continue
+    out: Dict[int, str] = {}
+    for m in _SG_J0_RE.finditer(txt, start, end):
         try:
             idx = int(m.group(1))
         except Exception:
@@ -82,8 +97,6 @@ def _parse_j0_pin_names_from_dbc_text(txt: str) -> Dict[int, str]:
     return out
 
 
-
-
 def _parse_j0_pin_names_from_dbc(path: Path) -> Dict[int, str]:
     """Best-effort parse of J0 pin labels from a DBC file on disk.
 
@@ -98,6 +111,8 @@ def _parse_j0_pin_names_from_dbc(path: Path) -> Dict[int, str]:
         return _parse_j0_pin_names_from_dbc_text(txt)
     except Exception:
         return {}
+
+
 def _read_packaged_pat_dbc_text() -> str | None:
     """Read the packaged PAT.dbc (if included in the installed package)."""
     try:
@@ -106,21 +121,26 @@ def _read_packaged_pat_dbc_text() -> str | None:
         return None
 
 
-def j0_pin_names() -> Dict[int, str]:
-    """Return a {pin_index: label} mapping for PAT_J0.
+# Fallback mapping (matches the PAT.dbc in this repo as of Feb 2026).
+_J0_FALLBACK_NAMES: Dict[int, str] = {
+    1: "3A_LOAD",
+    2: "5A_LOAD",
+    3: "7A_LOAD",
+    4: "12A_LOAD",
+    5: "200MA_PULLUP",
+    6: "12MA_PULLUP",
+    7: "GND_LOAD",
+    8: "METER_LOAD",
+    9: "TEST_SUPPLY",
+    10: "MAIN_SUPPLY",
+    11: "FREQ_GEN",
+    12: "PROBE",
+}
 
-    Prefer parsing the packaged PAT.dbc shipped with ROI. Falls back to a small
-    hardcoded mapping if the DBC is missing or doesn't match.
-    """
 
-    # Cache on first call.
-    global _J0_PIN_NAMES  # type: ignore
-    try:
-        cached = _J0_PIN_NAMES  # type: ignore
-        if isinstance(cached, builtins.dict) and cached:
-            return cached.copy()
-    except Exception:
-        pass
+@lru_cache(maxsize=1)
+def _j0_pin_names_impl() -> Mapping[int, str]:
+    """Parse the J0 pin labels once; the result is a read-only view."""
 
     names: Dict[int, str] = {}
     txt = _read_packaged_pat_dbc_text()
@@ -129,34 +149,23 @@ def j0_pin_names() -> Dict[int, str]:
             names = _parse_j0_pin_names_from_dbc_text(txt)
         except Exception:
             names = {}
+    return MappingProxyType(dict(names or _J0_FALLBACK_NAMES))
 
-    if not names:
-        # Fallback mapping (matches the PAT.dbc in this repo as of Feb 2026).
-        names = {
-            1: "3A_LOAD",
-            2: "5A_LOAD",
-            3: "7A_LOAD",
-            4: "12A_LOAD",
-            5: "200MA_PULLUP",
-            6: "12MA_PULLUP",
-            7: "GND_LOAD",
-            8: "METER_LOAD",
-            9: "TEST_SUPPLY",
-            10: "MAIN_SUPPLY",
-            11: "FREQ_GEN",
-            12: "PROBE",
-        }
 
-    try:
-        _J0_PIN_NAMES = names.copy()  # type: ignore
-    except Exception:
-        pass
-    return names.copy()
+def j0_pin_names() -> Dict[int, str]:
+    """Return a {pin_index: label} mapping for PAT_J0.
+
+    Prefer parsing the packaged PAT.dbc shipped with ROI. Falls back to a small
+    hardcoded mapping if the DBC is missing or doesn't match. The parse runs
+    once; each call returns a fresh dict the caller may mutate.
+    """
+
+    return dict(_j0_pin_names_impl())
 
 
-def pat_j_ids() -> set[int]:
+def pat_j_ids() -> frozenset[int]:
     """Return the set of arbitration IDs for PAT_J0..PAT_J5."""
-    return {PAT_J_BASE_ID + (i * PAT_J_STRIDE) for i in range(PAT_J_COUNT)}
+    return _PAT_J_ID_SET
 
 
 def decode_pat_j_payload(data: bytes | bytearray | None) -> List[int]:
@@ -165,21 +174,34 @@ def decode_pat_j_payload(data: bytes | bytearray | None) -> List[int]:
     The 12 values occupy bits 0..23, little-endian (Intel).
     """
 
-    b = bytes(data or b"")
-    b0 = b[0] if len(b) > 0 else 0
-    b1 = b[1] if len(b) > 1 else 0
-    b2 = b[2] if len(b) > 2 else 0
-    u24 = int(b0) | (int(b1) << 8) | (int(b2) << 16)
-    return [(u24 >> (2 * i)) & 0x3 for i in range(12)]
+    if not data:
+        return [0] * 12
+    if len(data) >= 3:
+        b0, b1, b2 = data[0], data[1], data[2]
+    else:
+        b = bytes(data) + _PAD3
+        b0, b1, b2 = b[0], b[1], b[2]
+    if not (b0 | b1 | b2):
+        # Idle frames are all-zero; skip the table unpacking.
+        return [0] * 12
+    t = _BYTE_FIELDS
+    return [*t[b0], *t[b1], *t[b2]]
 
 
 class PatSwitchMatrixState:
     """Thread-safe last-seen snapshot of PAT_J0..PAT_J5."""
 
-    def __init__(self) -> None:
+    def __init__(self, *, clock: Optional[Callable[[], float]] = None) -> None:
         self._lock = threading.Lock()
-        self._vals: Dict[int, List[int]] = {}
-        self._ts: Dict[int, float] = {}
+        # Bound once so per-frame timestamps skip the time.monotonic lookup.
+        self._clock = clock if clock is not None else time.monotonic
+        # Parallel per-slot arrays indexed by J number. Field values are
+        # 2-bit, so each row is a 12-byte array('B') updated in place; a
+        # slot counts as seen once its timestamp is set.
+        self._vals: List[array] = [array("B", bytes(12)) for _ in range(PAT_J_COUNT)]
+        self._ts: List[Optional[float]] = [None] * PAT_J_COUNT
+        # Last raw 24-bit field bytes per slot; repeats skip the decode.
+        self._raw: List[Optional[bytes]] = [None] * PAT_J_COUNT
 
     @staticmethod
     def _id_to_index(arb_id: int) -> Optional[int]:
@@ -187,18 +209,12 @@ class PatSwitchMatrixState:
             # Mask to a raw 29-bit arbitration ID. This makes us tolerant of
             # backends that might pass a SocketCAN-style "can_id" with flags
             # (e.g. EFF=0x8000_0000) mixed into the integer.
-            aid = int(arb_id) & 0x1FFFFFFF
+            aid = int(arb_id) & _EFF_MASK
         except Exception:
             return None
-        d = aid - int(PAT_J_BASE_ID)
-        if d < 0:
-            return None
-        if (d % int(PAT_J_STRIDE)) != 0:
-            return None
-        idx = d // int(PAT_J_STRIDE)
-        if 0 <= idx < int(PAT_J_COUNT):
-            return int(idx)
-        return None
+        # Most bus traffic is not PAT_Jx; the table lookup rejects it without
+        # any arithmetic.
+        return _PAT_J_INDEX.get(aid)
 
     def maybe_update(self, arb_id: int, data: bytes | bytearray | None, ts: float | None = None) -> bool:
         """Update state if this is a PAT_J0..PAT_J5 frame.
@@ -206,29 +222,34 @@ class PatSwitchMatrixState:
         Returns True if the frame was recognized and captured.
         """
 
-        idx = self._id_to_index(arb_id)
+        # Plain ints (all real traffic, flagged IDs included) need one masked
+        # table lookup, and most of them miss it. Only other types (odd
+        # int-likes, unhashable junk) take the general path.
+        if type(arb_id) is int:
+            idx = _PAT_J_INDEX.get(arb_id & _EFF_MASK)
+        else:
+            idx = self._id_to_index(arb_id)
         if idx is None:
             return False
 
-        vals = decode_pat_j_payload(data)
-        t = float(ts if ts is not None else time.monotonic())
+        raw = bytes(data[:3]) if data else b""
+        t = self._clock() if ts is None else float(ts)
         with self._lock:
-            self._vals[idx] = vals
+            if self._raw[idx] != raw:
+                self._vals[idx][:] = array("B", decode_pat_j_payload(raw))
+                self._raw[idx] = raw
             self._ts[idx] = t
         return True
 
     def snapshot(self) -> Dict[str, Dict[str, object]]:
         """Return a snapshot keyed by 'J0'..'J5'."""
 
-        now = time.monotonic()
-        out: Dict[str, Dict[str, object]] = {}
+        now = self._clock()
+        # Copy under the lock, then build the result dict without holding it.
         with self._lock:
-            for i in range(int(PAT_J_COUNT)):
-                vals = self._vals.get(i)
-                ts = self._ts.get(i)
-                age = None if ts is None else (now - float(ts))
-                out[f"J{i}"] = {
-                    "vals": list(vals) if isinstance(vals, list) else None,
-                    "age": age,
-                }
-        return out
+            stamps = self._ts.copy()
+            rows = [None if ts is None else vals.tolist() for vals, ts in zip(self._vals, stamps)]
+        return {
+            key: {"vals": row, "age": None if ts is None else (now - ts)}
+            for key, row, ts in zip(_J_KEYS, rows, stamps)
+        }
@@ -4,7 +4,8 @@ from __future__ import annotations
 import inspect
 import math
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 import serial  # pyserial
 import minimalmodbus
@@ -34,8 +35,12 @@ def call_compat(func, *args, **kwargs):
     return func(*args, **filtered)
 
 
-def available_byteorders():
-    """Return list of (name, value) for byteorder constants available in this minimalmodbus."""
+@lru_cache(maxsize=1)
+def available_byteorders() -> Tuple[Tuple[str, object], ...]:
+    """Return (name, value) pairs for byteorder constants available in this minimalmodbus.
+
+    The installed library doesn't change at runtime, so the scan is cached.
+    """
     names = (
         "BYTEORDER_BIG",
         "BYTEORDER_LITTLE",
@@ -54,7 +59,7 @@ def available_byteorders():
         if v not in seen:
             uniq.append((n, v))
             seen.add(v)
-    return uniq
+    return tuple(uniq)
 
 
 def get_byteorder_by_name(name: str | None):
@@ -111,6 +116,9 @@ class MrSignalClient:
 
         self.inst: Optional[minimalmodbus.Instrument] = None
         self._last_used_bo: str = "DEFAULT"
+        # Sane auto-detect reads per byteorder name; orders the rescan so the
+        # device's usual byteorder is tried first.
+        self._bo_hits: Dict[str, int] = {}
 
     def connect(self) -> None:
         inst = minimalmodbus.Instrument(self.port, self.slave_id, mode=minimalmodbus.MODE_RTU)
@@ -137,6 +145,12 @@ class MrSignalClient:
             raise RuntimeError("MrSignal not connected")
         return int(call_compat(self.inst.read_register, reg_addr, 0, functioncode=3, signed=signed))
 
+    def _read_u16_block(self, reg_addr: int, count: int) -> List[int]:
+        """Read ``count`` consecutive holding registers in one transaction."""
+        if not self.inst:
+            raise RuntimeError("MrSignal not connected")
+        return [int(v) for v in call_compat(self.inst.read_registers, reg_addr, int(count), functioncode=3)]
+
     def _write_u16(self, reg_addr: int, value: int, *, signed: bool = False) -> None:
         if not self.inst:
             raise RuntimeError("MrSignal not connected")
@@ -148,6 +162,10 @@ class MrSignalClient:
 
         # If we previously discovered a working byteorder during auto-detect,
         # try it first to avoid re-scanning the full set on every poll.
+        prev = "DEFAULT"
+        # Set only when prev read cleanly but decoded to garbage; a read that
+        # raised (timeout, CRC) says nothing about the byteorder.
+        prev_insane = False
         if self.float_byteorder_auto and (not self.float_byteorder):
             prev = (self._last_used_bo or "DEFAULT").strip() or "DEFAULT"
             if prev != "DEFAULT":
@@ -160,7 +178,9 @@ class MrSignalClient:
                         else:
                             v = float(call_compat(self.inst.read_float, reg_addr, functioncode=3, number_of_registers=2, byteorder=bo_prev))
                         if is_sane_float(v):
+                            self._bo_hits[prev] = self._bo_hits.get(prev, 0) + 1
                             return v, prev
+                        prev_insane = True
                     except Exception:
                         pass
 
@@ -182,7 +202,11 @@ class MrSignalClient:
 
         # Auto-detect if enabled
         if self.float_byteorder_auto:
-            for name, bo in available_byteorders():
+            hits = self._bo_hits
+            # sorted() is stable, so without history the library order holds.
+            for name, bo in sorted(available_byteorders(), key=lambda nv: -hits.get(nv[0], 0)):
+                if prev_insane and name == prev:
+                    continue  # just read fine above, but not sane
                 try:
                     if hasattr(self.inst, "byteorder"):
                         self.inst.byteorder = bo
@@ -191,6 +215,7 @@ class MrSignalClient:
                         v = float(call_compat(self.inst.read_float, reg_addr, functioncode=3, number_of_registers=2, byteorder=bo))
                     if is_sane_float(v):
                         self._last_used_bo = name
+                        hits[name] = hits.get(name, 0) + 1
                         return v, name
                 except Exception:
                     continue
@@ -229,8 +254,10 @@ class MrSignalClient:
         bo = self._last_used_bo or "DEFAULT"
 
         dev_id = self._read_u16(REG_ID, signed=False)
-        out_on = bool(self._read_u16(REG_OUTPUT_ON, signed=False))
-        out_sel = int(self._read_u16(REG_OUTPUT_SELECT, signed=False))
+        # Output enable and mode select are adjacent; fetch both in a single
+        # round-trip (each serial transaction costs a line turnaround).
+        out_on_raw, out_sel = self._read_u16_block(REG_OUTPUT_ON, 2)
+        out_on = bool(out_on_raw)
 
         try:
             out_val, bo = self._read_float(REG_OUTPUT_VALUE_FLOAT)
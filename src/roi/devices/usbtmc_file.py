@@ -15,7 +15,7 @@ uses (`write`, `read`, `query`, `close`, plus a `timeout` attribute).
 This code is intentionally conservative:
   - ASCII encoding with replacement on decode
   - single-threaded per-device use (ROI already uses locks)
-  - bounded reads with select()-based timeouts
+  - bounded reads with poll()/select()-based timeouts
 """
 
 from __future__ import annotations
@@ -23,8 +23,43 @@ from __future__ import annotations
 import os
 import select
 import time
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+# Bytes requested per read, and the response size after which read() gives up
+# waiting for a termination (guards against a misbehaving instrument).
+_READ_CHUNK = 4096
+_READ_CAP = 256 * 1024
+
+# The device is opened non-blocking where the platform has the flag, so a
+# wake-up can drain every queued chunk and stop at EAGAIN instead of polling
+# again per chunk.
+_O_NONBLOCK = getattr(os, "O_NONBLOCK", 0)
+
+
+# Encoded terminations shared by all instances, keyed by (text, errors).
+# Only a handful of distinct terminators ever occur ("\n", "\r\n", "").
+_TERM_CACHE: Dict[Tuple[str, str], bytes] = {}
+
+
+def _term_bytes(term: Optional[str], errors: str) -> bytes:
+    key = (term or "", errors)
+    b = _TERM_CACHE.get(key)
+    if b is None:
+        b = _TERM_CACHE[key] = key[0].encode("ascii", errors=errors)
+    return b
+
+
+def _decode_trimmed(view: memoryview, end: int) -> str:
+    """Decode view[:end] without trailing CR/LF.
+
+    The trim happens on the bytes first (ASCII decoding never produces CR/LF
+    from other bytes), so the terminator is never decoded at all.
+    """
+    while end and view[end - 1] in (10, 13):
+        end -= 1
+    return str(view[:end], "ascii", "replace")
 
 
 class UsbTmcError(Exception):
@@ -35,7 +70,7 @@ class UsbTmcTimeout(UsbTmcError, TimeoutError):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class UsbTmcFileInstrument:
     """A tiny SCPI I/O wrapper around a /dev/usbtmc* character device."""
 
@@ -44,16 +79,50 @@ class UsbTmcFileInstrument:
     read_termination: str = "\n"
     write_termination: str = "\n"
 
+    # Internal state, set up in __post_init__. Declared so the slotted class
+    # has room for it (no per-instance __dict__).
+    _fd: Optional[int] = field(init=False, repr=False, compare=False)
+    _rbuf: bytearray = field(init=False, repr=False, compare=False)
+    _rview: memoryview = field(init=False, repr=False, compare=False)
+    _readv: Optional[Callable[..., int]] = field(init=False, repr=False, compare=False)
+    _wterm_src: Optional[str] = field(init=False, repr=False, compare=False)
+    _wterm_b: bytes = field(init=False, repr=False, compare=False)
+    _rterm_src: Optional[str] = field(init=False, repr=False, compare=False)
+    _rterm_b: bytes = field(init=False, repr=False, compare=False)
+    _poller: Any = field(init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
-        self._fd: Optional[int] = None
+        self._fd = None
+        # Fixed response buffer (cap + one chunk, so it never resizes). Chunks
+        # land in place via os.readv where available; elsewhere os.read's
+        # result is copied into the next free slice.
+        self._rbuf = bytearray(_READ_CAP + _READ_CHUNK)
+        self._rview = memoryview(self._rbuf)
+        self._readv = getattr(os, "readv", None)
+        # Encoded terminations, re-derived only when the public str
+        # attributes are reassigned. Seeded here so the first write()/read()
+        # already takes the identity-check fast path.
+        self._wterm_src = self.write_termination
+        self._wterm_b = _term_bytes(self._wterm_src, "replace")
+        self._rterm_src = self.read_termination
+        self._rterm_b = _term_bytes(self._rterm_src, "ignore")
 
-        # Open read/write so we can do SCPI queries.
-        # Keep it blocking; we use select() to bound read time.
+        # Open read/write so we can do SCPI queries. Non-blocking: every
+        # wait is bounded by poll()/select() and the timeout instead.
         try:
-            self._fd = os.open(self.path, os.O_RDWR)
+            self._fd = os.open(self.path, os.O_RDWR | _O_NONBLOCK)
         except Exception as e:
             raise UsbTmcError(f"Failed to open {self.path}: {e}") from e
 
+        # Register the fd with a poll object once; each wait is then a single
+        # poll() call with no fd lists to build. select() remains the
+        # fallback where poll is unavailable (Windows).
+        self._poller = None
+        poll = getattr(select, "poll", None)
+        if poll is not None:
+            self._poller = poll()
+            self._poller.register(self._fd, select.POLLIN)
+
     @property
     def fd(self) -> int:
         if self._fd is None:
@@ -61,6 +130,7 @@ class UsbTmcFileInstrument:
         return int(self._fd)
 
     def close(self) -> None:
+        self._poller = None
         if self._fd is not None:
             try:
                 os.close(self._fd)
@@ -70,62 +140,162 @@ class UsbTmcFileInstrument:
     def write(self, cmd: str) -> None:
         if cmd is None:
             return
-        s = str(cmd)
-        term = self.write_termination or ""
-        if term and not s.endswith(term):
-            s += term
-        data = s.encode("ascii", errors="replace")
+        term = self.write_termination
+        if term is not self._wterm_src:
+            self._wterm_src = term
+            self._wterm_b = _term_bytes(term, "replace")
+        data = str(cmd).encode("ascii", errors="replace")
+        tb = self._wterm_b
+        if tb and not data.endswith(tb):
+            data += tb
         try:
-            os.write(self.fd, data)
+            fd = self.fd
+            # One deadline for the whole write, however many EAGAIN waits it
+            # takes (integer ns, as in read()).
+            clock = time.monotonic_ns
+            deadline = clock() + max(0, round(self.timeout * 1_000_000))
+            n = 0
+            while n < len(data):
+                try:
+                    # After a short write, push the rest through a zero-copy view.
+                    k = os.write(fd, memoryview(data)[n:] if n else data)
+                except BlockingIOError:
+                    # Driver queue full: wait for room, for what is left of
+                    # the timeout.
+                    remaining = deadline - clock()
+                    if remaining <= 0 or not select.select([], [fd], [], remaining / 1e9)[1]:
+                        raise OSError(f"timed out after {n}/{len(data)} bytes") from None
+                    continue
+                if k <= 0:
+                    raise OSError(f"no progress after {n}/{len(data)} bytes")
+                n += k
         except Exception as e:
             raise UsbTmcError(f"Write failed ({self.path}): {e}") from e
 
     def read(self) -> str:
         """Read until `read_termination` (if set) or until timeout."""
 
-        term = (self.read_termination or "").encode("ascii", errors="ignore")
+        # Bounded by _READ_CAP, the chunks are laid out contiguously from the
+        # start of the buffer, so the response is view[:stop].
+        stop = 0
+        for _start, stop in self._chunks(_READ_CAP):
+            pass
+        return _decode_trimmed(self._rview, stop)
+
+    def read_iter(self, max_bytes: Optional[int] = None) -> Iterator[memoryview]:
+        """Yield the response chunk by chunk as it arrives.
+
+        Stops after the chunk holding `read_termination` (cut just past it),
+        at EOF, or once more than `max_bytes` have been read (unbounded by
+        default; the timeout still applies to the whole response). Meant for
+        large binary transfers: memory stays at the fixed buffer no matter how
+        long the response is.
+
+        Each chunk is a view into the instrument's read buffer and is only
+        valid until the next one is requested; copy it (``bytes(chunk)``) to
+        keep it.
+        """
+
+        view = self._rview
+        for start, stop in self._chunks(max_bytes):
+            yield view[start:stop]
+
+    def _chunks(self, limit: Optional[int]) -> Iterator[Tuple[int, int]]:
+        """Read chunks into the buffer, yielding each one's (start, stop)."""
+
+        rt = self.read_termination
+        if rt is not self._rterm_src:
+            self._rterm_src = rt
+            self._rterm_b = _term_bytes(rt, "ignore")
+        term = self._rterm_b
         want_term = bool(term)
+        # Bytes carried over when the buffer wraps, so a terminator split
+        # across the wrap is still found.
+        keep = max(0, len(term) - 1)
 
-        deadline = time.monotonic() + max(0.0, float(self.timeout) / 1000.0)
-        buf = bytearray()
+        # Resolve per-call state once; the loop below runs per chunk.
+        fd = self.fd
+        # Integer nanoseconds: no float arithmetic per chunk. `timeout` is
+        # in ms and may be fractional.
+        clock = time.monotonic_ns
+        remaining = max(0, round(self.timeout * 1_000_000))
+        deadline = clock() + remaining
+        poller = self._poller
+        readv = self._readv
+        buf = self._rbuf
+        view = self._rview
+        wrap_at = len(buf) - _READ_CHUNK
+        pos = 0
+        total = 0
 
         while True:
-            remaining = deadline - time.monotonic()
+            # The first pass uses the full timeout; the clock is only read
+            # again after a chunk arrives without completing the response.
             if remaining <= 0:
                 raise UsbTmcTimeout(f"Read timeout on {self.path}")
 
             try:
-                r, _w, _x = select.select([self.fd], [], [], remaining)
+                if poller is not None:
+                    # poll() takes whole milliseconds; round up so a sub-ms
+                    # remainder doesn't turn into a non-blocking check.
+                    r = poller.poll(-(-remaining // 1_000_000))
+                else:
+                    r, _w, _x = select.select([fd], [], [], remaining / 1e9)
             except Exception as e:
-                raise UsbTmcError(f"select() failed ({self.path}): {e}") from e
+                raise UsbTmcError(f"Waiting for data failed ({self.path}): {e}") from e
 
             if not r:
                 raise UsbTmcTimeout(f"Read timeout on {self.path}")
 
-            try:
-                chunk = os.read(self.fd, 4096)
-            except Exception as e:
-                raise UsbTmcError(f"Read failed ({self.path}): {e}") from e
+            # Drain what is queued; a full chunk suggests more is waiting, so
+            # read again (non-blocking) until EAGAIN before the next wait.
+            while True:
+                if pos > wrap_at:
+                    # Only reachable when streaming past _READ_CAP: earlier
+                    # chunks have been handed out, so start over at the front.
+                    buf[:keep] = buf[pos - keep : pos]
+                    pos = keep
+
+                try:
+                    if readv is not None:
+                        n = readv(fd, [view[pos : pos + _READ_CHUNK]])
+                    else:
+                        chunk = os.read(fd, _READ_CHUNK)
+                        n = len(chunk)
+                        buf[pos : pos + n] = chunk
+                except BlockingIOError:
+                    # Nothing queued after all; go back to waiting.
+                    break
+                except Exception as e:
+                    raise UsbTmcError(f"Read failed ({self.path}): {e}") from e
+
+                if not n:
+                    # EOF / device vanished
+                    return
+
+                start = pos
+                pos += n
+                total += n
 
-            if not chunk:
-                # EOF / device vanished
-                break
+                if want_term:
+                    # Only the new bytes (plus a term-length overlap for a
+                    # split terminator) can hold the first termination.
+                    i = buf.find(term, max(0, start - keep), pos)
+                    if i >= 0:
+                        # Stop just past the first termination.
+                        yield start, i + len(term)
+                        return
 
-            buf.extend(chunk)
+                yield start, pos
 
-            if want_term and term in buf:
-                # Return up to (and including) the first termination.
-                i = buf.index(term) + len(term)
-                out = bytes(buf[:i])
-                return out.decode("ascii", errors="replace").rstrip("\r\n")
+                # Safety cap to avoid unbounded growth if the instrument misbehaves.
+                if limit is not None and total > limit:
+                    return
 
-            # Safety cap to avoid unbounded growth if the instrument misbehaves.
-            if len(buf) > 256 * 1024:
-                out = bytes(buf)
-                return out.decode("ascii", errors="replace").rstrip("\r\n")
+                if n < _READ_CHUNK or not _O_NONBLOCK:
+                    break
 
-        # No termination seen; return whatever we got.
-        return bytes(buf).decode("ascii", errors="replace").rstrip("\r\n")
+            remaining = deadline - clock()
 
     def query(self, cmd: str) -> str:
         self.write(cmd)
@@ -14,6 +14,9 @@ import time
 from .. import config
 from ..devices.mrsignal import MrSignalClient
 
+# Sleep seam: tests replace this instead of patching the shared time module.
+_SLEEP = time.sleep
+
 
 def _fmt_opt(x) -> str:
     if x is None:
@@ -128,7 +131,7 @@ def main() -> int:
             )
 
             if i + 1 < reads:
-                time.sleep(max(0.0, float(args.interval)))
+                _SLEEP(max(0.0, float(args.interval)))
 
         return 0
 
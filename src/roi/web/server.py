@@ -826,6 +826,12 @@ class _Context:
 class _Handler(BaseHTTPRequestHandler):
     server: _ServerWithContext  # type: ignore[assignment]
 
+    # Every response carries Content-Length, so HTTP/1.1 keep-alive is safe and
+    # lets the polling page reuse one connection. Idle connections are dropped
+    # after `timeout` seconds so they don't pin handler threads.
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+
     def log_message(self, format: str, *args) -> None:  # noqa: A003
         # Silence the default per-request logging. ROI already has its own logs.
         return
@@ -921,6 +927,9 @@ class WebDashboardServer:
         self._context = _Context(cfg=cfg, get_snapshot=get_snapshot, log_fn=log_fn)
         self._server: Optional[_ServerWithContext] = None
         self._thread: Optional[threading.Thread] = None
+        # Set once the serve loop is about to run (the socket is bound and
+        # listening before start() returns).
+        self._ready = threading.Event()
 
     @property
     def is_running(self) -> bool:
@@ -931,6 +940,7 @@ class WebDashboardServer:
             return
 
         # Bind early so we fail fast with a useful error message.
+        self._ready.clear()
         addr = (str(self.cfg.host), int(self.cfg.port))
         self._server = _ServerWithContext(addr, _Handler, context=self._context)
 
@@ -938,6 +948,7 @@ class WebDashboardServer:
             assert self._server is not None
             host, port = self._server.server_address[:2]
             self._context.log(f"[web] dashboard: http://{host}:{port}")
+            self._ready.set()
             try:
                 self._server.serve_forever(poll_interval=0.5)
             finally:
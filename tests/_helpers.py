@@ -0,0 +1,149 @@
+"""Shared test helpers (plain objects; fixtures live in conftest.py)."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Iterable, Optional
+
+
+class FakeClock:
+    """Deterministic stand-in for ``time.monotonic``.
+
+    The clock first replays ``steps`` (if given), then keeps returning the
+    current time, advancing by ``dt`` after every call. It never raises
+    StopIteration, so loops that read the clock more often than expected stay
+    well-defined.
+    """
+
+    def __init__(self, start: float = 0.0, *, dt: float = 0.0, steps: Optional[Iterable[float]] = None) -> None:
+        self.t = float(start)
+        self.dt = float(dt)
+        self._steps = [float(s) for s in (steps or ())]
+        self._i = 0
+
+    def advance(self, dt: float) -> None:
+        self.t += float(dt)
+
+    def __call__(self) -> float:
+        if self._i < len(self._steps):
+            self.t = self._steps[self._i]
+            self._i += 1
+            return self.t
+        now = self.t
+        self.t += self.dt
+        return now
+
+
+class FakeCanBus:
+    """python-can bus stand-in that records sent frames and never receives."""
+
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.closed = False
+
+    def send(self, msg) -> None:
+        self.sent.append(msg)
+
+    def recv(self, timeout: float = 0.0):
+        return None
+
+    def shutdown(self) -> None:
+        self.closed = True
+
+
+class FakeSerialPort:
+    """pyserial ``Serial`` stand-in; accepts any constructor args."""
+
+    def __init__(self, *a, **k) -> None:
+        pass
+
+    def reset_input_buffer(self) -> None:
+        return None
+
+    def reset_output_buffer(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class FakeMrSignalClient:
+    """Read-only MrSignalClient stand-in; any output change fails the test."""
+
+    # Shared by every read; the diagnostics only format it.
+    status = SimpleNamespace(
+        device_id=77,
+        output_on=True,
+        output_select=1,
+        output_value=5.0,
+        input_value=4.95,
+        float_byteorder="DEFAULT",
+        mode_label="V",
+    )
+
+    def __init__(self, *a, **k) -> None:
+        self.connected = False
+        self.closed = False
+
+    def connect(self) -> None:
+        self.connected = True
+
+    def close(self) -> None:
+        self.closed = True
+
+    def read_status(self):
+        return self.status
+
+    def set_enable(self, enable):  # pragma: no cover - must not be called
+        raise AssertionError("set_enable should not be called")
+
+    def set_output(self, *, enable, output_select, value):  # pragma: no cover
+        raise AssertionError("set_output should not be called")
+
+
+class FakeBK:
+    """BK5491B stand-in for the meter diagnostics.
+
+    Every query answers "OK" except ``*IDN?`` and ``:FUNCtion?``. Error
+    injection is configured through class attributes so a variant can be
+    handed to code that constructs the driver itself (see ``fake_bk``):
+    ``fail_cmd`` reports ``error`` on the drain after that command and
+    ``fail_drain`` reports it on the n-th drain (1-based).
+    """
+
+    idn = "5491B  Multimeter,Ver1.4.14.06.18,124G21119"
+    error = "-113,BUS: BAD COMMAND"
+    fail_cmd: Optional[str] = None
+    fail_drain: Optional[int] = None
+
+    def __init__(self, ser, log_fn=print) -> None:
+        self.last_cmd = ""
+        self._drain_n = 0
+
+    def query_line(self, cmd, delay_s=0.0, read_lines=6, clear_input=True):
+        self.last_cmd = str(cmd)
+        q = self.last_cmd.strip().upper()
+        if q == "*IDN?":
+            return self.idn
+        if q == ":FUNCTION?":
+            return "CURR:DC"
+        return "OK"
+
+    def write(self, cmd, delay_s=0.0, clear_input=False) -> None:
+        self.last_cmd = str(cmd)
+
+    def fetch_values(self, cmd, delay_s=0.0, read_lines=6):
+        return SimpleNamespace(primary=1.0, secondary=None, raw="1.0")
+
+    def drain_errors(self, max_n=16, log=True):
+        self._drain_n += 1
+        if self.fail_drain is not None and self._drain_n == self.fail_drain:
+            return [self.error]
+        if self.fail_cmd is not None and self.last_cmd.strip().upper() == self.fail_cmd.upper():
+            return [self.error]
+        return ["0,No error"]
+
+
+def fake_bk(**attrs) -> type:
+    """Return a ``FakeBK`` subclass with the given class attributes."""
+    return type("FakeBK", (FakeBK,), attrs) if attrs else FakeBK
@@ -8,10 +8,14 @@ be imported and exercised in CI/container environments.
 
 from __future__ import annotations
 
+import os
+import select
 import sys
 import types
 from pathlib import Path
 
+import pytest
+
 
 # Ensure src/ is importable (src layout).
 ROOT = Path(__file__).resolve().parents[1]
@@ -89,6 +93,9 @@ class _StubInstrument:
     def read_register(self, registeraddress: int, number_of_decimals: int = 0, *, functioncode: int = 3, signed: bool = False):
         return 0
 
+    def read_registers(self, registeraddress: int, number_of_registers: int, *, functioncode: int = 3):
+        return [0] * number_of_registers
+
     def write_register(self, registeraddress: int, value: int, *, functioncode: int = 6, signed: bool = False):
         return None
 
@@ -118,10 +125,12 @@ class Message:
         arbitration_id: int,
         data=None,
         is_extended_id: bool = False,
+        timestamp: float = 0.0,
     ) -> None:
         self.arbitration_id = arbitration_id
         self.data = data
         self.is_extended_id = is_extended_id
+        self.timestamp = timestamp
 
 
 can_stub.BusABC = BusABC
@@ -148,3 +157,88 @@ def _default_bus_factory(**kwargs):
 
 can_stub.interface = types.SimpleNamespace(Bus=_default_bus_factory)
 _install_stub("can", can_stub)
+
+
+# --- Fixtures -----------------------------------------------------------------
+
+
+@pytest.fixture
+def usbtmc_os(monkeypatch):
+    """Fake the os/select calls behind UsbTmcFileInstrument.
+
+    Tests steer the fake through the returned namespace: ``reads`` is consumed
+    by ``os.read``/``os.readv`` (b"" once empty; long entries are handed out
+    in request-sized pieces; exception entries are raised), ``ready`` decides
+    whether poll/select report data, ``wait_error``/``read_error`` (if set)
+    are raised by the waits and the reads, and ``written``/``opened``/
+    ``closed``/``flags`` record the traffic.
+    """
+
+    st = types.SimpleNamespace(
+        fd=3,
+        flags=None,
+        reads=[],
+        ready=True,
+        wait_error=None,
+        read_error=None,
+        written=[],
+        opened=[],
+        closed=[],
+        poll_timeouts=[],
+    )
+
+    def fake_open(path, flags):
+        st.opened.append(path)
+        st.flags = flags
+        return st.fd
+
+    def fake_write(fd, data):
+        assert fd == st.fd
+        st.written.append(bytes(data))
+        return len(data)
+
+    def fake_read(fd, n):
+        assert fd == st.fd
+        if st.read_error is not None:
+            raise st.read_error
+        if not st.reads:
+            return b""
+        data = st.reads.pop(0)
+        if isinstance(data, BaseException):
+            raise data
+        if len(data) > n:
+            st.reads.insert(0, data[n:])
+        return data[:n]
+
+    def fake_readv(fd, buffers):
+        (dst,) = buffers
+        data = fake_read(fd, len(dst))
+        dst[: len(data)] = data
+        return len(data)
+
+    def fake_select(r, w, x, timeout):
+        if st.wait_error is not None:
+            raise st.wait_error
+        return (r, w, []) if st.ready else ([], [], [])
+
+    class FakePoll:
+        def register(self, fd, mask):
+            assert fd == st.fd
+
+        def poll(self, timeout_ms):
+            st.poll_timeouts.append(timeout_ms)
+            if st.wait_error is not None:
+                raise st.wait_error
+            return [(st.fd, 1)] if st.ready else []
+
+    monkeypatch.setattr(os, "open", fake_open)
+    monkeypatch.setattr(os, "close", st.closed.append)
+    monkeypatch.setattr(os, "write", fake_write)
+    monkeypatch.setattr(os, "read", fake_read)
+    monkeypatch.setattr(os, "readv", fake_readv, raising=False)
+    monkeypatch.setattr(select, "select", fake_select)
+    # Windows has no select.poll; provide it there too so the poll path runs
+    # everywhere (likewise os.readv). Fallback tests delete them again.
+    monkeypatch.setattr(select, "poll", FakePoll, raising=False)
+    monkeypatch.setattr(select, "POLLIN", 1, raising=False)
+    return st
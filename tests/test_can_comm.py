@@ -174,6 +174,20 @@ def test_tx_state_clear_meter_current():
     assert s.snapshot()[0] is None
 
 
+def test_tx_state_snapshot_reused_until_changed():
+    from roi.can import comm as can_comm
+
+    s = can_comm.OutgoingTxState()
+    first = s.snapshot()
+    assert s.snapshot() is first
+
+    s.update_eload(1, 2)
+    second = s.snapshot()
+    assert second is not first
+    assert second[5:7] == (1, 2)
+    assert s.snapshot() is second
+
+
 def test_can_tx_loop_period_disabled_logs():
     from roi.can import comm as can_comm
 
@@ -606,6 +620,46 @@ def test_can_rx_loop_put_nowait_generic_exception(monkeypatch):
     can_comm.can_rx_loop(Bus(), Q(), stop, WD(), pat_matrix=None, busload=None, log_fn=lambda s: None)
 
 
+def test_can_rx_loop_ring_evicts_oldest_without_popping(monkeypatch):
+    """With a SpscRing, RX only pushes; the ring itself drops the oldest."""
+    from roi.can import comm as can_comm
+    from roi.core.device_comm import SpscRing
+    import roi.config as config
+    import can
+
+    rly = int(config.RLY_CTRL_ID)
+    msgs = [can.Message(arbitration_id=rly, data=bytes([i]), is_extended_id=True) for i in range(3)]
+    stop = threading.Event()
+
+    class Bus:
+        def recv(self, timeout=1.0):
+            if not msgs:
+                stop.set()
+                return None
+            return msgs.pop(0)
+
+    class Ring(SpscRing):
+        def try_pop(self):  # pragma: no cover - must not be called
+            raise AssertionError("RX must not consume from the ring")
+
+    class WD:
+        def mark(self, name):
+            return None
+
+    ring = Ring(maxsize=2)
+    can_comm.can_rx_loop(Bus(), ring, stop, WD(), pat_matrix=None, busload=None, log_fn=lambda s: None)
+    assert list(ring._items) == [(rly, b"\x01"), (rly, b"\x02")]
+
+    # A failing push counts as a dropped frame and doesn't stop RX.
+    class BadRing(SpscRing):
+        def push_drop_oldest(self, item):
+            raise RuntimeError("boom")
+
+    msgs.append(can.Message(arbitration_id=rly, data=b"\x00", is_extended_id=True))
+    stop.clear()
+    can_comm.can_rx_loop(Bus(), BadRing(), stop, WD(), pat_matrix=None, busload=None, log_fn=lambda s: None)
+
+
 def test_shutdown_can_interface_breaks_on_first_success(monkeypatch):
     """Cover the shutdown_can_interface() success + break path."""
     import roi.config as config
@@ -660,3 +714,72 @@ def test_can_tx_loop_busload_exceptions_in_each_branch(monkeypatch):
 
     can_comm.can_tx_loop(bus, state, stop, period_s=0.01, busload=AlwaysBoomBusLoad(), log_fn=lambda s: None)
     assert len(bus.sent) == 7
+
+
+def test_can_tx_loop_realtime_flag_calls_enable(monkeypatch):
+    from roi.can import comm as can_comm
+    import roi.config as config
+
+    calls = []
+
+    def fake_enable(prio, *, log_fn=print):
+        calls.append(prio)
+        return True
+
+    monkeypatch.setattr(can_comm, "_enable_realtime", fake_enable)
+    monkeypatch.setattr(config, "CAN_TX_REALTIME", True, raising=False)
+    monkeypatch.setattr(config, "CAN_TX_REALTIME_PRIORITY", 42, raising=False)
+
+    stop = threading.Event()
+    stop.set()
+    logs: list[str] = []
+    can_comm.can_tx_loop(FakeBus(), can_comm.OutgoingTxState(), stop, period_s=0.01, log_fn=logs.append)
+    assert calls == [42]
+    assert any("realtime scheduling enabled" in m for m in logs)
+
+    # Explicit realtime=False wins over config.
+    calls.clear()
+    can_comm.can_tx_loop(FakeBus(), can_comm.OutgoingTxState(), stop, period_s=0.01, log_fn=logs.append, realtime=False)
+    assert calls == []
+
+
+def test_enable_realtime_success_and_failure(monkeypatch):
+    import ctypes
+    import os
+
+    from roi.can import comm as can_comm
+
+    sched = {}
+    monkeypatch.setattr(os, "SCHED_FIFO", 1, raising=False)
+    monkeypatch.setattr(os, "sched_get_priority_min", lambda policy: 1, raising=False)
+    monkeypatch.setattr(os, "sched_get_priority_max", lambda policy: 99, raising=False)
+    monkeypatch.setattr(os, "sched_param", lambda prio: prio, raising=False)
+    monkeypatch.setattr(os, "sched_setscheduler", lambda pid, policy, param: sched.update(pid=pid, prio=param), raising=False)
+
+    class FakeLibc:
+        def __init__(self, rc):
+            self.rc = rc
+            self.flags = None
+
+        def mlockall(self, flags):
+            self.flags = flags
+            return self.rc
+
+    libc = FakeLibc(0)
+    monkeypatch.setattr(ctypes, "CDLL", lambda *a, **k: libc)
+    logs: list[str] = []
+    assert can_comm._enable_realtime(500, log_fn=logs.append) is True
+    assert sched == {"pid": 0, "prio": 99}
+    assert libc.flags == can_comm._MCL_CURRENT | can_comm._MCL_FUTURE
+    assert logs == []
+
+    # Permission failures are logged, never raised.
+    def deny(pid, policy, param):
+        raise PermissionError("EPERM")
+
+    monkeypatch.setattr(os, "sched_setscheduler", deny, raising=False)
+    libc = FakeLibc(-1)
+    monkeypatch.setattr(ctypes, "get_errno", lambda: 1)
+    assert can_comm._enable_realtime(50, log_fn=logs.append) is False
+    assert any("SCHED_FIFO not applied" in m for m in logs)
+    assert any("mlockall not applied" in m for m in logs)
@@ -11,9 +11,16 @@ These tests intentionally use small, deterministic stubs so they remain fast.
 """
 
 import threading
-import time
 import types
 
+import pytest
+
+from _helpers import FakeClock
+
+
+def _no_send(msg) -> None:
+    raise AssertionError("unexpected send")
+
 
 def _patch_all_tx_periods(monkeypatch, config_mod, value: int) -> None:
     """Set all per-frame TX period config attributes to ``value`` (ms)."""
@@ -72,13 +79,11 @@ def test_can_tx_loop_add_task_disabled_and_empty_sched_logs(monkeypatch):
     assert any("TX thread started" in m for m in logs)
 
 
-def test_can_tx_loop_present_fn_exception_sets_present_false(monkeypatch):
-    """Cover the defensive present_fn() exception handler."""
+def test_can_tx_loop_build_fn_snapshot_exception_treated_as_absent():
+    """Cover the defensive build_fn() handler when snapshot access raises."""
 
     from roi.can import comm as can_comm
 
-    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
-
     stop = threading.Event()
 
     class BadSnap:
@@ -97,92 +102,31 @@ def test_can_tx_loop_present_fn_exception_sets_present_false(monkeypatch):
                 self.stop_event.set()
             return BadSnap()
 
-    # If send() is called, something went wrong (all present_fns should error).
-    bus = types.SimpleNamespace(send=lambda msg: (_ for _ in ()).throw(AssertionError("unexpected send")))
-    can_comm.can_tx_loop(bus, OneShotState(stop), stop, period_s=0.01, log_fn=lambda s: None)
+    # If send() is called, something went wrong (all build_fns should error).
+    bus = types.SimpleNamespace(send=_no_send)
+    can_comm.can_tx_loop(bus, OneShotState(stop), stop, period_s=0.01, log_fn=lambda s: None, clock=FakeClock())
 
 
-def test_can_tx_loop_builder_exception_payload_none_marks_absent(monkeypatch):
-    """Cover build_payload_fn() exception + payload None handling."""
+def test_can_tx_loop_builder_exception_payload_none_marks_absent():
+    """Cover build_fn() exception handling for every frame builder."""
 
     from roi.can import comm as can_comm
 
-    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
-
     stop = threading.Event()
 
-    class BadInt:
+    class BadNum:
         def __int__(self):
             raise RuntimeError("int")
 
-    class Snap:
-        def __getitem__(self, idx):
-            # Make the legacy meter frame look present, but fail during int() conversion.
-            if idx == 0:
-                return BadInt()
-            return None
-
-    class OneShotState:
-        def __init__(self, stop_event: threading.Event):
-            self.stop_event = stop_event
-            self.called = False
-
-        def snapshot(self):
-            if not self.called:
-                self.called = True
-                self.stop_event.set()
-            return Snap()
-
-    bus = types.SimpleNamespace(send=lambda msg: (_ for _ in ()).throw(AssertionError("unexpected send")))
-    can_comm.can_tx_loop(bus, OneShotState(stop), stop, period_s=0.01, log_fn=lambda s: None)
-
-
-def test_can_tx_loop_builder_returns_none_paths_for_all_frames(monkeypatch):
-    """Cover the (normally redundant) builder early-return branches."""
-
-    from roi.can import comm as can_comm
-
-    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
-
-    stop = threading.Event()
-
-    class FlakySnap:
-        """Return a value on the first access per index, then None.
-
-        present_fn() sees non-None, but build_payload_fn() sees None for the
-        second access, exercising the defensive early-return branches.
-        """
-
-        def __init__(self):
-            self.calls: dict[int, int] = {}
+        def __float__(self):
+            raise RuntimeError("float")
 
+    class Snap:
         def __getitem__(self, idx):
-            self.calls[idx] = self.calls.get(idx, 0) + 1
-            first = self.calls[idx] == 1
-            if not first:
-                return None
-
-            if idx == 0:
-                return 1
-            if idx == 1:
-                return 1.0
-            if idx == 3:
-                return 1
-            if idx == 4:
-                return 2
-            if idx == 5:
-                return 100
-            if idx == 6:
-                return 200
-            if idx == 7:
-                return -5
-            if idx == 8:
-                return 50
+            # Every frame looks present, but fails during int()/float() conversion.
             if idx == 9:
-                return (1, 2, 3.0)
-            if idx == 10:
-                return 4.0
-            return None
+                return (BadNum(), BadNum(), BadNum())
+            return BadNum()
 
     class OneShotState:
         def __init__(self, stop_event: threading.Event):
@@ -193,10 +137,10 @@ def test_can_tx_loop_builder_returns_none_paths_for_all_frames(monkeypatch):
             if not self.called:
                 self.called = True
                 self.stop_event.set()
-            return FlakySnap()
+            return Snap()
 
-    bus = types.SimpleNamespace(send=lambda msg: (_ for _ in ()).throw(AssertionError("unexpected send")))
-    can_comm.can_tx_loop(bus, OneShotState(stop), stop, period_s=0.01, log_fn=lambda s: None)
+    bus = types.SimpleNamespace(send=_no_send)
+    can_comm.can_tx_loop(bus, OneShotState(stop), stop, period_s=0.01, log_fn=lambda s: None, clock=FakeClock())
 
 
 def test_can_tx_loop_send_on_change_min_zero_sends_between_due(monkeypatch):
@@ -211,15 +155,8 @@ def test_can_tx_loop_send_on_change_min_zero_sends_between_due(monkeypatch):
     monkeypatch.setattr(config, "CAN_TX_SEND_ON_CHANGE", True, raising=False)
     monkeypatch.setattr(config, "CAN_TX_SEND_ON_CHANGE_MIN_MS", 0, raising=False)
 
-    t = {"x": 0.0}
-
-    def fake_monotonic():
-        # Advance in tick-sized steps so the loop never sleeps.
-        v = t["x"]
-        t["x"] += 0.01
-        return v
-
-    monkeypatch.setattr(time, "monotonic", fake_monotonic)
+    # Advance in tick-sized steps so the loop never sleeps.
+    clock = FakeClock(dt=0.01)
 
     stop = threading.Event()
 
@@ -244,10 +181,16 @@ def test_can_tx_loop_send_on_change_min_zero_sends_between_due(monkeypatch):
                 self.stop_event.set()
 
     bus = Bus(stop)
-    can_comm.can_tx_loop(bus, ChangingState(), stop, period_s=0.01, log_fn=lambda s: None)
+    can_comm.can_tx_loop(bus, ChangingState(), stop, period_s=0.01, log_fn=lambda s: None, clock=clock)
 
     # First send is due=True, second send is due=False but send_on_change=True.
     assert len(bus.sent) == 2
+    # Each send is its own frame; the first one is not changed afterwards.
+    first, second = bus.sent
+    assert bytes(first.data) == (1).to_bytes(2, "little") + bytes(6)
+    assert bytes(second.data) == (2).to_bytes(2, "little") + bytes(6)
+    assert first.arbitration_id == second.arbitration_id and first.is_extended_id
+    assert first.timestamp > 0 and second.timestamp >= first.timestamp
 
 
 def test_can_tx_loop_send_on_change_rate_limited_skips_send(monkeypatch):
@@ -262,8 +205,7 @@ def test_can_tx_loop_send_on_change_rate_limited_skips_send(monkeypatch):
     monkeypatch.setattr(config, "CAN_TX_SEND_ON_CHANGE_MIN_MS", 100, raising=False)  # 0.1s
 
     # Times: first loop sends at t=0.0, second loop at t=0.01 (rate-limited).
-    seq = iter([0.0, 0.0, 0.01, 0.01, 0.01])
-    monkeypatch.setattr(time, "monotonic", lambda: next(seq))
+    clock = FakeClock(steps=[0.0, 0.0, 0.01, 0.01, 0.01])
 
     stop = threading.Event()
 
@@ -288,7 +230,7 @@ def test_can_tx_loop_send_on_change_rate_limited_skips_send(monkeypatch):
             self.sent.append(msg)
 
     bus = Bus()
-    can_comm.can_tx_loop(bus, TwoShotState(stop), stop, period_s=0.01, log_fn=lambda s: None)
+    can_comm.can_tx_loop(bus, TwoShotState(stop), stop, period_s=0.01, log_fn=lambda s: None, clock=clock)
 
     # Only the first (due=True) send should happen; the second is rate-limited.
     assert len(bus.sent) == 1
@@ -306,8 +248,7 @@ def test_can_tx_loop_send_on_change_rate_limit_allows_send_after_delay(monkeypat
     monkeypatch.setattr(config, "CAN_TX_SEND_ON_CHANGE_MIN_MS", 100, raising=False)  # 0.1s
 
     # First loop sends at t=0.0, second loop at t=0.11 (allowed by min_change_s).
-    seq = iter([0.0, 0.0, 0.11, 0.11, 0.11])
-    monkeypatch.setattr(time, "monotonic", lambda: next(seq))
+    clock = FakeClock(steps=[0.0, 0.0, 0.11, 0.11, 0.11])
 
     stop = threading.Event()
 
@@ -331,7 +272,7 @@ def test_can_tx_loop_send_on_change_rate_limit_allows_send_after_delay(monkeypat
                 self.stop_event.set()
 
     bus = Bus(stop)
-    can_comm.can_tx_loop(bus, ChangingState(), stop, period_s=0.01, log_fn=lambda s: None)
+    can_comm.can_tx_loop(bus, ChangingState(), stop, period_s=0.01, log_fn=lambda s: None, clock=clock)
     assert len(bus.sent) == 2
 
 
@@ -392,3 +333,96 @@ def test_can_rx_loop_kernel_filter_modes(monkeypatch):
     monkeypatch.setattr(config, "CAN_RX_KERNEL_FILTER_MODE", "control", raising=False)
     can_comm.can_rx_loop(BusBoom(), object(), stop, object(), pat_matrix=None, busload=None, log_fn=logs.append)
     assert any("could not be applied" in m.lower() for m in logs)
+
+
+def test_can_tx_loop_periodic_only_skips_not_due_tasks(monkeypatch):
+    """Present tasks are only revisited once due; absent tasks are polled each tick."""
+
+    import roi.config as config
+    from roi.can import comm as can_comm
+
+    _patch_all_tx_periods(monkeypatch, config, 0)
+    monkeypatch.setattr(config, "CAN_TX_PERIOD_MMETER_LEGACY_MS", 10, raising=False)
+    monkeypatch.setattr(config, "CAN_TX_PERIOD_ELOAD_MS", 1000, raising=False)
+    monkeypatch.setattr(config, "CAN_TX_PERIOD_AFG_EXT_MS", 10, raising=False)
+    monkeypatch.setattr(config, "CAN_TX_SEND_ON_CHANGE", False, raising=False)
+
+    stop = threading.Event()
+
+    class LateAfgState:
+        def __init__(self):
+            self.calls = 0
+
+        def snapshot(self):
+            self.calls += 1
+            # AFG appears on the third tick and must be picked up immediately.
+            afg = (0, 50) if self.calls >= 3 else (None, None)
+            return (1, None, None, None, None, 10, 20, afg[0], afg[1], None, None)
+
+    class Bus:
+        def __init__(self):
+            self.ids = []
+
+        def send(self, msg):
+            self.ids.append(int(msg.arbitration_id))
+            if len(self.ids) >= 6:
+                stop.set()
+
+    bus = Bus()
+    can_comm.can_tx_loop(bus, LateAfgState(), stop, period_s=0.01, log_fn=lambda s: None, clock=FakeClock(dt=0.01))
+
+    meter, eload, afg = int(config.MMETER_READ_ID), int(config.ELOAD_READ_ID), int(config.AFG_READ_EXT_ID)
+    assert bus.ids.count(eload) == 1
+    assert bus.ids[:2] == [meter, eload]
+    assert afg in bus.ids
+    assert bus.ids.count(meter) >= 3
+
+
+class _RaisingSnap:
+    def __getitem__(self, idx):
+        raise RuntimeError("boom")
+
+
+@pytest.mark.parametrize("gap", ["absent", "build_error"])
+def test_can_tx_loop_periodic_only_resends_when_signal_returns_between_dues(monkeypatch, gap):
+    """A present task that blinks absent before its next due is sent on return."""
+
+    import roi.config as config
+    from roi.can import comm as can_comm
+
+    _patch_all_tx_periods(monkeypatch, config, 0)
+    monkeypatch.setattr(config, "CAN_TX_PERIOD_MMETER_LEGACY_MS", 1000, raising=False)
+    monkeypatch.setattr(config, "CAN_TX_SEND_ON_CHANGE", False, raising=False)
+
+    stop = threading.Event()
+
+    class BlinkState:
+        def __init__(self):
+            self.calls = 0
+
+        def snapshot(self):
+            self.calls += 1
+            if self.calls >= 4:
+                stop.set()
+            # Present, absent for one tick, then present again (well before
+            # the 1 s keepalive is due).
+            if self.calls == 2:
+                if gap == "build_error":
+                    return _RaisingSnap()
+                mA = None
+            else:
+                mA = self.calls
+            return (mA, None, None, None, None, None, None, None, None, None, None)
+
+    class Bus:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, msg):
+            self.sent.append(bytes(msg.data[:2]))
+
+    bus = Bus()
+    can_comm.can_tx_loop(bus, BlinkState(), stop, period_s=0.01, log_fn=lambda s: None, clock=FakeClock(dt=0.01))
+
+    # Tick 1 sends; tick 3 resends on the absent->present edge; tick 4 is not due.
+    assert bus.sent == [(1).to_bytes(2, "little"), (3).to_bytes(2, "little")]
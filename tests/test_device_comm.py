@@ -4,25 +4,94 @@ import queue
 import struct
 import threading
 import time
+from collections import deque
+from contextlib import nullcontext
 
+import pytest
 
-class DummyLock:
-    def __enter__(self):
-        return self
+import roi.config as config
+from roi.core import device_comm
+from roi.core.device_comm import DeviceCommandProcessor, _quantize_nplc
+from roi.devices.bk5491b import MmeterFunc
 
-    def __exit__(self, exc_type, exc, tb):
-        return False
 
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_S16 = struct.Struct("<h")
+_F32 = struct.Struct("<f")
+_ZERO_F = _F32.pack(0.0)
 
-class FakeSCPI:
-    def __init__(self):
-        self.commands: list[str] = []
+_VDC = int(MmeterFunc.VDC)
+_IDC = int(MmeterFunc.IDC)
+_VAC = int(MmeterFunc.VAC)
 
-    def write(self, cmd: str, *, delay_s: float = 0.0, clear_input: bool = False):
-        self.commands.append(cmd)
+# Control frame IDs (tests never repoint these, so bind them once).
+_RLY_ID = int(config.RLY_CTRL_ID)
+_AFG_ID = int(config.AFG_CTRL_ID)
+_AFG_EXT_ID = int(config.AFG_CTRL_EXT_ID)
+_MMETER_ID = int(config.MMETER_CTRL_ID)
+_MMETER_EXT_ID = int(config.MMETER_CTRL_EXT_ID)
+_LOAD_ID = int(config.LOAD_CTRL_ID)
+_MRS_ID = int(config.MRSIGNAL_CTRL_ID)
+
+
+def _ext(op: int, a0: int = 0, a1: int = 0, a2: int = 0, f: float | None = None) -> bytes:
+    """Build an 8-byte MMETER_CTRL_EXT payload: op, arg0..arg2, float32 value."""
+    return bytes((op, a0, a1, a2)) + (_ZERO_F if f is None else _F32.pack(f))
+
+
+# Payloads shared by several tests; bytes are immutable so one copy suffices.
+_EXT_AUTORANGE_OFF = _ext(0x02, 0xFF)
+_EXT_RANGE_12 = _ext(0x03, 0xFF, f=12.0)
+_EXT_SEC_ENABLE = _ext(0x05, 1)
+_EXT_SEC_FUNC_VAC = _ext(0x06, _VAC)
+_EXT_BUS_TRIG = _ext(0x08)
+_EXT_REL_ACQ = _ext(0x0A, 0xFF)
+_EXT_FUNC_IDC = _ext(0x01, _IDC)
+_SHORT = b"\x00"
+
+def _noop_log(_s: str) -> None:
+    pass
+
+
+# Shared no-op lock; nullcontext is reusable and stateless.
+_DUMMY_LOCK = nullcontext()
+
+
+class FakeWriter:
+    """Records writes from SCPI helpers and raw serial ports alike.
+
+    ``raise_on`` names the methods ("write", "reset", "flush") that should
+    raise instead, for exercising the processor's error paths.
+    """
+
+    __slots__ = ("writes", "raise_on", "reset_called", "flush_called")
+
+    def __init__(self, *raise_on: str):
+        self.writes: list = []
+        self.raise_on = frozenset(raise_on)
+        self.reset_called = 0
+        self.flush_called = 0
+
+    def write(self, data, **kwargs):
+        if "write" in self.raise_on:
+            raise RuntimeError("boom")
+        self.writes.append(data)
+
+    def reset_input_buffer(self):
+        self.reset_called += 1
+        if "reset" in self.raise_on:
+            raise RuntimeError("reset")
+
+    def flush(self):
+        self.flush_called += 1
+        if "flush" in self.raise_on:
+            raise RuntimeError("flush")
 
 
 class FakeBKHelper:
+    __slots__ = ("_script", "writes")
+
     def __init__(self, drain_script: list[list[str]]):
         self._script = list(drain_script)
         self.writes: list[str] = []
@@ -37,28 +106,21 @@ class FakeBKHelper:
         return ["0,No error"]
 
 
-class FakeSerialMeter:
-    def __init__(self):
-        self.writes: list[bytes] = []
-        self.reset_called = 0
-        self.flush_called = 0
-
-    def reset_input_buffer(self):
-        self.reset_called += 1
-
-    def write(self, b: bytes):
-        self.writes.append(bytes(b))
-
-    def flush(self):
-        self.flush_called += 1
-
-
 class FakeHardware:
+    __slots__ = (
+        "mmeter_lock", "afg_lock", "eload_lock",
+        "mmeter", "multi_meter", "afg", "e_load", "mrsignal",
+        "mmeter_scpi_style", "mmeter_func", "mmeter_autorange", "mmeter_range_value",
+        "mmeter_nplc", "mmeter_func2_enabled", "mmeter_func2", "mmeter_trig_source",
+        "mmeter_rel_enabled", "mmeter_quiet_until", "multi_meter_mode", "multi_meter_range",
+        "afg_output", "afg_shape", "afg_freq", "afg_ampl", "afg_offset", "afg_duty",
+        "e_load_enabled", "e_load_mode", "e_load_short", "e_load_csetting", "e_load_rsetting",
+        "k1_drive", "mrs_calls", "idle_called",
+    )
+
     def __init__(self):
         # Locks
-        self.mmeter_lock = DummyLock()
-        self.afg_lock = DummyLock()
-        self.eload_lock = DummyLock()
+        self.mmeter_lock = self.afg_lock = self.eload_lock = _DUMMY_LOCK
 
         # Devices
         self.mmeter = None
@@ -112,93 +174,71 @@ class FakeHardware:
         self.idle_called = True
 
 
-def test_mmeter_write_blank_and_missing_meter(monkeypatch):
-    from roi.core import device_comm
+@pytest.fixture
+def make_proc():
+    """Build ``(hw, processor)``; ``hw`` defaults to a new FakeHardware, kwargs override its attributes."""
+
+    def _make(hw=None, *, log_fn=_noop_log, event_fn=None, **attrs):
+        if hw is None:
+            hw = FakeHardware()
+        for name, value in attrs.items():
+            setattr(hw, name, value)
+        return hw, DeviceCommandProcessor(hw, log_fn=log_fn, event_fn=event_fn)
+
+    return _make
 
+
+def test_mmeter_write_blank_and_missing_meter(make_proc, monkeypatch):
     hw = FakeHardware()
     hw.mmeter = None
     hw.multi_meter = None
 
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
+    _, p = make_proc(hw)
     # Blank command -> early return
     p._mmeter_write("   ")
     # No helper and no raw serial -> early return
     p._mmeter_write("CONF:VOLT:DC")
 
 
-class RawSerial:
-    def __init__(self, *, raise_reset=False, raise_flush=False):
-        self.written: list[bytes] = []
-        self.raise_reset = raise_reset
-        self.raise_flush = raise_flush
-
-    def reset_input_buffer(self):
-        if self.raise_reset:
-            raise RuntimeError("reset")
-
-    def write(self, data: bytes):
-        self.written.append(bytes(data))
-
-    def flush(self):
-        if self.raise_flush:
-            raise RuntimeError("flush")
-
-
-def test_mmeter_write_raw_serial_exceptions_delay_and_bad_settle(monkeypatch):
-    from roi.core import device_comm
-    import roi.config as config
-    import time as _time
-
+def test_mmeter_write_raw_serial_exceptions_delay_and_bad_settle(make_proc, monkeypatch):
     hw = FakeHardware()
     hw.mmeter = None
-    hw.multi_meter = RawSerial(raise_reset=True, raise_flush=True)
+    hw.multi_meter = FakeWriter("reset", "flush")
 
     slept: list[float] = []
 
-    monkeypatch.setattr(_time, "sleep", lambda dt: slept.append(float(dt)))
+    monkeypatch.setattr(time, "sleep", lambda dt: slept.append(float(dt)))
     monkeypatch.setattr(config, "MMETER_CONTROL_SETTLE_SEC", "bad", raising=False)
 
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
+    _, p = make_proc(hw)
     p._mmeter_write("CONF:VOLT:DC", delay_s=0.01, clear_input=True)
     assert slept == [0.01]
-    assert hw.multi_meter.written
-
+    assert hw.multi_meter.writes
 
-def test_mmeter_write_helper_exception_is_logged(monkeypatch):
-    from roi.core import device_comm
-    import roi.config as config
 
+def test_mmeter_write_helper_exception_is_logged(make_proc, monkeypatch):
     hw = FakeHardware()
 
-    class BoomHelper:
-        def write(self, cmd, delay_s=0.0, clear_input=False):
-            raise RuntimeError("boom")
-
-    hw.mmeter = BoomHelper()
-    logs: list[str] = []
+    hw.mmeter = FakeWriter("write")
+    events: set[str] = set()
     monkeypatch.setattr(config, "MMETER_DEBUG", True, raising=False)
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=logs.append)
+    _, p = make_proc(hw, event_fn=events.add)
     p._mmeter_write("CONF:VOLT:DC")
-    assert any("MMETER write error" in m for m in logs)
+    assert "mmeter.write_error" in events
 
 
 def test_quantize_nplc():
-    from roi.core.device_comm import _quantize_nplc
-
     assert _quantize_nplc("bad") == 1.0
     assert _quantize_nplc(0.09) == 0.1
     assert _quantize_nplc(1.2) == 1.0
     assert _quantize_nplc(100) == 10.0
 
 
-def test_mmeter_write_uses_helper_and_sets_quiet_until(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
+def test_mmeter_write_uses_helper_and_sets_quiet_until(make_proc, monkeypatch):
     hw = FakeHardware()
-    helper = FakeSCPI()
+    helper = FakeWriter()
     hw.mmeter = helper
-    logs: list[str] = []
+    events: set[str] = set()
 
     monkeypatch.setattr(config, "MMETER_DEBUG", True, raising=False)
     monkeypatch.setattr(config, "MMETER_CONTROL_SETTLE_SEC", 0.5, raising=False)
@@ -210,35 +250,28 @@ def test_mmeter_write_uses_helper_and_sets_quiet_until(monkeypatch):
 
     monkeypatch.setattr(time, "monotonic", fake_monotonic)
 
-    p = DeviceCommandProcessor(hw, log_fn=logs.append)
+    _, p = make_proc(hw, event_fn=events.add)
     p._mmeter_write(":FUNCtion VOLTage:DC", delay_s=0.0, clear_input=True)
-    assert helper.commands == [":FUNCtion VOLTage:DC"]
+    assert helper.writes == [":FUNCtion VOLTage:DC"]
     assert hw.mmeter_quiet_until == 10.0 + 0.5
-    assert any("[mmeter] >>" in m for m in logs)
-
+    assert "mmeter.tx" in events
 
-def test_mmeter_write_raw_serial_path(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
 
+def test_mmeter_write_raw_serial_path(make_proc, monkeypatch):
     hw = FakeHardware()
     hw.mmeter = None
-    hw.multi_meter = FakeSerialMeter()
+    hw.multi_meter = FakeWriter()
     monkeypatch.setattr(config, "MMETER_DEBUG", False, raising=False)
     monkeypatch.setattr(config, "MMETER_CONTROL_SETTLE_SEC", 0.0, raising=False)
 
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+    _, p = make_proc(hw)
     p._mmeter_write("CONF:VOLT:DC", delay_s=0.0, clear_input=True)
     assert hw.multi_meter.reset_called == 1
     assert hw.multi_meter.flush_called == 1
     assert hw.multi_meter.writes and hw.multi_meter.writes[0].endswith(b"\n")
 
 
-def test_mmeter_set_func_fallback_and_style_commit(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
+def test_mmeter_set_func_fallback_and_style_commit(make_proc, monkeypatch):
     hw = FakeHardware()
     # Script drain_errors to fail first candidate and succeed second.
     helper = FakeBKHelper(
@@ -253,35 +286,30 @@ def test_mmeter_set_func_fallback_and_style_commit(monkeypatch):
     hw.mmeter_scpi_style = "auto"
     monkeypatch.setattr(config, "MMETER_DEBUG", True, raising=False)
 
-    logs: list[str] = []
-    p = DeviceCommandProcessor(hw, log_fn=logs.append)
+    events: set[str] = set()
+    _, p = make_proc(hw, event_fn=events.add)
     p._mmeter_set_func(MmeterFunc.VDC)
     assert hw.mmeter_func == MmeterFunc.VDC
     # Style should have been committed to the successful one.
     assert hw.mmeter_scpi_style in ("conf", "func")
-    assert any("set func" in m for m in logs)
+    assert "mmeter.func.set" in events
 
 
-def test_mmeter_set_func_invalid_style_and_no_helper(monkeypatch):
+def test_mmeter_set_func_invalid_style_and_no_helper(make_proc, monkeypatch):
     """Covers style normalization + helper-absent error draining path."""
-    from roi.core import device_comm
-    from roi.devices.bk5491b import MmeterFunc
 
     hw = FakeHardware()
     hw.mmeter = None
     hw.multi_meter = None
     hw.mmeter_scpi_style = "weird"  # will normalize to 'auto'
 
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p._mmeter_set_func(int(MmeterFunc.VDC))
-    assert hw.mmeter_func == int(MmeterFunc.VDC)
+    _, p = make_proc(hw)
+    p._mmeter_set_func(_VDC)
+    assert hw.mmeter_func == _VDC
     assert hw.mmeter_scpi_style in ("conf", "func", "auto")
 
 
-def test_mmeter_set_func_drain_errors_exception(monkeypatch):
-    from roi.core import device_comm
-    from roi.devices.bk5491b import MmeterFunc
-
+def test_mmeter_set_func_drain_errors_exception(make_proc, monkeypatch):
     hw = FakeHardware()
 
     class Helper:
@@ -294,16 +322,12 @@ def test_mmeter_set_func_drain_errors_exception(monkeypatch):
     hw.mmeter = Helper()
     hw.mmeter_scpi_style = "conf"
 
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p._mmeter_set_func(int(MmeterFunc.VDC))
-    assert hw.mmeter_func == int(MmeterFunc.VDC)
-
+    _, p = make_proc(hw)
+    p._mmeter_set_func(_VDC)
+    assert hw.mmeter_func == _VDC
 
-def test_mmeter_set_func_all_candidates_fail_logs(monkeypatch):
-    from roi.core import device_comm
-    import roi.config as config
-    from roi.devices.bk5491b import MmeterFunc
 
+def test_mmeter_set_func_all_candidates_fail_logs(make_proc, monkeypatch):
     # Drain errors: no error before, BUS error after -> every candidate fails.
     class Helper:
         def __init__(self):
@@ -322,30 +346,27 @@ def test_mmeter_set_func_all_candidates_fail_logs(monkeypatch):
     hw.mmeter = Helper()
     hw.mmeter_scpi_style = "auto"
 
-    logs: list[str] = []
+    events: set[str] = set()
     monkeypatch.setattr(config, "MMETER_DEBUG", True, raising=False)
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=logs.append)
-    p._mmeter_set_func(int(MmeterFunc.VDC))
-    assert any("failed to set func" in m for m in logs)
-
+    _, p = make_proc(hw, event_fn=events.add)
+    p._mmeter_set_func(_VDC)
+    assert "mmeter.func.failed" in events
 
-def test_mmeter_set_func_skips_empty_candidate(monkeypatch):
-    from roi.core import device_comm
-    from roi.devices.bk5491b import MmeterFunc
 
+def test_mmeter_set_func_skips_empty_candidate(make_proc, monkeypatch):
     hw = FakeHardware()
     hw.mmeter = None
     hw.multi_meter = None
 
     # Force a whitespace-only CONF command so base becomes empty.
-    monkeypatch.setitem(device_comm.FUNC_TO_SCPI_CONF, int(MmeterFunc.VDC), "   ")
+    monkeypatch.setitem(device_comm.FUNC_TO_SCPI_CONF, _VDC, "   ")
 
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p._mmeter_set_func(int(MmeterFunc.VDC))
-    assert hw.mmeter_func == int(MmeterFunc.VDC)
+    _, p = make_proc(hw)
+    p._mmeter_set_func(_VDC)
+    assert hw.mmeter_func == _VDC
 
 
-def test_mmeter_set_func_dedup_continue_branch(monkeypatch):
+def test_mmeter_set_func_dedup_continue_branch(make_proc, monkeypatch):
     """Cover the duplicate-elision `continue` inside candidate de-duplication.
 
     The production candidate generator is careful to avoid duplicates, so this
@@ -353,8 +374,6 @@ def test_mmeter_set_func_dedup_continue_branch(monkeypatch):
     module-local `set` factory used to build the `seen` container.
     """
 
-    from roi.core import device_comm
-    from roi.devices.bk5491b import MmeterFunc
 
     hw = FakeHardware()
     helper = FakeBKHelper(drain_script=[["0,No error"], ["0,No error"]])
@@ -378,91 +397,68 @@ def test_mmeter_set_func_dedup_continue_branch(monkeypatch):
 
     monkeypatch.setattr(device_comm, "set", FakeSet, raising=False)
 
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p._mmeter_set_func(int(MmeterFunc.VDC))
+    _, p = make_proc(hw)
+    p._mmeter_set_func(_VDC)
 
-    assert hw.mmeter_func == int(MmeterFunc.VDC)
+    assert hw.mmeter_func == _VDC
     assert helper.writes, "expected at least one SCPI write"
 
 
-def test_handle_relay_and_invert(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_relay_and_invert(make_proc, monkeypatch):
+    hw, p = make_proc()
 
     # no data -> ignored
-    p.handle(int(config.RLY_CTRL_ID), b"")
+    p.handle(_RLY_ID, b"")
     assert hw.k1_drive is None
 
     monkeypatch.setattr(config, "K1_CAN_INVERT", True, raising=False)
-    p.handle(int(config.RLY_CTRL_ID), b"\x01")
+    p.handle(_RLY_ID, b"\x01")
     # inverted => False
     assert hw.k1_drive is False
 
 
-def test_handle_afg_primary_and_ext(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    hw.afg = FakeSCPI()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_afg_primary_and_ext(make_proc, monkeypatch):
+    hw, p = make_proc(afg=FakeWriter())
 
     # Primary: enable=1, shape=2 (RAMP), freq=100, ampl=2000mV
-    data = bytes([1, 2]) + struct.pack("<I", 100) + struct.pack("<H", 2000)
-    p.handle(int(config.AFG_CTRL_ID), data)
-    assert "OUTP1 ON" in hw.afg.commands[0]
-    assert any("SOUR1:FUNC" in c for c in hw.afg.commands)
-    assert any("SOUR1:FREQ 100" in c for c in hw.afg.commands)
-    assert any("SOUR1:AMPL 2.0" in c for c in hw.afg.commands)
+    data = bytes([1, 2]) + _U32.pack(100) + _U16.pack(2000)
+    p.handle(_AFG_ID, data)
+    assert "OUTP1 ON" in hw.afg.writes[0]
+    assert any("SOUR1:FUNC" in c for c in hw.afg.writes)
+    assert any("SOUR1:FREQ 100" in c for c in hw.afg.writes)
+    assert any("SOUR1:AMPL 2.0" in c for c in hw.afg.writes)
 
     # Extended: offset=-100mV, duty=250 -> clamped to 99
-    ext = struct.pack("<h", -100) + bytes([250])
-    p.handle(int(config.AFG_CTRL_EXT_ID), ext)
-    assert any("SOUR1:DCO -0.1" in c for c in hw.afg.commands)
-    assert any("SOUR1:SQU:DCYC 99" in c for c in hw.afg.commands)
-
+    ext = _S16.pack(-100) + bytes([250])
+    p.handle(_AFG_EXT_ID, ext)
+    assert any("SOUR1:DCO -0.1" in c for c in hw.afg.writes)
+    assert any("SOUR1:SQU:DCYC 99" in c for c in hw.afg.writes)
 
-def test_handle_afg_early_return_and_error_logs(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
 
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_afg_early_return_and_error_logs(make_proc, monkeypatch):
+    hw, p = make_proc()
 
     # No AFG attached -> ignored
-    p.handle(int(config.AFG_CTRL_ID), b"\x00" * 8)
-
-    class BoomAfg(FakeSCPI):
-        def write(self, cmd: str):
-            raise RuntimeError("boom")
+    p.handle(_AFG_ID, b"\x00" * 8)
 
     hw2 = FakeHardware()
-    hw2.afg = BoomAfg()
-    logs: list[str] = []
-    p2 = DeviceCommandProcessor(hw2, log_fn=logs.append)
+    hw2.afg = FakeWriter("write")
+    events: set[str] = set()
+    _, p2 = make_proc(hw2, event_fn=events.add)
     # Valid payload but write raises -> error logged
-    data = bytes([1, 0]) + struct.pack("<I", 100) + struct.pack("<H", 1000)
-    p2.handle(int(config.AFG_CTRL_ID), data)
-    assert any("AFG Control Error" in m for m in logs)
+    data = bytes([1, 0]) + _U32.pack(100) + _U16.pack(1000)
+    p2.handle(_AFG_ID, data)
+    assert "afg.error" in events
 
     # Extended too short -> ignored
-    p2.handle(int(config.AFG_CTRL_EXT_ID), b"\x00")
+    p2.handle(_AFG_EXT_ID, _SHORT)
     # Extended with write error
-    p2.handle(int(config.AFG_CTRL_EXT_ID), struct.pack("<h", 0) + bytes([50]))
-    assert any("AFG Ext Error" in m for m in logs)
-
+    p2.handle(_AFG_EXT_ID, _S16.pack(0) + bytes([50]))
+    assert "afg.ext.error" in events
 
-def test_handle_mmeter_legacy_and_range(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
 
-    hw = FakeHardware()
-    hw.multi_meter = True
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_legacy_and_range(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True)
 
     called = []
 
@@ -473,8 +469,8 @@ def test_handle_mmeter_legacy_and_range(monkeypatch):
     monkeypatch.setattr(p, "_mmeter_set_func", fake_set_func)
 
     # Mode 0 -> VDC
-    p.handle(int(config.MMETER_CTRL_ID), bytes([0, 0]))
-    assert called == [int(MmeterFunc.VDC)]
+    p.handle(_MMETER_ID, bytes([0, 0]))
+    assert called == [_VDC]
     assert hw.multi_meter_mode == 0
 
     # Enable legacy range behavior and ensure autorange ON command is sent.
@@ -483,22 +479,16 @@ def test_handle_mmeter_legacy_and_range(monkeypatch):
     monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
 
     # range=0 => autorange on
-    p.handle(int(config.MMETER_CTRL_ID), bytes([0, 0]))
+    p.handle(_MMETER_ID, bytes([0, 0]))
     assert any(":RANGe:AUTO ON" in w for w in writes)
 
     # range!=0 => autorange off
-    p.handle(int(config.MMETER_CTRL_ID), bytes([0, 1]))
+    p.handle(_MMETER_ID, bytes([0, 1]))
     assert any(":RANGe:AUTO OFF" in w for w in writes)
 
 
-def test_handle_mmeter_ctrl_short_data_and_idc(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_ctrl_short_data_and_idc(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True)
 
     called: list[int] = []
 
@@ -509,36 +499,28 @@ def test_handle_mmeter_ctrl_short_data_and_idc(monkeypatch):
     monkeypatch.setattr(p, "_mmeter_set_func", fake_set_func)
 
     # Short payload ignored
-    p.handle(int(config.MMETER_CTRL_ID), b"\x00")
+    p.handle(_MMETER_ID, _SHORT)
     assert called == []
 
     # Mode 1 -> IDC
-    p.handle(int(config.MMETER_CTRL_ID), bytes([1, 0]))
-    assert called == [int(MmeterFunc.IDC)]
+    p.handle(_MMETER_ID, bytes([1, 0]))
+    assert called == [_IDC]
 
 
-def test_handle_mmeter_ctrl_mode0_disabled(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_ctrl_mode0_disabled(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True)
 
     called: list[int] = []
     monkeypatch.setattr(p, "_mmeter_set_func", lambda f: called.append(int(f)))
     monkeypatch.setattr(config, "MMETER_LEGACY_MODE0_ENABLE", False, raising=False)
     monkeypatch.setattr(config, "MMETER_LEGACY_MODE1_ENABLE", True, raising=False)
 
-    p.handle(int(config.MMETER_CTRL_ID), bytes([0, 0]))
+    p.handle(_MMETER_ID, bytes([0, 0]))
     assert called == []
     assert hw.multi_meter_mode == 0
 
 
-def test_handle_mmeter_ctrl_lock_exception_is_swallowed(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
+def test_handle_mmeter_ctrl_lock_exception_is_swallowed(make_proc, monkeypatch):
     class BadLock:
         def __enter__(self):
             raise RuntimeError("lock")
@@ -546,38 +528,29 @@ def test_handle_mmeter_ctrl_lock_exception_is_swallowed(monkeypatch):
         def __exit__(self, exc_type, exc, tb):
             return False
 
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_lock = BadLock()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+    hw, p = make_proc(multi_meter=True, mmeter_lock=BadLock())
 
     # Should not raise even though lock acquisition fails.
-    p.handle(int(config.MMETER_CTRL_ID), bytes([0, 0]))
+    p.handle(_MMETER_ID, bytes([0, 0]))
 
     # Also swallow errors in legacy-range block
     monkeypatch.setattr(config, "MMETER_LEGACY_RANGE_ENABLE", True, raising=False)
-    p.handle(int(config.MMETER_CTRL_ID), bytes([0, 1]))
+    p.handle(_MMETER_ID, bytes([0, 1]))
 
 
-def test_handle_mmeter_ctrl_len_short_and_idc_and_exception_swallow(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_ctrl_len_short_and_idc_and_exception_swallow(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True)
 
     calls: list[int] = []
     monkeypatch.setattr(p, "_mmeter_set_func", lambda f: calls.append(int(f)))
 
     # Too short -> ignored
-    p.handle(int(config.MMETER_CTRL_ID), b"\x00")
+    p.handle(_MMETER_ID, _SHORT)
     assert calls == []
 
     # Mode 1 -> IDC
-    p.handle(int(config.MMETER_CTRL_ID), bytes([1, 0]))
-    assert int(MmeterFunc.IDC) in calls
+    p.handle(_MMETER_ID, bytes([1, 0]))
+    assert _IDC in calls
 
     # Lock errors are swallowed
     class BadLock:
@@ -587,523 +560,300 @@ def test_handle_mmeter_ctrl_len_short_and_idc_and_exception_swallow(monkeypatch)
         def __exit__(self, exc_type, exc, tb):
             return False
 
-    hw2 = FakeHardware()
-    hw2.multi_meter = True
-    hw2.mmeter_lock = BadLock()
-    p2 = DeviceCommandProcessor(hw2, log_fn=lambda s: None)
+    hw2, p2 = make_proc(multi_meter=True, mmeter_lock=BadLock())
     monkeypatch.setattr(config, "MMETER_LEGACY_RANGE_ENABLE", True, raising=False)
     # Should not raise
-    p2.handle(int(config.MMETER_CTRL_ID), bytes([0, 1]))
+    p2.handle(_MMETER_ID, bytes([0, 1]))
 
 
-def test_handle_mmeter_ext_opcodes(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-
+@pytest.fixture
+def mmeter_ext_proc(make_proc, monkeypatch):
+    """Processor wired to a VDC multimeter, recording EXT writes and event codes."""
+    events: set[str] = set()
     writes: list[str] = []
+    hw, p = make_proc(event_fn=events.add, multi_meter=True, mmeter_func=_VDC)
     monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
     monkeypatch.setattr(p, "_mmeter_set_func", lambda f: setattr(hw, "mmeter_func", int(f)))
-
-    # SET_AUTORANGE uses arg1
-    payload = bytes([0x02, 0xFF, 0x00, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert hw.mmeter_autorange is False
-
-    # SET_RANGE with finite float
-    payload = bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", 12.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any(":RANGe 12" in w for w in writes)
-
-    # SET_NPLC quantizes
-    payload = bytes([0x04, 0xFF, 0, 0]) + struct.pack("<f", 9.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any(":NPLCycles" in w for w in writes)
-
-    # SECONDARY_ENABLE and SECONDARY_FUNCTION
-    payload = bytes([0x05, 1, 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert hw.mmeter_func2_enabled is True
-    payload = bytes([0x06, int(MmeterFunc.VAC), 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert hw.mmeter_func2 == int(MmeterFunc.VAC)
-
-    # TRIG_SOURCE, BUS_TRIGGER
-    payload = bytes([0x07, 1, 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert hw.mmeter_trig_source == 1
-    payload = bytes([0x08, 0, 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert "*TRG" in writes
-
-    # RELATIVE_ENABLE uses arg0
-    payload = bytes([0x09, 1, 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert hw.mmeter_rel_enabled is True
-
-    # RELATIVE_ACQUIRE
-    payload = bytes([0x0A, 0xFF, 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any(":REFerence:ACQuire" in w for w in writes)
-
-    # Unknown op logs (op!=0)
-    logs: list[str] = []
-    p2 = DeviceCommandProcessor(hw, log_fn=logs.append)
-    monkeypatch.setattr(p2, "_mmeter_write", lambda cmd, **kw: None)
-    p2.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0xAA, 1, 2, 3, 0, 0, 0, 0]))
-    assert any("unknown op" in m for m in logs)
-
-
-def test_handle_mmeter_ext_early_return_and_more_branches(monkeypatch):
-    import roi.config as config
-    from roi.core import device_comm
-    from roi.devices.bk5491b import MmeterFunc
-
-    # Early return without a meter
-    hw0 = FakeHardware()
-    hw0.multi_meter = False
-    p0 = device_comm.DeviceCommandProcessor(hw0, log_fn=lambda s: None)
-    p0.handle(int(config.MMETER_CTRL_EXT_ID), b"")
-
-    # Now exercise additional opcodes/branches.
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    p = device_comm.DeviceCommandProcessor(hw, log_fn=lambda s: None)
-
-    writes: list[str] = []
-    monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
-
-    # SET_FUNC logs and updates func
-    logs: list[str] = []
-    p_log = device_comm.DeviceCommandProcessor(hw, log_fn=logs.append)
-    monkeypatch.setattr(p_log, "_mmeter_write", lambda cmd, **kw: None)
-    monkeypatch.setattr(p_log, "_mmeter_set_func", lambda f: setattr(hw, "mmeter_func", int(f)))
-    payload = bytes([0x01, int(MmeterFunc.IDC), 0, 0]) + struct.pack("<f", 0.0)
-    p_log.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any("MMETER func" in m for m in logs)
-
-    # SET_RANGE with NaN should be ignored
-    payload = bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", float("nan"))
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-
-    # Redundant range write is suppressed (pass branch)
-    hw.mmeter_autorange = False
-    hw.mmeter_range_value = 12.0
-    before = list(writes)
-    payload = bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", 12.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert writes == before
-
-    # Secondary enable with unsupported function logs
-    hw.mmeter_func2 = 255
-    logs2: list[str] = []
-    p2 = device_comm.DeviceCommandProcessor(hw, log_fn=logs2.append)
-    monkeypatch.setattr(p2, "_mmeter_write", lambda cmd, **kw: None)
-    payload = bytes([0x05, 1, 0, 0]) + struct.pack("<f", 0.0)
-    p2.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any("unsupported" in m.lower() for m in logs2)
-
-    # Secondary function with unsupported code logs and returns
-    logs3: list[str] = []
-    p3 = device_comm.DeviceCommandProcessor(hw, log_fn=logs3.append)
-    monkeypatch.setattr(p3, "_mmeter_write", lambda cmd, **kw: None)
-    # Note: 0xFF means "use current func"; use an out-of-range code to trigger
-    # the "unsupported" branch.
-    payload = bytes([0x06, 254, 0, 0]) + struct.pack("<f", 0.0)
-    p3.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any("unsupported" in m.lower() for m in logs3)
-
-    # Secondary function enables display when currently disabled
-    hw4 = FakeHardware()
-    hw4.multi_meter = True
-    hw4.mmeter_func = int(MmeterFunc.VDC)
-    hw4.mmeter_func2_enabled = False
-    p4 = device_comm.DeviceCommandProcessor(hw4, log_fn=lambda s: None)
-    writes4: list[str] = []
-    monkeypatch.setattr(p4, "_mmeter_write", lambda cmd, **kw: writes4.append(cmd))
-    payload = bytes([0x06, int(MmeterFunc.VAC), 0, 0]) + struct.pack("<f", 0.0)
-    p4.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any(":FUNCtion2:STATe 1" in w for w in writes4)
-
-
-def test_mmeter_ext_control_error_is_logged(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    logs: list[str] = []
-    p = DeviceCommandProcessor(hw, log_fn=logs.append)
+    return p, hw, writes, events
+
+
+def _logged(code: str):
+    return lambda hw, writes, events: code in events
+
+
+def _wrote(needle: str):
+    return lambda hw, writes, events: any(needle in w for w in writes)
+
+
+def _no_writes(hw, writes, events):
+    return writes == []
+
+
+@pytest.mark.parametrize(
+    "setup, payload, check",
+    [
+        pytest.param({}, _EXT_AUTORANGE_OFF, lambda hw, writes, events: hw.mmeter_autorange is False, id="autorange-off"),
+        pytest.param({}, _EXT_RANGE_12, _wrote(":RANGe 12"), id="set-range"),
+        pytest.param({}, _ext(0x04, 0xFF, f=9.0), _wrote(":NPLCycles"), id="set-nplc"),
+        pytest.param({}, _EXT_SEC_ENABLE, lambda hw, writes, events: hw.mmeter_func2_enabled is True, id="secondary-enable"),
+        pytest.param(
+            {"mmeter_func2_enabled": True},
+            _EXT_SEC_FUNC_VAC,
+            lambda hw, writes, events: hw.mmeter_func2 == _VAC,
+            id="secondary-func",
+        ),
+        pytest.param({}, _ext(0x07, 1), lambda hw, writes, events: hw.mmeter_trig_source == 1, id="trig-source"),
+        pytest.param({}, _EXT_BUS_TRIG, lambda hw, writes, events: "*TRG" in writes, id="bus-trigger"),
+        pytest.param({}, _ext(0x09, 1), lambda hw, writes, events: hw.mmeter_rel_enabled is True, id="rel-enable"),
+        pytest.param({}, _EXT_REL_ACQ, _wrote(":REFerence:ACQuire"), id="rel-acquire"),
+        pytest.param({}, bytes([0xAA, 1, 2, 3, 0, 0, 0, 0]), _logged("mmeter.ext.unknown_op"), id="unknown-op"),
+        pytest.param({"multi_meter": None}, b"", _no_writes, id="no-meter"),
+        pytest.param({"multi_meter": False}, b"\x01", _no_writes, id="meter-false"),
+        pytest.param({}, _EXT_FUNC_IDC, _logged("mmeter.ext.func"), id="set-func-logs"),
+        pytest.param({}, _ext(0x03, 0xFF, f=float("nan")), _no_writes, id="range-nan-ignored"),
+        pytest.param(
+            {"mmeter_autorange": False, "mmeter_range_value": 12.0},
+            _EXT_RANGE_12,
+            _no_writes,
+            id="range-redundant-suppressed",
+        ),
+        pytest.param({"mmeter_func2": 255}, _EXT_SEC_ENABLE, _logged("mmeter.ext.unsupported"), id="secondary-enable-unsupported"),
+        pytest.param({}, _ext(0x06, 254), _logged("mmeter.ext.unsupported"), id="secondary-func-unsupported"),
+        pytest.param(
+            {"mmeter_func2_enabled": False},
+            _EXT_SEC_FUNC_VAC,
+            _wrote(":FUNCtion2:STATe 1"),
+            id="secondary-func-forces-display",
+        ),
+    ],
+)
+def test_handle_mmeter_ext(mmeter_ext_proc, setup, payload, check):
+    p, hw, writes, events = mmeter_ext_proc
+    for name, value in setup.items():
+        setattr(hw, name, value)
+    p.handle(_MMETER_EXT_ID, payload)
+    assert check(hw, writes, events)
+
+
+def test_mmeter_ext_control_error_is_logged(make_proc, monkeypatch):
+    logs: deque[str] = deque()
+    events: set[str] = set()
+    _, p = make_proc(log_fn=logs.append, event_fn=events.add, multi_meter=True, mmeter_func=_VDC)
     monkeypatch.setattr(p, "_mmeter_set_func", lambda f: (_ for _ in ()).throw(RuntimeError("boom")))
-    payload = bytes([0x01, int(MmeterFunc.IDC), 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any("MMETER ext control error" in m for m in logs)
+    p.handle(_MMETER_EXT_ID, _EXT_FUNC_IDC)
+    assert "mmeter.ext.error" in events
+    # log_fn still receives the human-readable line.
+    assert list(logs) == ["MMETER ext control error: boom"]
 
 
-def test_handle_mmeter_ext_more_branches(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
+def test_handle_mmeter_ext_early_return(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=None)
+    p.handle(_MMETER_EXT_ID, b"")
 
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-
-    writes: list[str] = []
-    monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
-
-    # FUNC opcode (0x01) should log a friendly label when set_func updates state.
-    logs: list[str] = []
-    p2 = DeviceCommandProcessor(hw, log_fn=logs.append)
-    monkeypatch.setattr(p2, "_mmeter_write", lambda cmd, **kw: None)
-
-    def fake_set_func(func):
-        hw.mmeter_func = int(func)
-
-    monkeypatch.setattr(p2, "_mmeter_set_func", fake_set_func)
-    payload = bytes([0x01, int(MmeterFunc.IDC), 0, 0]) + struct.pack("<f", 0.0)
-    p2.handle(int(config.MMETER_CTRL_EXT_ID), payload)
-    assert any("MMETER func ->" in m for m in logs)
-
-    # SET_RANGE with NaN -> ignored
-    payload_nan = bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", float("nan"))
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload_nan)
-
-    # SET_RANGE redundant write -> pass branch
-    hw.mmeter_autorange = False
-    hw.mmeter_range_value = 12.0
-    before = list(writes)
-    payload_same = bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", 12.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload_same)
-    assert writes == before
-
-    # SECONDARY_ENABLE with unsupported secondary func logs
-    logs2: list[str] = []
-    hw2 = FakeHardware()
-    hw2.multi_meter = True
-    hw2.mmeter_func2 = 255
-    p3 = DeviceCommandProcessor(hw2, log_fn=logs2.append)
-    monkeypatch.setattr(p3, "_mmeter_write", lambda cmd, **kw: None)
-    payload_en = bytes([0x05, 1, 0, 0]) + struct.pack("<f", 0.0)
-    p3.handle(int(config.MMETER_CTRL_EXT_ID), payload_en)
-    assert any("unsupported" in m.lower() for m in logs2)
-
-    # SECONDARY_FUNCTION unsupported func logs
-    logs3: list[str] = []
-    p4 = DeviceCommandProcessor(hw2, log_fn=logs3.append)
-    monkeypatch.setattr(p4, "_mmeter_write", lambda cmd, **kw: None)
-    payload_bad = bytes([0x06, 254, 0, 0]) + struct.pack("<f", 0.0)
-    p4.handle(int(config.MMETER_CTRL_EXT_ID), payload_bad)
-    assert any("unsupported" in m.lower() for m in logs3)
-
-    # SECONDARY_FUNCTION enables secondary display when disabled.
-    hw3 = FakeHardware()
-    hw3.multi_meter = True
-    hw3.mmeter_func2_enabled = False
-    p5 = DeviceCommandProcessor(hw3, log_fn=lambda s: None)
-    writes2: list[str] = []
-    monkeypatch.setattr(p5, "_mmeter_write", lambda cmd, **kw: writes2.append(cmd))
-    payload_ok = bytes([0x06, int(MmeterFunc.VAC), 0, 0]) + struct.pack("<f", 0.0)
-    p5.handle(int(config.MMETER_CTRL_EXT_ID), payload_ok)
-    assert any(":FUNCtion2:STATe 1" in w for w in writes2)
-
-    # Exception during EXT handling logs and is swallowed.
-    logs4: list[str] = []
-    p6 = DeviceCommandProcessor(hw3, log_fn=logs4.append)
-    monkeypatch.setattr(p6, "_mmeter_set_func", lambda f: (_ for _ in ()).throw(RuntimeError("boom")))
-    p6.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x01, int(MmeterFunc.VDC), 0, 0]) + struct.pack("<f", 0.0))
-    assert any("MMETER ext control error" in m for m in logs4)
-
-
-def test_handle_mmeter_ext_early_return(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    hw.multi_meter = None
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), b"")
 
-
-def test_handle_mmeter_ext_disabled_by_config(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_ext_disabled_by_config(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True)
 
     monkeypatch.setattr(config, "MMETER_EXT_CTRL_ENABLE", False, raising=False)
 
     # If MMETER_EXT processing is disabled, no command should be written.
     writes: list[str] = []
     monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
-
-    payload = bytes([0x08, 0, 0, 0]) + struct.pack("<f", 0.0)  # BUS_TRIGGER
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
+    p.handle(_MMETER_EXT_ID, _EXT_BUS_TRIG)
 
     assert writes == []
 
 
-def test_handle_mmeter_ext_set_range_disabled(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_ext_set_range_disabled(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True, mmeter_func=_VDC)
 
     writes: list[str] = []
     monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
     monkeypatch.setattr(config, "MMETER_EXT_SET_RANGE_ENABLE", False, raising=False)
-
-    payload = bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", 12.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
+    p.handle(_MMETER_EXT_ID, _EXT_RANGE_12)
     assert writes == []
 
 
-def test_handle_mmeter_ext_secondary_disabled(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mmeter_ext_secondary_disabled(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True, mmeter_func=_VDC)
 
     writes: list[str] = []
     monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
     monkeypatch.setattr(config, "MMETER_EXT_SECONDARY_ENABLE", False, raising=False)
-
-    payload_en = bytes([0x05, 1, 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload_en)
-    payload_fn = bytes([0x06, int(MmeterFunc.VAC), 0, 0]) + struct.pack("<f", 0.0)
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload_fn)
+    p.handle(_MMETER_EXT_ID, _EXT_SEC_ENABLE)
+    p.handle(_MMETER_EXT_ID, _EXT_SEC_FUNC_VAC)
     assert writes == []
 
 
-def test_handle_mmeter_ext_additional_branches(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
-
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    # Not a multimeter -> ignored
-    p.handle(int(config.MMETER_CTRL_EXT_ID), b"\x01")
-
-    hw2 = FakeHardware()
-    hw2.multi_meter = True
-    hw2.mmeter_func = int(MmeterFunc.VDC)
-    p2 = DeviceCommandProcessor(hw2, log_fn=lambda s: None)
-
-    writes: list[str] = []
-    monkeypatch.setattr(p2, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
-
-    # SET_FUNCTION logs
-    logs: list[str] = []
-    p3 = DeviceCommandProcessor(hw2, log_fn=logs.append)
-    monkeypatch.setattr(p3, "_mmeter_set_func", lambda f: setattr(hw2, "mmeter_func", int(f)))
-    p3.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x01, int(MmeterFunc.IDC), 0, 0]) + struct.pack("<f", 0.0))
-    assert any("MMETER func" in m for m in logs)
-
-    # SET_RANGE with NaN -> returns early
-    p2.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", float("nan")))
-
-    # Redundant range write suppression
-    hw2.mmeter_autorange = False
-    hw2.mmeter_range_value = 12.0
-    before = list(writes)
-    p2.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x03, 0xFF, 0, 0]) + struct.pack("<f", 12.0))
-    assert writes == before
-
-    # Secondary enable with unsupported secondary func logs
-    hw2.mmeter_func2 = 255
-    logs2: list[str] = []
-    p4 = DeviceCommandProcessor(hw2, log_fn=logs2.append)
-    monkeypatch.setattr(p4, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
-    p4.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x05, 1, 0, 0]) + struct.pack("<f", 0.0))
-    assert any("unsupported" in m for m in logs2)
-
-    # Secondary function unsupported -> logs and returns
-    logs3: list[str] = []
-    p5 = DeviceCommandProcessor(hw2, log_fn=logs3.append)
-    monkeypatch.setattr(p5, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
-    p5.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x06, 254, 0, 0]) + struct.pack("<f", 0.0))
-    assert any("unsupported" in m for m in logs3)
-
-    # Secondary function when display disabled -> forces enable
-    hw3 = FakeHardware()
-    hw3.multi_meter = True
-    hw3.mmeter_func = int(MmeterFunc.VDC)
-    hw3.mmeter_func2_enabled = False
-    p6 = DeviceCommandProcessor(hw3, log_fn=lambda s: None)
-    wrote: list[str] = []
-    monkeypatch.setattr(p6, "_mmeter_write", lambda cmd, **kw: wrote.append(cmd))
-    p6.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x06, int(MmeterFunc.VAC), 0, 0]) + struct.pack("<f", 0.0))
-    assert any(":FUNCtion2:STATe 1" == c for c in wrote)
-
-    # Exception inside handler is logged
-    logs4: list[str] = []
-    p7 = DeviceCommandProcessor(hw3, log_fn=logs4.append)
-    monkeypatch.setattr(p7, "_mmeter_set_func", lambda f: (_ for _ in ()).throw(RuntimeError("boom")))
-    p7.handle(int(config.MMETER_CTRL_EXT_ID), bytes([0x01, int(MmeterFunc.VDC), 0, 0]) + struct.pack("<f", 0.0))
-    assert any("MMETER ext control error" in m for m in logs4)
-
-
-def test_handle_eload_builds_write_list():
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    hw.e_load = FakeSCPI()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_eload_builds_write_list(make_proc):
+    hw, p = make_proc(e_load=FakeWriter())
 
     # enable=1 (0x04), mode=RES (0x10), short=ON (0x40)
     first = 0x04 | 0x10 | 0x40
     # val_c=1000, val_r=2000
     data = bytes([first, 0, 0xE8, 0x03, 0xD0, 0x07])
-    p.handle(int(config.LOAD_CTRL_ID), data)
-    assert any("FUNC RES" == c for c in hw.e_load.commands)
-    assert any("INP:SHOR ON" == c for c in hw.e_load.commands)
-    assert any(c.startswith("RES ") for c in hw.e_load.commands)
-    assert hw.e_load.commands[-1] == "INP ON"
+    p.handle(_LOAD_ID, data)
+    assert any("FUNC RES" == c for c in hw.e_load.writes)
+    assert any("INP:SHOR ON" == c for c in hw.e_load.writes)
+    assert any(c.startswith("RES ") for c in hw.e_load.writes)
+    assert hw.e_load.writes[-1] == "INP ON"
 
     # Disabling writes INP OFF first
     first2 = 0x00
     data2 = bytes([first2, 0, 0, 0, 0, 0])
-    p.handle(int(config.LOAD_CTRL_ID), data2)
-    assert "INP OFF" in hw.e_load.commands
+    p.handle(_LOAD_ID, data2)
+    assert "INP OFF" in hw.e_load.writes
 
 
-def test_handle_eload_early_return_and_exception_swallowed():
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_eload_early_return_and_exception_swallowed(make_proc):
+    hw, p = make_proc()
 
     # No e-load -> ignored
-    p.handle(int(config.LOAD_CTRL_ID), b"\x00" * 6)
-
-    class BoomLoad(FakeSCPI):
-        def write(self, cmd: str):
-            raise RuntimeError("boom")
+    p.handle(_LOAD_ID, b"\x00" * 6)
 
-    hw2 = FakeHardware()
-    hw2.e_load = BoomLoad()
-    p2 = DeviceCommandProcessor(hw2, log_fn=lambda s: None)
+    hw2, p2 = make_proc(e_load=FakeWriter("write"))
     # Should swallow write exceptions
     data = bytes([0x04, 0, 0, 0, 0, 0])
-    p2.handle(int(config.LOAD_CTRL_ID), data)
-
+    p2.handle(_LOAD_ID, data)
 
-def test_handle_eload_early_return_and_exception_swallow():
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
 
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-
-    # No load attached -> ignored
-    p.handle(int(config.LOAD_CTRL_ID), b"\x00" * 6)
-
-    class BoomLoad(FakeSCPI):
-        def write(self, cmd: str):
-            raise RuntimeError("boom")
-
-    hw2 = FakeHardware()
-    hw2.e_load = BoomLoad()
-    p2 = DeviceCommandProcessor(hw2, log_fn=lambda s: None)
-    # Should swallow write exceptions.
-    data = bytes([0x04, 0, 0, 0, 0, 0])
-    p2.handle(int(config.LOAD_CTRL_ID), data)
-
-
-def test_handle_mrsignal_valid_and_invalid(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mrsignal_valid_and_invalid(make_proc, monkeypatch):
+    hw, p = make_proc()
 
     # invalid mode is ignored
-    bad = bytes([1, 99]) + struct.pack("<f", 1.0)
-    p.handle(int(config.MRSIGNAL_CTRL_ID), bad)
+    bad = bytes([1, 99]) + _F32.pack(1.0)
+    p.handle(_MRS_ID, bad)
     assert hw.mrs_calls == []
 
     # valid
-    ok = bytes([1, 1]) + struct.pack("<f", 2.0)
-    p.handle(int(config.MRSIGNAL_CTRL_ID), ok)
+    ok = bytes([1, 1]) + _F32.pack(2.0)
+    p.handle(_MRS_ID, ok)
     assert hw.mrs_calls and hw.mrs_calls[-1][0] is True
 
     # exception in set_mrsignal is logged
-    logs: list[str] = []
+    events: set[str] = set()
 
-    def boom(**kwargs):
+    def boom(self, **kwargs):
         raise RuntimeError("x")
 
+    # Slotted fakes can't shadow methods per instance; patch the class instead.
+    monkeypatch.setattr(FakeHardware, "set_mrsignal", boom)
     hw2 = FakeHardware()
-    hw2.set_mrsignal = boom  # type: ignore
-    p2 = DeviceCommandProcessor(hw2, log_fn=logs.append)
-    p2.handle(int(config.MRSIGNAL_CTRL_ID), ok)
-    assert any("MrSignal Control Error" in m for m in logs)
-
+    _, p2 = make_proc(hw2, event_fn=events.add)
+    p2.handle(_MRS_ID, ok)
+    assert "mrsignal.error" in events
 
-def test_handle_mrsignal_early_returns(monkeypatch):
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
 
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
+def test_handle_mrsignal_early_returns(make_proc):
+    hw, p = make_proc()
 
     # Too short
-    p.handle(int(config.MRSIGNAL_CTRL_ID), b"\x00")
+    p.handle(_MRS_ID, _SHORT)
 
     # No mrsignal attribute on hardware => ignored
     delattr(hw, "mrsignal")
-    p.handle(int(config.MRSIGNAL_CTRL_ID), bytes([1, 1]) + struct.pack("<f", 1.0))
+    p.handle(_MRS_ID, bytes([1, 1]) + _F32.pack(1.0))
+    assert hw.mrs_calls == []
 
 
-def test_handle_mrsignal_early_returns():
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
+def test_spsc_ring_push_pop_and_bounds():
+    ring = device_comm.SpscRing(maxsize=2)
+    assert ring.empty() and ring.try_pop() is None
+    assert ring.try_push(1) and ring.try_push(2)
+    assert ring.try_push(3) is False
+    with pytest.raises(queue.Full):
+        ring.put_nowait(3)
+    assert ring.qsize() == 2
+    assert ring.get_nowait() == 1
+    assert ring.get(timeout=0.0) == 2
+    with pytest.raises(queue.Empty):
+        ring.get_nowait()
+    with pytest.raises(queue.Empty):
+        ring.get(block=False)
+    with pytest.raises(queue.Empty):
+        ring.get(timeout=0.0)
+
+
+def test_spsc_ring_push_drop_oldest_evicts_in_place():
+    ring = device_comm.SpscRing(maxsize=2)
+    assert ring.push_drop_oldest(1) is False
+    assert ring.push_drop_oldest(2) is False
+    assert ring.push_drop_oldest(3) is True
+    assert ring.qsize() == 2
+    assert ring.get(timeout=0.0) == 2 and ring.get_nowait() == 3
+
+
+def test_spsc_ring_drain_into_respects_limit():
+    ring = device_comm.SpscRing()
+    for i in range(5):
+        ring.put_nowait(i)
+    out: list[int] = [-1]
+    assert ring.drain_into(out, 3) == 3
+    assert out == [-1, 0, 1, 2]
+    assert ring.drain_into(out) == 2
+    assert out[-2:] == [3, 4] and ring.empty()
+
+
+def test_spsc_ring_drain_into_survives_concurrent_drop_oldest():
+    """CAN RX may drop the oldest item mid-drain; draining must just stop."""
+
+    ring = device_comm.SpscRing()
+
+    class RacyDeque(deque):
+        def popleft(self):
+            item = super().popleft()
+            # Another thread drops the oldest item (as CAN RX does when full).
+            t = threading.Thread(target=deque.popleft, args=(self,))
+            t.start()
+            t.join()
+            return item
+
+    ring._items = RacyDeque(range(4))
+    out: list[int] = []
+    assert ring.drain_into(out) == 2
+    assert out == [0, 2] and ring.empty()
+
+
+def test_device_command_loop_batch_drain_skips_malformed_frames(monkeypatch):
+    handled: list[tuple[int, bytes]] = []
+    stop = threading.Event()
 
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    # Too short
-    p.handle(int(config.MRSIGNAL_CTRL_ID), b"\x00")
-    # No mrsignal attached
-    hw2 = FakeHardware()
-    hw2.mrsignal = None
-    p2 = DeviceCommandProcessor(hw2, log_fn=lambda s: None)
-    p2.handle(int(config.MRSIGNAL_CTRL_ID), bytes([1, 1]) + struct.pack("<f", 1.0))
+    def fake_handle(self, arb: int, data: bytes):
+        handled.append((arb, data))
+        stop.set()
 
+    monkeypatch.setattr(device_comm.DeviceCommandProcessor, "handle", fake_handle)
+    ring = device_comm.SpscRing()
+    ring.put_nowait((_RLY_ID, b"\x01"))
+    ring.put_nowait(("not-an-id", b""))
+    ring.put_nowait((_RLY_ID, b"\x00"))
 
-def test_device_command_loop_coalesces_and_calls_idle(monkeypatch):
-    import roi.config as config
-    from roi.core import device_comm
+    device_comm.device_command_loop(ring, FakeHardware(), stop, log_fn=_noop_log, idle_on_stop=False)
+    assert handled == [(_RLY_ID, b"\x00")]
 
-    q: queue.Queue[tuple[int, bytes]] = queue.Queue()
+
+def test_spsc_ring_get_wakes_on_push_from_producer_thread():
+    ring = device_comm.SpscRing()
+    t = threading.Timer(0.01, ring.put_nowait, args=((0x1, b"\x01"),))
+    t.start()
+    try:
+        assert ring.get(timeout=5.0) == (0x1, b"\x01")
+    finally:
+        t.cancel()
+
+
+def test_device_command_loop_coalesces_and_calls_idle(monkeypatch):
+    q = device_comm.SpscRing()
     hw = FakeHardware()
     stop = threading.Event()
 
-    handled: list[int] = []
+    handled: list[tuple[int, bytes]] = []
 
     def fake_handle(self, arb: int, data: bytes):
-        handled.append(int(arb))
+        handled.append((int(arb), bytes(data)))
+        # The AFG frame is applied last, so the burst is fully drained here.
+        if int(arb) == _AFG_ID:
+            stop.set()
 
     monkeypatch.setattr(device_comm.DeviceCommandProcessor, "handle", fake_handle)
 
@@ -1113,30 +863,51 @@ def test_device_command_loop_coalesces_and_calls_idle(monkeypatch):
         marks.append(name)
 
     # Burst of relay commands should coalesce to last.
-    q.put((int(config.RLY_CTRL_ID), b"\x01"))
-    q.put((int(config.RLY_CTRL_ID), b"\x00"))
-    q.put((int(config.AFG_CTRL_ID), b"\x00" * 8))
-    # Stop once we've given the thread time to drain.
-    def stopper():
-        time.sleep(0.05)
-        stop.set()
+    q.put_nowait((_RLY_ID, b"\x01"))
+    q.put_nowait((_RLY_ID, b"\x00"))
+    q.put_nowait((_AFG_ID, b"\x00" * 8))
 
-    t = threading.Thread(target=stopper)
-    t.start()
-
-    device_comm.device_command_loop(q, hw, stop, log_fn=lambda s: None, watchdog_mark_fn=mark, idle_on_stop=True)
-    t.join()
+    device_comm.device_command_loop(q, hw, stop, log_fn=_noop_log, watchdog_mark_fn=mark, idle_on_stop=True)
 
-    assert int(config.RLY_CTRL_ID) in handled
+    assert handled == [(_RLY_ID, b"\x00"), (_AFG_ID, b"\x00" * 8)]
     assert "k1" in marks
     assert getattr(hw, "idle_called", False) is True
 
 
-def test_device_command_loop_more_branches(monkeypatch):
-    import roi.config as config
-    from roi.core import device_comm
+def test_device_command_loop_polls_ring_after_traffic(monkeypatch):
+    ring = device_comm.SpscRing()
+    handled: list[bytes] = []
+
+    class PollStop(threading.Event):
+        """Stop event whose short back-off wait feeds a frame into the ring."""
+
+        def __init__(self):
+            super().__init__()
+            self.polls = 0
 
-    logs: list[str] = []
+        def wait(self, timeout=None):
+            self.polls += 1
+            if self.polls == 3:
+                ring.put_nowait((_RLY_ID, b"\x01"))
+            return self.is_set()
+
+    stop = PollStop()
+
+    def fake_handle(self, arb: int, data: bytes):
+        handled.append(bytes(data))
+        if len(handled) == 2:
+            stop.set()
+
+    monkeypatch.setattr(device_comm.DeviceCommandProcessor, "handle", fake_handle)
+    ring.put_nowait((_RLY_ID, b"\x00"))
+
+    device_comm.device_command_loop(ring, FakeHardware(), stop, log_fn=_noop_log, idle_on_stop=False)
+    assert handled == [b"\x00", b"\x01"]
+    assert stop.polls == 3
+
+
+def test_device_command_loop_more_branches(monkeypatch):
+    logs: deque[str] = deque()
     marks: list[str] = []
 
     def mark(name: str):
@@ -1168,17 +939,15 @@ def test_device_command_loop_more_branches(monkeypatch):
 
     hw = FakeHardware()
     # Make idle handler raise to cover swallow.
-    def idle_boom():
+    def idle_boom(self):
         raise RuntimeError("idle")
 
-    hw.apply_idle_all = idle_boom  # type: ignore
+    monkeypatch.setattr(FakeHardware, "apply_idle_all", idle_boom)
     device_comm.device_command_loop(Q(), hw, stop, log_fn=logs.append, watchdog_mark_fn=mark, idle_on_stop=True)
     assert any("Device command error" in m for m in logs)
 
 
 def test_device_command_loop_queue_get_exceptions(monkeypatch):
-    from roi.core import device_comm
-
     stop = threading.Event()
 
     class QEmpty:
@@ -1187,20 +956,17 @@ def test_device_command_loop_queue_get_exceptions(monkeypatch):
             raise queue.Empty()
 
     hw = FakeHardware()
-    device_comm.device_command_loop(QEmpty(), hw, stop, log_fn=lambda s: None, idle_on_stop=False)
+    device_comm.device_command_loop(QEmpty(), hw, stop, log_fn=_noop_log, idle_on_stop=False)
 
     class QBoom:
         def get(self, timeout=0.5):
             stop.set()
             raise RuntimeError("boom")
 
-    device_comm.device_command_loop(QBoom(), hw, stop, log_fn=lambda s: None, idle_on_stop=False)
+    device_comm.device_command_loop(QBoom(), hw, stop, log_fn=_noop_log, idle_on_stop=False)
 
 
 def test_device_command_loop_queue_exceptions_and_watchdog_marks(monkeypatch):
-    import roi.config as config
-    from roi.core import device_comm
-
     # Custom queue that raises queue.Empty once then stops.
     stop = threading.Event()
 
@@ -1210,7 +976,7 @@ def test_device_command_loop_queue_exceptions_and_watchdog_marks(monkeypatch):
             raise queue.Empty()
 
     hw = FakeHardware()
-    device_comm.device_command_loop(EmptyQ(), hw, stop, log_fn=lambda s: None, idle_on_stop=True)
+    device_comm.device_command_loop(EmptyQ(), hw, stop, log_fn=_noop_log, idle_on_stop=True)
     assert getattr(hw, "idle_called", False) is True
 
     # Custom queue that raises a generic exception on get.
@@ -1222,11 +988,11 @@ def test_device_command_loop_queue_exceptions_and_watchdog_marks(monkeypatch):
             raise RuntimeError("boom")
 
     hw2 = FakeHardware()
-    device_comm.device_command_loop(BoomGetQ(), hw2, stop2, log_fn=lambda s: None, idle_on_stop=True)
+    device_comm.device_command_loop(BoomGetQ(), hw2, stop2, log_fn=_noop_log, idle_on_stop=True)
 
     # Queue that yields one command then get_nowait raises.
     stop3 = threading.Event()
-    items = [(int(config.LOAD_CTRL_ID), b"\x00" * 6)]
+    items = [(_LOAD_ID, b"\x00" * 6)]
 
     class OneThenBoomNowait:
         def get(self, timeout=0.5):
@@ -1244,7 +1010,7 @@ def test_device_command_loop_queue_exceptions_and_watchdog_marks(monkeypatch):
 
     monkeypatch.setattr(device_comm.DeviceCommandProcessor, "handle", fake_handle)
     marks: list[str] = []
-    logs: list[str] = []
+    logs: deque[str] = deque()
 
     def mark(name: str):
         marks.append(name)
@@ -1255,8 +1021,6 @@ def test_device_command_loop_queue_exceptions_and_watchdog_marks(monkeypatch):
 
 
 def test_device_command_loop_other_id_and_idle_exception(monkeypatch):
-    from roi.core import device_comm
-
     stop = threading.Event()
 
     class Q:
@@ -1266,7 +1030,7 @@ def test_device_command_loop_other_id_and_idle_exception(monkeypatch):
         def get(self, timeout=0.5):
             if self.first:
                 self.first = False
-                return (0x123, b"\x00")
+                return (0x123, _SHORT)
             stop.set()
             raise queue.Empty()
 
@@ -1275,10 +1039,10 @@ def test_device_command_loop_other_id_and_idle_exception(monkeypatch):
 
     hw = FakeHardware()
 
-    def boom_idle():
+    def boom_idle(self):
         raise RuntimeError("idle")
 
-    hw.apply_idle_all = boom_idle  # type: ignore
+    monkeypatch.setattr(FakeHardware, "apply_idle_all", boom_idle)
 
     called: list[int] = []
 
@@ -1287,107 +1051,93 @@ def test_device_command_loop_other_id_and_idle_exception(monkeypatch):
 
     monkeypatch.setattr(device_comm.DeviceCommandProcessor, "handle", fake_handle)
     # Should apply the unknown id in the "other IDs" pass and swallow idle exceptions.
-    device_comm.device_command_loop(Q(), hw, stop, log_fn=lambda s: None, idle_on_stop=True)
+    device_comm.device_command_loop(Q(), hw, stop, log_fn=_noop_log, idle_on_stop=True)
     assert 0x123 in called
 
 
-def test_mmeter_set_func_unsupported_function_logs():
+def test_mmeter_set_func_unsupported_function_logs(make_proc):
     """Cover the early-return branch for unsupported MmeterFunc values."""
-    from roi.core.device_comm import DeviceCommandProcessor
 
     hw = FakeHardware()
-    logs: list[str] = []
-    p = DeviceCommandProcessor(hw, log_fn=logs.append)
+    events: set[str] = set()
+    _, p = make_proc(hw, event_fn=events.add)
 
     # 0xEE is outside our known mapping tables.
     p._mmeter_set_func(0xEE)
     assert hw.mmeter_func == 0  # unchanged
-    assert any("unsupported function" in m.lower() for m in logs)
+    assert "mmeter.func.unsupported" in events
 
 
-def test_mmeter_set_func_style_func_builds_candidates(monkeypatch):
+def test_mmeter_set_func_style_func_builds_candidates(make_proc, monkeypatch):
     """Cover the 'func' style candidate-building path (different from auto/conf)."""
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
 
     hw = FakeHardware()
     hw.mmeter_scpi_style = "func"
     hw.mmeter = FakeBKHelper(drain_script=[["0,No error"], ["0,No error"]])
 
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p._mmeter_set_func(int(MmeterFunc.VDC))
+    _, p = make_proc(hw)
+    p._mmeter_set_func(_VDC)
 
-    assert hw.mmeter_func == int(MmeterFunc.VDC)
+    assert hw.mmeter_func == _VDC
     # First candidate in 'func' style is the canonical mapped command.
     assert hw.mmeter.writes and hw.mmeter.writes[0] == ":FUNCtion VOLT:DC"
 
 
-def test_mmeter_set_func_style_func_uses_mapped_idc_command_first():
+def test_mmeter_set_func_style_func_uses_mapped_idc_command_first(make_proc):
     """FUNC-style candidate order should try the mapped IDC command first."""
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
 
     hw = FakeHardware()
     hw.mmeter_scpi_style = "func"
     hw.mmeter = FakeBKHelper(drain_script=[["0,No error"], ["0,No error"]])
 
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-    p._mmeter_set_func(int(MmeterFunc.IDC))
+    _, p = make_proc(hw)
+    p._mmeter_set_func(_IDC)
 
     assert hw.mmeter.writes
     assert hw.mmeter.writes[0] == ":FUNCtion CURR:DC"
 
 
-def test_handle_mmeter_ext_bad_float_unpack_is_swallowed(monkeypatch):
-    """Cover the struct.unpack() exception path in MMETER_CTRL_EXT handling."""
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
-    from roi.devices.bk5491b import MmeterFunc
+def test_handle_mmeter_ext_bad_float_unpack_is_swallowed(make_proc, monkeypatch):
+    """Cover the float-unpack failure path in MMETER_CTRL_EXT handling."""
 
-    class BadBytes(bytes):
-        def __getitem__(self, key):
-            # Make data[4:8] the wrong length to trigger struct.error.
-            if isinstance(key, slice) and key.start == 4 and key.stop == 8:
-                return b""
-            return super().__getitem__(key)
+    hw, p = make_proc(multi_meter=True, mmeter_func=_VDC)
 
-    hw = FakeHardware()
-    hw.multi_meter = True
-    hw.mmeter_func = int(MmeterFunc.VDC)
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
-
-    payload = BadBytes(bytes([0x03, 0xFF, 0x00, 0x00, 1, 2, 3, 4]))
-    p.handle(int(config.MMETER_CTRL_EXT_ID), payload)
+    # A non-buffer payload makes unpack_from() raise; the opcode still applies.
+    payload = list(_ext(0x03, 0xFF, f=1.0))
+    p.handle(_MMETER_EXT_ID, payload)
+    assert hw.mmeter_autorange is False
 
-    # It should still have processed the opcode and forced autorange off.
+    # A truncated payload skips the float entirely (value defaults to 0.0).
+    hw.mmeter_autorange = True
+    p.handle(_MMETER_EXT_ID, _ext(0x03, 0xFF)[:5])
     assert hw.mmeter_autorange is False
 
 
-def test_handle_mrsignal_unpack_error_returns_early():
-    """Cover the float-unpack failure branch in MrSignal CAN control."""
-    import roi.config as config
-    from roi.core.device_comm import DeviceCommandProcessor
+def test_handle_accepts_memoryview_payloads(make_proc, monkeypatch):
+    hw, p = make_proc(multi_meter=True, mmeter_func=_VDC)
+    writes: list[str] = []
+    monkeypatch.setattr(p, "_mmeter_write", lambda cmd, **kw: writes.append(cmd))
+    p.handle(_MMETER_EXT_ID, memoryview(_EXT_RANGE_12))
+    assert any(":RANGe 12" in w for w in writes)
 
-    class BadBytes(bytes):
-        def __getitem__(self, key):
-            if isinstance(key, slice) and key.start == 2 and key.stop == 6:
-                return b""  # wrong length for struct.unpack
-            return super().__getitem__(key)
+    p.handle(_MRS_ID, memoryview(bytes([1, 1]) + _F32.pack(2.0)))
+    assert hw.mrs_calls[-1][:3] == (True, 1, 2.0)
 
-    hw = FakeHardware()
-    p = DeviceCommandProcessor(hw, log_fn=lambda s: None)
 
-    # enable=1, output_select=1 (V), but float bytes will fail to unpack.
-    payload = BadBytes(bytes([1, 1, 0, 0, 0, 0]))
-    p.handle(int(config.MRSIGNAL_CTRL_ID), payload)
+def test_handle_mrsignal_unpack_error_returns_early(make_proc):
+    """Cover the float-unpack failure branch in MrSignal CAN control."""
+
+    hw, p = make_proc()
+
+    # enable=1, output_select=1 (V), but the float can't be unpacked.
+    p.handle(_MRS_ID, [1, 1, 0, 0, 0, 0])
+    # Truncated payload is rejected by the length check.
+    p.handle(_MRS_ID, bytes([1, 1, 0, 0, 0]))
 
     assert hw.mrs_calls == []
 
 
 def test_device_command_loop_watchdog_marks_mmeter_and_mrsignal(monkeypatch):
-    import roi.config as config
-    from roi.core import device_comm
-
     q: queue.Queue[tuple[int, bytes]] = queue.Queue()
     hw = FakeHardware()
     stop = threading.Event()
@@ -1397,7 +1147,7 @@ def test_device_command_loop_watchdog_marks_mmeter_and_mrsignal(monkeypatch):
     def fake_handle(self, arb: int, data: bytes):
         handled.append(int(arb))
         # Stop after we see the MrSignal frame.
-        if int(arb) == int(config.MRSIGNAL_CTRL_ID):
+        if int(arb) == _MRS_ID:
             stop.set()
 
     monkeypatch.setattr(device_comm.DeviceCommandProcessor, "handle", fake_handle)
@@ -1407,12 +1157,12 @@ def test_device_command_loop_watchdog_marks_mmeter_and_mrsignal(monkeypatch):
     def mark(name: str):
         marks.append(name)
 
-    q.put((int(config.MMETER_CTRL_ID), b"\x00\x00"))
-    q.put((int(config.MRSIGNAL_CTRL_ID), bytes([1, 1]) + struct.pack("<f", 1.0)))
+    q.put((_MMETER_ID, b"\x00\x00"))
+    q.put((_MRS_ID, bytes([1, 1]) + _F32.pack(1.0)))
 
-    device_comm.device_command_loop(q, hw, stop, log_fn=lambda s: None, watchdog_mark_fn=mark, idle_on_stop=False)
+    device_comm.device_command_loop(q, hw, stop, log_fn=_noop_log, watchdog_mark_fn=mark, idle_on_stop=False)
 
     assert "mmeter" in marks
     assert "mrsignal" in marks
-    assert int(config.MMETER_CTRL_ID) in handled
-    assert int(config.MRSIGNAL_CTRL_ID) in handled
+    assert _MMETER_ID in handled
+    assert _MRS_ID in handled
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import math
+from array import array
+
+import minimalmodbus
 
 
 def test_call_compat_filters_kwargs():
@@ -13,6 +16,27 @@ def test_call_compat_filters_kwargs():
     assert call_compat(f, 1, ok=2, nope=3) == (1, 2)
 
 
+# Holding registers are dense small addresses, so the fakes back them with a
+# flat array instead of a dict.
+_NREGS = 64
+
+# Float stores are keyed by register and byteorder packed into one int:
+# None (library default), the "DEFAULT" marker and each minimalmodbus constant
+# get a small id in the low three bits.
+_BO_ID = {
+    None: 0,
+    "DEFAULT": 1,
+    **{
+        getattr(minimalmodbus, name): i
+        for i, name in enumerate(("BYTEORDER_BIG", "BYTEORDER_LITTLE", "BYTEORDER_BIG_SWAP", "BYTEORDER_LITTLE_SWAP"), start=2)
+    },
+}
+
+
+def _fkey(reg, bo):
+    return (reg << 3) | _BO_ID[bo]
+
+
 class FakeInst:
     def __init__(self):
         # Provide both older and newer minimalmodbus behaviors.
@@ -20,10 +44,15 @@ class FakeInst:
         self.serial = type("S", (), {"baudrate": None, "parity": None, "stopbits": None, "timeout": None, "close": lambda self: None})()
         self.clear_buffers_before_each_transaction = False
         self._float_map = {}
-        self._reg_map = {}
+        self._reg_map = array("l", [0]) * _NREGS
+        self.block_reads = []
 
     def read_register(self, reg, decimals=0, *, functioncode=3, signed=False):
-        return int(self._reg_map.get(reg, 0))
+        return self._reg_map[reg]
+
+    def read_registers(self, reg, count, *, functioncode=3):
+        self.block_reads.append((reg, count))
+        return self._reg_map[reg:reg + count].tolist()
 
     def write_register(self, reg, value, *, functioncode=6, signed=False):
         self._reg_map[reg] = int(value)
@@ -31,11 +60,12 @@ class FakeInst:
     def read_float(self, reg, *, functioncode=3, number_of_registers=2, byteorder=None):
         # If the library supports inst.byteorder, mrsignal will set that.
         bo = self.byteorder if self.byteorder is not None else byteorder
-        return float(self._float_map.get((reg, bo), self._float_map.get((reg, "DEFAULT"), 0.0)))
+        fm = self._float_map
+        return float(fm.get(_fkey(reg, bo), fm.get(_fkey(reg, "DEFAULT"), 0.0)))
 
     def write_float(self, reg, value, *, functioncode=16, number_of_registers=2, byteorder=None):
         bo = self.byteorder if self.byteorder is not None else byteorder
-        self._float_map[(reg, bo)] = float(value)
+        self._float_map[_fkey(reg, bo)] = float(value)
 
 
 def test_mrsignal_connect_and_close(monkeypatch):
@@ -68,7 +98,7 @@ def test_read_float_configured_byteorder(monkeypatch):
     assert hasattr(minimalmodbus, "BYTEORDER_LITTLE")
 
     inst = FakeInst()
-    inst._float_map[(REG_OUTPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_LITTLE)] = 12.5
+    inst._float_map[_fkey(REG_OUTPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_LITTLE)] = 12.5
 
     c = MrSignalClient("p", float_byteorder="BYTEORDER_LITTLE", float_byteorder_auto=False)
     c.inst = inst
@@ -83,8 +113,8 @@ def test_read_float_auto_detect_uses_sane_value(monkeypatch):
 
     inst = FakeInst()
     # Give one byteorder a non-sane value and another a sane value.
-    inst._float_map[(REG_INPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_BIG)] = float("nan")
-    inst._float_map[(REG_INPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_LITTLE)] = 1.234
+    inst._float_map[_fkey(REG_INPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_BIG)] = float("nan")
+    inst._float_map[_fkey(REG_INPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_LITTLE)] = 1.234
 
     c = MrSignalClient("p", float_byteorder=None, float_byteorder_auto=True)
     c.inst = inst
@@ -104,12 +134,12 @@ def test_set_output_order_and_clamps(monkeypatch):
     c.set_output(enable=False, output_select=1, value=2.0)
     assert inst._reg_map[REG_OUTPUT_ON] == 0
     assert inst._reg_map[REG_OUTPUT_SELECT] == 1
-    assert inst._float_map[(REG_OUTPUT_VALUE_FLOAT, None)] == 2.0
+    assert inst._float_map[_fkey(REG_OUTPUT_VALUE_FLOAT, None)] == 2.0
 
     # Enabling: output ON last
     c.set_output(enable=True, output_select=0, value=3.0)
     assert inst._reg_map[REG_OUTPUT_SELECT] == 0
-    assert inst._float_map[(REG_OUTPUT_VALUE_FLOAT, None)] == 3.0
+    assert inst._float_map[_fkey(REG_OUTPUT_VALUE_FLOAT, None)] == 3.0
     assert inst._reg_map[REG_OUTPUT_ON] == 1
 
 
@@ -124,12 +154,17 @@ def test_available_byteorders_dedupe_and_helpers(monkeypatch):
     import minimalmodbus
     from roi.devices.mrsignal import available_byteorders, get_byteorder_by_name, is_sane_float, MrSignalStatus
 
-    # Force a duplicate value to exercise the de-dupe branch.
+    # Force a duplicate value to exercise the de-dupe branch. The scan is
+    # cached, so drop the cached result around the patch.
+    available_byteorders.cache_clear()
     monkeypatch.setattr(minimalmodbus, "BYTEORDER_ABCD", minimalmodbus.BYTEORDER_BIG, raising=False)
     orders = available_byteorders()
     assert orders
     # Values should be unique.
     assert len({v for _, v in orders}) == len(orders)
+    monkeypatch.undo()
+    available_byteorders.cache_clear()
+    assert available_byteorders() is available_byteorders()
 
     assert get_byteorder_by_name(None) is None
     assert get_byteorder_by_name("NOPE") is None
@@ -150,6 +185,11 @@ def test_not_connected_raises_for_register_access():
         assert False, "expected RuntimeError"
     except RuntimeError:
         pass
+    try:
+        c._read_u16_block(20, 2)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
     try:
         c._write_u16(0, 1)
         assert False, "expected RuntimeError"
@@ -172,7 +212,7 @@ def test_read_float_prefers_previous_auto_detect_byteorder(monkeypatch):
     from roi.devices.mrsignal import MrSignalClient, REG_INPUT_VALUE_FLOAT
 
     inst = FakeInst()
-    inst._float_map[(REG_INPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_LITTLE)] = 7.7
+    inst._float_map[_fkey(REG_INPUT_VALUE_FLOAT, minimalmodbus.BYTEORDER_LITTLE)] = 7.7
 
     c = MrSignalClient("p", float_byteorder=None, float_byteorder_auto=True)
     c.inst = inst
@@ -187,7 +227,7 @@ def test_read_float_invalid_config_name_falls_back_to_default(monkeypatch):
     from roi.devices.mrsignal import MrSignalClient
 
     inst = FakeInst()
-    inst._float_map[(0, "DEFAULT")] = 1.25
+    inst._float_map[_fkey(0, "DEFAULT")] = 1.25
     c = MrSignalClient("p", float_byteorder="NOPE", float_byteorder_auto=False)
     c.inst = inst
     v, bo = c._read_float(0)
@@ -202,19 +242,19 @@ class InstNoByteorder:
         self.serial = type("S", (), {"baudrate": None, "parity": None, "stopbits": None, "timeout": None, "close": lambda self: None})()
         self.clear_buffers_before_each_transaction = False
         self._floats = {}
-        self._regs = {}
+        self._regs = array("l", [0]) * _NREGS
 
     def read_register(self, reg, decimals=0, *, functioncode=3, signed=False):
-        return int(self._regs.get(reg, 0))
+        return self._regs[reg]
 
     def write_register(self, reg, value, *, functioncode=6, signed=False):
         self._regs[reg] = int(value)
 
     def read_float(self, reg, *, functioncode=3, number_of_registers=2, byteorder=None):
-        return float(self._floats.get((reg, byteorder), 0.0))
+        return float(self._floats.get(_fkey(reg, byteorder), 0.0))
 
     def write_float(self, reg, value, *, functioncode=16, number_of_registers=2, byteorder=None):
-        self._floats[(reg, byteorder)] = float(value)
+        self._floats[_fkey(reg, byteorder)] = float(value)
 
 
 def test_read_write_float_without_inst_byteorder_attribute(monkeypatch):
@@ -222,7 +262,7 @@ def test_read_write_float_without_inst_byteorder_attribute(monkeypatch):
     from roi.devices.mrsignal import MrSignalClient
 
     inst = InstNoByteorder()
-    inst._floats[(1, minimalmodbus.BYTEORDER_BIG)] = 3.0
+    inst._floats[_fkey(1, minimalmodbus.BYTEORDER_BIG)] = 3.0
 
     c = MrSignalClient("p", float_byteorder="BYTEORDER_BIG", float_byteorder_auto=False)
     c.inst = inst
@@ -231,7 +271,7 @@ def test_read_write_float_without_inst_byteorder_attribute(monkeypatch):
     assert bo == "BYTEORDER_BIG"
     wbo = c._write_float(2, 4.0)
     assert wbo == "BYTEORDER_BIG"
-    assert inst._floats[(2, minimalmodbus.BYTEORDER_BIG)] == 4.0
+    assert inst._floats[_fkey(2, minimalmodbus.BYTEORDER_BIG)] == 4.0
 
 
 def test_auto_detect_continues_on_exception(monkeypatch):
@@ -261,7 +301,7 @@ def test_write_float_default_path(monkeypatch):
     c.inst = inst
     bo = c._write_float(10, 1.5)
     assert bo == "DEFAULT"
-    assert inst._float_map[(10, None)] == 1.5
+    assert inst._float_map[_fkey(10, None)] == 1.5
 
 
 def test_read_status_handles_float_failures(monkeypatch):
@@ -288,6 +328,10 @@ def test_read_status_handles_float_failures(monkeypatch):
     monkeypatch.setattr(c, "_read_float", flaky)
     st = c.read_status()
     assert st.device_id == 55
+    assert st.output_on is True
+    assert st.output_select == 6
+    # Enable + select come back in one multi-register read.
+    assert inst.block_reads == [(20, 2)]
     assert st.output_value is None
     assert st.input_value == 9.0
 
@@ -328,7 +372,7 @@ def test_read_float_uses_prev_byteorder_without_inst_byteorder_attr(monkeypatch)
     from roi.devices.mrsignal import MrSignalClient
 
     inst = InstNoByteorder()
-    inst._floats[(1, minimalmodbus.BYTEORDER_BIG)] = 7.25
+    inst._floats[_fkey(1, minimalmodbus.BYTEORDER_BIG)] = 7.25
 
     c = MrSignalClient("p", float_byteorder=None, float_byteorder_auto=True)
     c.inst = inst
@@ -339,6 +383,66 @@ def test_read_float_uses_prev_byteorder_without_inst_byteorder_attr(monkeypatch)
     assert bo == "BYTEORDER_BIG"
 
 
+def test_read_float_rescan_skips_prev_and_prefers_frequent_byteorder():
+    import minimalmodbus
+    from roi.devices.mrsignal import MrSignalClient
+
+    class Inst(InstNoByteorder):
+        def __init__(self):
+            super().__init__()
+            self.tried = []
+
+        def read_float(self, reg, *, functioncode=3, number_of_registers=2, byteorder=None):
+            self.tried.append(byteorder)
+            return super().read_float(reg, byteorder=byteorder)
+
+    inst = Inst()
+    inst._floats[_fkey(1, minimalmodbus.BYTEORDER_BIG)] = float("nan")
+    inst._floats[_fkey(1, minimalmodbus.BYTEORDER_LITTLE)] = 2.5
+
+    c = MrSignalClient("p", float_byteorder=None, float_byteorder_auto=True)
+    c.inst = inst
+    c._last_used_bo = "BYTEORDER_BIG"
+    assert c._read_float(1) == (2.5, "BYTEORDER_LITTLE")
+    # The insane prev byteorder is not retried during the rescan.
+    assert inst.tried.count(minimalmodbus.BYTEORDER_BIG) == 1
+
+    # With history, the rescan starts at the byteorder that worked before.
+    c._last_used_bo = "DEFAULT"
+    inst.tried.clear()
+    assert c._read_float(1) == (2.5, "BYTEORDER_LITTLE")
+    assert inst.tried == [minimalmodbus.BYTEORDER_LITTLE]
+
+
+def test_read_float_keeps_prev_byteorder_after_transient_error():
+    import minimalmodbus
+    from roi.devices.mrsignal import MrSignalClient
+
+    class Inst(InstNoByteorder):
+        fail_next = False
+
+        def read_float(self, reg, *, functioncode=3, number_of_registers=2, byteorder=None):
+            if self.fail_next:
+                self.fail_next = False
+                raise RuntimeError("CRC error")
+            return super().read_float(reg, byteorder=byteorder)
+
+    inst = Inst()
+    # A plausible-looking wrong-order value sorts first in the rescan.
+    inst._floats[_fkey(1, minimalmodbus.BYTEORDER_BIG)] = 1e-3
+    inst._floats[_fkey(1, minimalmodbus.BYTEORDER_LITTLE)] = 2.5
+
+    c = MrSignalClient("p", float_byteorder=None, float_byteorder_auto=True)
+    c.inst = inst
+    c._last_used_bo = "BYTEORDER_LITTLE"
+    c._bo_hits["BYTEORDER_LITTLE"] = 3
+
+    # The fast-path read raises once; the hit-ordered rescan retries prev.
+    inst.fail_next = True
+    assert c._read_float(1) == (2.5, "BYTEORDER_LITTLE")
+    assert c._read_float(1) == (2.5, "BYTEORDER_LITTLE")
+
+
 def test_read_float_prev_byteorder_exception_is_swallowed(monkeypatch):
     """Cover the exception swallow path when using the previous auto-detected byteorder."""
     import roi.devices.mrsignal as mrsignal
@@ -389,8 +493,8 @@ def test_auto_detect_path_without_inst_byteorder_attr(monkeypatch):
     from roi.devices.mrsignal import MrSignalClient
 
     inst = InstNoByteorder()
-    inst._floats[(0, minimalmodbus.BYTEORDER_BIG)] = float("nan")
-    inst._floats[(0, minimalmodbus.BYTEORDER_LITTLE)] = 3.5
+    inst._floats[_fkey(0, minimalmodbus.BYTEORDER_BIG)] = float("nan")
+    inst._floats[_fkey(0, minimalmodbus.BYTEORDER_LITTLE)] = 3.5
 
     c = MrSignalClient("p", float_byteorder=None, float_byteorder_auto=True)
     c.inst = inst
@@ -413,7 +517,7 @@ def test_write_float_sets_inst_byteorder_when_supported(monkeypatch):
 
     bo = c._write_float(10, 1.25)
     assert bo == "BYTEORDER_LITTLE"
-    assert inst._float_map[(10, minimalmodbus.BYTEORDER_LITTLE)] == 1.25
+    assert inst._float_map[_fkey(10, minimalmodbus.BYTEORDER_LITTLE)] == 1.25
 
 
 def test_read_status_handles_input_float_failure(monkeypatch):
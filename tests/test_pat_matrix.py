@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-import time
 from pathlib import Path
 
+import pytest
+
 from roi.core import pat_matrix
 
 
+@pytest.fixture(autouse=True)
+def _fresh_j0_pin_names():
+    # j0_pin_names() caches its parse; keep monkeypatched results local.
+    pat_matrix._j0_pin_names_impl.cache_clear()
+    yield
+    pat_matrix._j0_pin_names_impl.cache_clear()
+
+
 def test_decode_pat_j_payload_defaults_to_zeroes():
     assert pat_matrix.decode_pat_j_payload(None) == [0] * 12
     assert pat_matrix.decode_pat_j_payload(b"") == [0] * 12
+    assert pat_matrix.decode_pat_j_payload(b"\x00\x00\x00\xff") == [0] * 12
+    # Zero results are fresh lists, so callers may mutate them freely.
+    first = pat_matrix.decode_pat_j_payload(b"\x00\x00\x00")
+    first[0] = 3
+    assert pat_matrix.decode_pat_j_payload(b"\x00\x00\x00") == [0] * 12
 
 
 def test_decode_pat_j_payload_bit_packing():
@@ -24,11 +38,18 @@ def test_decode_pat_j_payload_bit_packing():
     assert got == vals
 
 
+def test_decode_pat_j_payload_short_and_long_payloads():
+    # Missing high bytes read as zero; bytes past the third are ignored.
+    assert pat_matrix.decode_pat_j_payload(bytearray(b"\xff")) == [3, 3, 3, 3] + [0] * 8
+    assert pat_matrix.decode_pat_j_payload(b"\x00\x00\x80\xff") == [0] * 11 + [2]
+
 def test_pat_j_ids_and_id_to_index():
     ids = pat_matrix.pat_j_ids()
     assert len(ids) == pat_matrix.PAT_J_COUNT
     assert pat_matrix.PAT_J_BASE_ID in ids
     assert (pat_matrix.PAT_J_BASE_ID + (pat_matrix.PAT_J_STRIDE * (pat_matrix.PAT_J_COUNT - 1))) in ids
+    # Built once at import; callers get the same immutable set.
+    assert pat_matrix.pat_j_ids() is ids and isinstance(ids, frozenset)
 
     s = pat_matrix.PatSwitchMatrixState()
     assert s._id_to_index(pat_matrix.PAT_J_BASE_ID) == 0
@@ -39,15 +60,9 @@ def test_pat_j_ids_and_id_to_index():
     assert s._id_to_index(0x80000000 | pat_matrix.PAT_J_BASE_ID) == 0
 
 
-def test_pat_matrix_update_and_snapshot(monkeypatch):
+def test_pat_matrix_update_and_snapshot():
     t = 100.0
-
-    def fake_monotonic():
-        return t
-
-    monkeypatch.setattr(time, "monotonic", fake_monotonic)
-
-    s = pat_matrix.PatSwitchMatrixState()
+    s = pat_matrix.PatSwitchMatrixState(clock=lambda: t)
     payload = bytes([0xFF, 0x00, 0x00])
     assert s.maybe_update(pat_matrix.PAT_J_BASE_ID, payload, ts=1.25) is True
     snap = s.snapshot()
@@ -56,21 +71,56 @@ def test_pat_matrix_update_and_snapshot(monkeypatch):
     assert snap["J0"]["vals"] == [3, 3, 3, 3, 0, 0, 0, 0, 0, 0, 0, 0]
     assert snap["J0"]["age"] == t - 1.25
 
+    # Without an explicit ts the injected clock stamps the frame.
+    assert s.maybe_update(pat_matrix.PAT_J_BASE_ID, payload) is True
+    assert s.snapshot()["J0"]["age"] == 0.0
+
     # Non-PAT ids are ignored
     assert s.maybe_update(0x123, b"\x00") is False
+    # Flagged (SocketCAN EFF) IDs miss the exact table but still resolve.
+    assert s.maybe_update(0x80000000 | (pat_matrix.PAT_J_BASE_ID + pat_matrix.PAT_J_STRIDE), b"\x03") is True
+    assert s.snapshot()["J1"]["vals"][0] == 3
+    # Unhashable junk is rejected, not raised out of the RX path.
+    assert s.maybe_update([1], b"\x00") is False
+    # Non-ints still resolve through the general path.
+    assert s.maybe_update(float(pat_matrix.PAT_J_BASE_ID), b"\x02") is True
+    assert s.snapshot()["J0"]["vals"][0] == 2
 
 
-def test_j0_pin_names_parses_dbc_and_caches():
-    # Clear cached global if present
-    if hasattr(pat_matrix, "_J0_PIN_NAMES"):
-        delattr(pat_matrix, "_J0_PIN_NAMES")
+def test_pat_matrix_int_miss_skips_general_path(monkeypatch):
+    s = pat_matrix.PatSwitchMatrixState()
+
+    def general(arb_id):  # pragma: no cover - must not be called
+        raise AssertionError("int IDs use the table lookup only")
+
+    monkeypatch.setattr(s, "_id_to_index", general)
+    assert s.maybe_update(0x123, b"\x00") is False
+    assert s.maybe_update(0x80000000 | pat_matrix.PAT_J_BASE_ID, b"\x01") is True
+
 
+def test_pat_matrix_repeated_frame_skips_decode(monkeypatch):
+    s = pat_matrix.PatSwitchMatrixState()
+    calls: list[bytes] = []
+    real = pat_matrix.decode_pat_j_payload
+    monkeypatch.setattr(pat_matrix, "decode_pat_j_payload", lambda b: calls.append(b) or real(b))
+
+    assert s.maybe_update(pat_matrix.PAT_J_BASE_ID, b"\x01\x00\x00\xaa", ts=1.0)
+    # Same field bytes (only trailing byte differs): timestamp moves, no decode.
+    assert s.maybe_update(pat_matrix.PAT_J_BASE_ID, bytearray(b"\x01\x00\x00\xbb"), ts=2.0)
+    assert calls == [b"\x01\x00\x00"]
+    assert s._ts[0] == 2.0
+
+    assert s.maybe_update(pat_matrix.PAT_J_BASE_ID, b"\x02\x00\x00", ts=3.0)
+    assert s.snapshot()["J0"]["vals"][0] == 2
+    assert len(calls) == 2
+
+def test_j0_pin_names_parses_dbc_and_caches():
     names = pat_matrix.j0_pin_names()
     # The packaged PAT.dbc defines these (and fallback does too)
     assert names.get(1) == "3A_LOAD"
     assert names.get(12) == "PROBE"
 
-    # Second call should return a copy of the cache (mutating shouldn't persist)
+    # Each call returns a fresh dict (mutating shouldn't persist)
     names2 = pat_matrix.j0_pin_names()
     names2[1] = "MUTATED"
     names3 = pat_matrix.j0_pin_names()
@@ -90,6 +140,14 @@ BO_ 124 PAT_J1: 8 Vector__XXX
     assert out.get(1) == "GOOD"
 
 
+def test_parse_j0_pin_names_from_dbc_text_without_j0_section():
+    txt = """
+BO_ 124 PAT_J1: 8 Vector__XXX
+ SG_ J0_01_NOT_IN_J0 : 0|2@1+ (1,0) [0|3] \"\" Vector__XXX
+"""
+    assert pat_matrix._parse_j0_pin_names_from_dbc_text(txt) == {}
+    assert pat_matrix._parse_j0_pin_names_from_dbc_text(None) == {}
+
 def test_parse_j0_pin_names_wrapper_missing_and_existing(tmp_path):
     # Missing file => empty mapping
     assert pat_matrix._parse_j0_pin_names_from_dbc(tmp_path / "nope.dbc") == {}
@@ -111,9 +169,6 @@ BO_ 123 PAT_J0: 8 Vector__XXX
 
 
 def test_j0_pin_names_falls_back_when_resource_missing(monkeypatch):
-    if hasattr(pat_matrix, "_J0_PIN_NAMES"):
-        delattr(pat_matrix, "_J0_PIN_NAMES")
-
     monkeypatch.setattr(pat_matrix, "_read_packaged_pat_dbc_text", lambda: None)
 
     names = pat_matrix.j0_pin_names()
@@ -121,9 +176,6 @@ def test_j0_pin_names_falls_back_when_resource_missing(monkeypatch):
 
 
 def test_j0_pin_names_parse_exception_falls_back(monkeypatch):
-    if hasattr(pat_matrix, "_J0_PIN_NAMES"):
-        delattr(pat_matrix, "_J0_PIN_NAMES")
-
     monkeypatch.setattr(pat_matrix, "_read_packaged_pat_dbc_text", lambda: "BO_ 1 PAT_J0: 8 X\n SG_ J0_01_X : 0|2@1+ (1,0) [0|3] \"\" X\n")
     monkeypatch.setattr(pat_matrix, "_parse_j0_pin_names_from_dbc_text", lambda _txt: (_ for _ in ()).throw(RuntimeError("boom")))
 
@@ -195,25 +247,16 @@ def test_read_packaged_pat_dbc_text_exception_returns_none(monkeypatch):
     assert pat_matrix._read_packaged_pat_dbc_text() is None
 
 
-def test_j0_pin_names_cache_assignment_exception_is_swallowed(monkeypatch):
-    """Cover the defensive cache write try/except."""
+def test_j0_pin_names_parses_once(monkeypatch):
+    calls = []
 
-    if hasattr(pat_matrix, "_J0_PIN_NAMES"):
-        delattr(pat_matrix, "_J0_PIN_NAMES")
+    def parse(txt):
+        calls.append(txt)
+        return {1: "X"}
 
-    class FlakyCopy(dict):
-        def __init__(self, *a, **kw):
-            super().__init__(*a, **kw)
-            self._calls = 0
+    monkeypatch.setattr(pat_matrix, "_read_packaged_pat_dbc_text", lambda: "whatever")
+    monkeypatch.setattr(pat_matrix, "_parse_j0_pin_names_from_dbc_text", parse)
 
-        def copy(self):
-            self._calls += 1
-            if self._calls == 1:
-                raise RuntimeError("copy")
-            return super().copy()
-
-    monkeypatch.setattr(pat_matrix, "_read_packaged_pat_dbc_text", lambda: "whatever", raising=False)
-    monkeypatch.setattr(pat_matrix, "_parse_j0_pin_names_from_dbc_text", lambda _txt: FlakyCopy({1: "X"}), raising=False)
-
-    names = pat_matrix.j0_pin_names()
-    assert names.get(1) == "X"
+    assert pat_matrix.j0_pin_names() == {1: "X"}
+    assert pat_matrix.j0_pin_names() == {1: "X"}
+    assert calls == ["whatever"]
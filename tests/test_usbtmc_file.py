@@ -1,73 +1,42 @@
-import types
-
 import pytest
 
+from _helpers import FakeClock
+from roi.devices import usbtmc_file
+from roi.devices.usbtmc_file import UsbTmcError, UsbTmcFileInstrument, UsbTmcTimeout
 
-def test_usbtmc_file_write_adds_termination(monkeypatch):
-    """write() should append the configured write termination when missing."""
-
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument
-
-    written = []
-
-    def fake_open(path, flags):
-        assert path == "/dev/usbtmc0"
-        return 3
-
-    def fake_write(fd, data):
-        assert fd == 3
-        written.append(data)
-        return len(data)
-
-    def fake_close(fd):
-        assert fd == 3
 
-    monkeypatch.setattr("os.open", fake_open)
-    monkeypatch.setattr("os.write", fake_write)
-    monkeypatch.setattr("os.close", fake_close)
+def test_usbtmc_file_write_adds_termination(usbtmc_os):
+    """write() should append the configured write termination when missing."""
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.write_termination = "\n"
     dev.write("*IDN?")
     dev.close()
 
-    assert written, "expected a write"
-    assert written[0].endswith(b"\n")
+    assert usbtmc_os.opened == ["/dev/usbtmc0"]
+    assert usbtmc_os.closed == [usbtmc_os.fd]
+    assert usbtmc_os.written, "expected a write"
+    assert usbtmc_os.written[0].endswith(b"\n")
 
 
-def test_usbtmc_file_query_reads_until_termination(monkeypatch):
-    """query() should write then read until the configured termination."""
-
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument
+def test_usbtmc_file_write_follows_termination_changes(usbtmc_os):
+    """Cached termination bytes must track reassignment of the attribute."""
 
-    written = []
-    reads = [b"GW,INSTEK,AFG-2125\n"]
-
-    def fake_open(path, flags):
-        return 4
-
-    def fake_write(fd, data):
-        written.append(data)
-        return len(data)
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.write("A\n")
+    dev.write_termination = "\r\n"
+    dev.write("B")
+    dev.write_termination = ""
+    dev.write("C")
+    dev.close()
 
-    def fake_select(rlist, wlist, xlist, timeout):
-        # Always ready for one read.
-        return (rlist, [], [])
+    assert usbtmc_os.written == [b"A\n", b"B\r\n", b"C"]
 
-    def fake_read(fd, n):
-        assert fd == 4
-        if reads:
-            return reads.pop(0)
-        return b""
 
-    def fake_close(fd):
-        return None
+def test_usbtmc_file_query_reads_until_termination(usbtmc_os):
+    """query() should write then read until the configured termination."""
 
-    monkeypatch.setattr("os.open", fake_open)
-    monkeypatch.setattr("os.write", fake_write)
-    monkeypatch.setattr("select.select", fake_select)
-    monkeypatch.setattr("os.read", fake_read)
-    monkeypatch.setattr("os.close", fake_close)
+    usbtmc_os.reads.append(b"GW,INSTEK,AFG-2125\n")
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.timeout = 100
@@ -75,28 +44,25 @@ def test_usbtmc_file_query_reads_until_termination(monkeypatch):
     dev.close()
 
     assert out == "GW,INSTEK,AFG-2125"
-    assert written, "query() should write"
-    assert written[0].startswith(b"*IDN?")
+    assert usbtmc_os.written, "query() should write"
+    assert usbtmc_os.written[0].startswith(b"*IDN?")
 
 
-def test_usbtmc_file_read_timeout(monkeypatch):
-    """read() should raise UsbTmcTimeout when select() times out."""
+def test_usbtmc_file_back_to_back_reads_do_not_leak(usbtmc_os):
+    """The reused read buffer must not carry data into the next read()."""
 
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcTimeout
+    usbtmc_os.reads += [b"1.0\nstale", b"2.0\n"]
 
-    def fake_open(path, flags):
-        return 5
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    assert dev.read() == "1.0"
+    assert dev.read() == "2.0"
+    dev.close()
 
-    def fake_select(rlist, wlist, xlist, timeout):
-        # Not ready => timeout.
-        return ([], [], [])
 
-    def fake_close(fd):
-        return None
+def test_usbtmc_file_read_timeout(usbtmc_os):
+    """read() should raise UsbTmcTimeout when the wait times out."""
 
-    monkeypatch.setattr("os.open", fake_open)
-    monkeypatch.setattr("select.select", fake_select)
-    monkeypatch.setattr("os.close", fake_close)
+    usbtmc_os.ready = False
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.timeout = 1
@@ -106,8 +72,6 @@ def test_usbtmc_file_read_timeout(monkeypatch):
 
 
 def test_usbtmc_file_open_error_raises_usbtmcerror(monkeypatch):
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcError
-
     def fake_open(path, flags):
         raise OSError("nope")
 
@@ -117,66 +81,65 @@ def test_usbtmc_file_open_error_raises_usbtmcerror(monkeypatch):
         UsbTmcFileInstrument("/dev/usbtmc0")
 
 
-def test_usbtmc_file_fd_property_raises_when_closed(monkeypatch):
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcError
-
-    monkeypatch.setattr("os.open", lambda path, flags: 99)
-    monkeypatch.setattr("os.close", lambda fd: None)
-
+def test_usbtmc_file_fd_property_raises_when_closed(usbtmc_os):
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.close()
 
     with pytest.raises(UsbTmcError):
         _ = dev.fd
+    with pytest.raises(UsbTmcError):
+        dev.read()
 
 
-def test_usbtmc_file_write_none_is_noop(monkeypatch):
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument
+def test_usbtmc_file_write_none_is_noop(usbtmc_os):
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.write(None)  # type: ignore[arg-type]
+    dev.close()
 
-    monkeypatch.setattr("os.open", lambda path, flags: 3)
-    monkeypatch.setattr("os.close", lambda fd: None)
+    assert usbtmc_os.written == []
 
-    calls = {"n": 0}
 
+def test_usbtmc_file_write_os_write_error(monkeypatch, usbtmc_os):
     def fake_write(fd, data):
-        calls["n"] += 1
-        return len(data)
+        raise OSError("boom")
 
     monkeypatch.setattr("os.write", fake_write)
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
-    dev.write(None)  # type: ignore[arg-type]
+    with pytest.raises(UsbTmcError):
+        dev.write("*IDN?")
     dev.close()
 
-    assert calls["n"] == 0
 
+def test_usbtmc_file_write_finishes_short_writes(monkeypatch, usbtmc_os):
+    def short_write(fd, data):
+        usbtmc_os.written.append(bytes(data[:2]))
+        return min(2, len(data))
 
-def test_usbtmc_file_write_os_write_error(monkeypatch):
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcError
+    monkeypatch.setattr("os.write", short_write)
 
-    monkeypatch.setattr("os.open", lambda path, flags: 3)
-    monkeypatch.setattr("os.close", lambda fd: None)
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.write("*RST")
+    dev.close()
 
-    def fake_write(fd, data):
-        raise OSError("boom")
+    assert b"".join(usbtmc_os.written) == b"*RST\n"
 
-    monkeypatch.setattr("os.write", fake_write)
+
+def test_usbtmc_file_write_without_progress_raises(monkeypatch, usbtmc_os):
+    sizes = iter([1, 0])
+    monkeypatch.setattr("os.write", lambda fd, data: next(sizes))
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
-    with pytest.raises(UsbTmcError):
-        dev.write("*IDN?")
+    with pytest.raises(UsbTmcError, match="no progress"):
+        dev.write("*RST")
     dev.close()
 
 
-def test_usbtmc_file_read_timeout_before_select(monkeypatch):
+def test_usbtmc_file_read_timeout_before_select(monkeypatch, usbtmc_os):
     """Cover the remaining<=0 timeout path (no select call)."""
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcTimeout
-
-    monkeypatch.setattr("os.open", lambda path, flags: 7)
-    monkeypatch.setattr("os.close", lambda fd: None)
 
     # Make monotonic constant so deadline==now.
-    monkeypatch.setattr("time.monotonic", lambda: 0.0)
+    monkeypatch.setattr("time.monotonic_ns", lambda: 0)
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.timeout = 0
@@ -187,16 +150,22 @@ def test_usbtmc_file_read_timeout_before_select(monkeypatch):
     dev.close()
 
 
-def test_usbtmc_file_select_exception_raises_usbtmcerror(monkeypatch):
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcError
+def test_usbtmc_file_read_times_out_between_chunks(monkeypatch, usbtmc_os):
+    """The deadline is rechecked after a chunk that doesn't finish the reply."""
 
-    monkeypatch.setattr("os.open", lambda path, flags: 8)
-    monkeypatch.setattr("os.close", lambda fd: None)
+    usbtmc_os.reads += [b"AB", b"CD\n"]
+    now = iter([0, 10**9])
+    monkeypatch.setattr("time.monotonic_ns", lambda: next(now))
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.timeout = 10
+    with pytest.raises(UsbTmcTimeout):
+        dev.read()
+    dev.close()
 
-    def boom(*args, **kwargs):
-        raise OSError("select")
 
-    monkeypatch.setattr("select.select", boom)
+def test_usbtmc_file_wait_exception_raises_usbtmcerror(usbtmc_os):
+    usbtmc_os.wait_error = OSError("poll")
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.timeout = 10
@@ -205,41 +174,47 @@ def test_usbtmc_file_select_exception_raises_usbtmcerror(monkeypatch):
     dev.close()
 
 
-def test_usbtmc_file_read_os_read_error(monkeypatch):
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument, UsbTmcError
+def test_usbtmc_file_poll_timeout_rounds_up_to_whole_ms(monkeypatch, usbtmc_os):
+    usbtmc_os.reads.append(b"OK\n")
+    now = iter([0, 0, 10**9])
+    monkeypatch.setattr("time.monotonic_ns", lambda: next(now))
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.timeout = 0.25  # 250 us
+    assert dev.read() == "OK"
+    dev.close()
 
-    monkeypatch.setattr("os.open", lambda path, flags: 9)
-    monkeypatch.setattr("os.close", lambda fd: None)
-    monkeypatch.setattr("select.select", lambda r, w, x, t: (r, [], []))
+    assert usbtmc_os.poll_timeouts == [1]
 
-    def boom(fd, n):
-        raise OSError("read")
 
-    monkeypatch.setattr("os.read", boom)
+def test_usbtmc_file_falls_back_to_select_without_poll(monkeypatch, usbtmc_os):
+    monkeypatch.delattr("select.poll")
+    usbtmc_os.reads.append(b"OK\n")
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
-    dev.timeout = 10
+    assert dev.read() == "OK"
+    usbtmc_os.wait_error = OSError("select")
     with pytest.raises(UsbTmcError):
         dev.read()
     dev.close()
 
+    assert usbtmc_os.poll_timeouts == []
 
-def test_usbtmc_file_eof_break_returns_buffer(monkeypatch):
-    """Cover the EOF/break + final return (no termination) path."""
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument
 
-    monkeypatch.setattr("os.open", lambda path, flags: 10)
-    monkeypatch.setattr("os.close", lambda fd: None)
+def test_usbtmc_file_read_os_read_error(usbtmc_os):
+    usbtmc_os.read_error = OSError("read")
 
-    # Always ready
-    monkeypatch.setattr("select.select", lambda r, w, x, t: (r, [], []))
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.timeout = 10
+    with pytest.raises(UsbTmcError):
+        dev.read()
+    dev.close()
 
-    reads = [b"ABC", b""]
 
-    def fake_read(fd, n):
-        return reads.pop(0)
+def test_usbtmc_file_eof_break_returns_buffer(usbtmc_os):
+    """Cover the EOF/break + final return (no termination) path."""
 
-    monkeypatch.setattr("os.read", fake_read)
+    usbtmc_os.reads.append(b"ABC")  # then EOF
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.timeout = 10
@@ -251,20 +226,11 @@ def test_usbtmc_file_eof_break_returns_buffer(monkeypatch):
     assert out == "ABC"
 
 
-def test_usbtmc_file_safety_cap_returns(monkeypatch):
+def test_usbtmc_file_safety_cap_returns(usbtmc_os):
     """Cover the safety cap that prevents unbounded buffer growth."""
-    from roi.devices.usbtmc_file import UsbTmcFileInstrument
-
-    monkeypatch.setattr("os.open", lambda path, flags: 11)
-    monkeypatch.setattr("os.close", lambda fd: None)
-    monkeypatch.setattr("select.select", lambda r, w, x, t: (r, [], []))
 
     big = b"A" * (256 * 1024 + 1)
-
-    def fake_read(fd, n):
-        return big
-
-    monkeypatch.setattr("os.read", fake_read)
+    usbtmc_os.reads.append(big)
 
     dev = UsbTmcFileInstrument("/dev/usbtmc0")
     dev.timeout = 10
@@ -275,3 +241,162 @@ def test_usbtmc_file_safety_cap_returns(monkeypatch):
 
     assert out.startswith("A")
     assert len(out) == len(big)
+
+
+def test_usbtmc_file_reads_without_readv(monkeypatch, usbtmc_os):
+    """Without os.readv (Windows) chunks are copied into the fixed buffer."""
+
+    monkeypatch.delattr("os.readv")
+    usbtmc_os.reads += [b"12", b"34\n"]
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    assert dev.read() == "1234"
+    dev.close()
+
+
+def test_usbtmc_file_finds_termination_split_across_chunks(usbtmc_os):
+    usbtmc_os.reads += [b"AB\r", b"\nCD\r\n"]
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.read_termination = "\r\n"
+    assert dev.read() == "AB"
+    dev.close()
+
+
+def test_usbtmc_file_trims_trailing_crlf(usbtmc_os):
+    usbtmc_os.reads += [b"V\r\r\n", b"\r\n", b"\xff\n"]
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    assert dev.read() == "V"
+    assert dev.read() == ""
+    assert dev.read() == "�"
+    dev.close()
+
+
+def test_usbtmc_file_instances_share_encoded_terminations(usbtmc_os):
+    a = UsbTmcFileInstrument("/dev/usbtmc0")
+    b = UsbTmcFileInstrument("/dev/usbtmc0")
+    # Seeded at construction, before any I/O.
+    assert a._rterm_b is b._rterm_b == b"\n"
+    a.write("X")
+    b.write("Y")
+
+    assert a._wterm_b is b._wterm_b
+    a.close()
+    b.close()
+
+
+def test_usbtmc_file_instrument_has_no_instance_dict(usbtmc_os):
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    with pytest.raises(AttributeError):
+        dev.not_a_field = 1
+    dev.close()
+
+
+def test_usbtmc_file_read_iter_yields_chunks_up_to_termination(usbtmc_os):
+    usbtmc_os.reads += [b"#15", b"AB", b"CDE\r", b"\nNEXT"]
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.read_termination = "\r\n"
+    chunks = [bytes(c) for c in dev.read_iter()]
+    dev.close()
+
+    assert chunks == [b"#15", b"AB", b"CDE\r", b"\n"]
+
+
+def test_usbtmc_file_read_iter_streams_past_the_buffer(usbtmc_os):
+    """Unbounded streaming wraps the fixed buffer, even mid-terminator."""
+
+    # The "\r" is the last byte of the chunk that fills the buffer.
+    body = bytes(range(256)) * 1040
+    usbtmc_os.reads += [body[:-1] + b"\r", b"\n", b"A" * 5000 + b"\r\n"]
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.read_termination = "\r\n"
+    got = b"".join(bytes(c) for c in dev.read_iter())
+
+    assert got == body[:-1] + b"\r\n"
+    # The wrapped buffer still serves a whole response to the next read().
+    assert dev.read() == "A" * 5000
+    dev.close()
+
+
+def test_usbtmc_file_read_iter_max_bytes(usbtmc_os):
+    usbtmc_os.reads.append(b"A" * 10000)
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    got = b"".join(bytes(c) for c in dev.read_iter(max_bytes=5000))
+    dev.close()
+
+    assert got == b"A" * 8192
+
+
+def test_usbtmc_file_drains_queued_chunks_per_wake(monkeypatch, usbtmc_os):
+    """Full chunks are drained without polling again; EAGAIN re-arms the wait."""
+
+    # Windows has no O_NONBLOCK; use the Linux value so the test runs anywhere.
+    monkeypatch.setattr(usbtmc_file, "_O_NONBLOCK", 0o4000)
+    usbtmc_os.reads += [b"A" * 4096 * 3, BlockingIOError(), b"BC\n"]
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    assert dev.read() == "A" * 4096 * 3 + "BC"
+    dev.close()
+
+    assert usbtmc_os.flags & 0o4000
+    assert len(usbtmc_os.poll_timeouts) == 2
+
+
+def test_usbtmc_file_write_waits_when_driver_queue_is_full(monkeypatch, usbtmc_os):
+    results = [BlockingIOError(), 2, 3]
+
+    def fake_write(fd, data):
+        r = results.pop(0)
+        if isinstance(r, BaseException):
+            raise r
+        usbtmc_os.written.append(bytes(data[:r]))
+        return r
+
+    monkeypatch.setattr("os.write", fake_write)
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.write("*RST")
+    results.append(BlockingIOError())
+    usbtmc_os.ready = False
+    with pytest.raises(UsbTmcError, match="timed out"):
+        dev.write("X")
+    dev.close()
+
+    assert b"".join(usbtmc_os.written) == b"*RST\n"
+
+
+def test_usbtmc_file_write_eagain_waits_are_bounded_by_one_timeout(monkeypatch, usbtmc_os):
+    """Repeated EAGAIN shares one deadline instead of restarting the timeout."""
+
+    clock = FakeClock()
+    waits = []
+
+    def eagain(fd, data):
+        raise BlockingIOError()
+
+    def writable_after(r, w, x, timeout):
+        # The device wakes us up a little before each wait expires.
+        waits.append(timeout)
+        assert len(waits) < 100, "write() kept waiting past its timeout"
+        clock.advance(timeout * 0.9)
+        return r, w, []
+
+    monkeypatch.setattr("time.monotonic_ns", lambda: round(clock() * 1e9))
+    monkeypatch.setattr("os.write", eagain)
+    monkeypatch.setattr("select.select", writable_after)
+
+    dev = UsbTmcFileInstrument("/dev/usbtmc0")
+    dev.timeout = 100
+    with pytest.raises(UsbTmcError, match="timed out after 0/"):
+        dev.write("*RST")
+    dev.close()
+
+    # Each wait only gets what is left, so the whole write stays within the
+    # 100 ms timeout (the old code restarted a full 100 ms wait every time).
+    assert waits[0] == pytest.approx(0.1)
+    assert all(b < a for a, b in zip(waits, waits[1:]))
+    assert clock.t <= 0.1
@@ -1,29 +1,28 @@
 from __future__ import annotations
 
+import http.client
 import json
-import time
-import urllib.error
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from roi.core.diagnostics import Diagnostics
+from roi.web import WebDashboardServer, WebServerConfig
 
 
 def _wait_for_port(srv, timeout_s: float = 2.0) -> int:
-    """Wait until the underlying HTTPServer is bound and return the port."""
+    """Wait until the dashboard server is serving and return the port."""
 
-    deadline = time.monotonic() + float(timeout_s)
-    while time.monotonic() < deadline:
-        httpd = getattr(srv, "_server", None)
-        if httpd is not None:
-            try:
-                return int(httpd.server_address[1])
-            except Exception:
-                pass
-        time.sleep(0.01)
-    raise AssertionError("web server did not start")
+    if not srv._ready.wait(timeout_s):
+        raise AssertionError("web server did not start")
+    return int(srv._server.server_address[1])
 
 
-def test_diagnostics_ring_and_health_dedupe():
-    from roi.core.diagnostics import Diagnostics
+def _get(conn: http.client.HTTPConnection, path: str, headers: dict | None = None) -> tuple[int, bytes]:
+    conn.request("GET", path, headers=headers or {})
+    r = conn.getresponse()
+    return r.status, r.read()
+
 
+def test_diagnostics_ring_and_health_dedupe():
     d = Diagnostics(max_events=10, dedupe_window_s=10.0)
 
     # Dedupe same message+source within the window.
@@ -44,8 +43,6 @@ def test_diagnostics_ring_and_health_dedupe():
 
 
 def test_web_dashboard_basic_routes():
-    from roi.web import WebDashboardServer, WebServerConfig
-
     logs: list[str] = []
 
     def snap():
@@ -55,27 +52,39 @@ def test_web_dashboard_basic_routes():
     srv.start()
     port = _wait_for_port(srv)
 
+    def fetch(path: str) -> tuple[int, bytes]:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            return _get(conn, path)
+        finally:
+            conn.close()
+
+    # The routes are independent; request them concurrently (the server
+    # handles each connection on its own thread).
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        index, ping, status, missing = pool.map(fetch, ["/", "/api/ping", "/api/status", "/nope"])
+
     # Index
-    with urllib.request.urlopen(f"http://127.0.0.1:{port}/") as r:
-        body = r.read().decode("utf-8", errors="replace")
-        assert "ROI Dashboard" in body
+    assert index[0] == 200
+    assert "ROI Dashboard" in index[1].decode("utf-8", errors="replace")
 
     # Ping
-    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ping") as r:
-        assert r.read() == b"pong"
+    assert ping == (200, b"pong")
 
     # Status
-    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/status") as r:
-        data = json.loads(r.read().decode("utf-8"))
-        assert data["ok"] is True
+    assert status[0] == 200
+    assert json.loads(status[1].decode("utf-8"))["ok"] is True
 
     # 404
-    try:
-        urllib.request.urlopen(f"http://127.0.0.1:{port}/nope")
-        raise AssertionError("expected 404")
-    except urllib.error.HTTPError as e:
-        assert e.code == 404
-
+    assert missing[0] == 404
+
+    # Consecutive requests ride the same keep-alive connection.
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    assert _get(conn, "/api/ping") == (200, b"pong")
+    sock = conn.sock
+    assert _get(conn, "/api/ping") == (200, b"pong")
+    assert conn.sock is sock
+    conn.close()
     srv.stop()
 
     # Start log should have been emitted.
@@ -83,35 +92,27 @@ def test_web_dashboard_basic_routes():
 
 
 def test_web_dashboard_token_and_error_path():
-    from roi.web import WebDashboardServer, WebServerConfig
-
     def boom():
         raise RuntimeError("snap")
 
     srv = WebDashboardServer(cfg=WebServerConfig(host="127.0.0.1", port=0, token="sekrit"), get_snapshot=boom)
     srv.start()
     port = _wait_for_port(srv)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
 
     # Unauthorized without token
-    try:
-        urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ping")
-        raise AssertionError("expected 401")
-    except urllib.error.HTTPError as e:
-        assert e.code == 401
+    assert _get(conn, "/api/ping")[0] == 401
+    sock = conn.sock
 
     # Authorized with query token
-    try:
-        urllib.request.urlopen(f"http://127.0.0.1:{port}/api/status?token=sekrit")
-        raise AssertionError("expected 500")
-    except urllib.error.HTTPError as e:
-        assert e.code == 500
-        data = json.loads(e.read().decode("utf-8"))
-        assert "error" in data
+    status, body = _get(conn, "/api/status?token=sekrit")
+    assert status == 500
+    assert "error" in json.loads(body.decode("utf-8"))
 
     # Authorized with bearer token
-    req = urllib.request.Request(f"http://127.0.0.1:{port}/api/ping")
-    req.add_header("Authorization", "Bearer sekrit")
-    with urllib.request.urlopen(req) as r:
-        assert r.read() == b"pong"
+    assert _get(conn, "/api/ping", headers={"Authorization": "Bearer sekrit"}) == (200, b"pong")
 
+    # Error statuses are plain responses; the connection stays usable.
+    assert conn.sock is sock
+    conn.close()
     srv.stop()